@@ -0,0 +1,262 @@
+"""
+Parallel generation of sculpture variants for review.
+
+A batch is a JSON list of parameter sets, one per variant, such as:
+
+  [
+    {"kind": "outline", "total": 3},
+    {"kind": "orbit", "total": 5, "subdivisions": 100},
+    {"kind": "dodecahedron", "grid": 12, "small_dims": [0.5, 0.5, 5.0]},
+    {"kind": "sculpture", "name": "full"}
+  ]
+
+Variants are spread over a pool of worker processes, each writing its own
+file, and reported as they finish with their build time. By default workers
+use the pure-geometry path and write GLB files; with --mayapy every variant is
+built by the Maya scripts in its own headless mayapy process and saved as a
+Maya binary scene. With --lods, pure-geometry sculpture variants also write
+their levels of detail next to the variant, as <name>_LOD<i>.glb.
+
+Usage:
+  python batch.py variants.json --output build/variants --workers 8
+  python batch.py variants.json --output build/variants --lods
+  python batch.py variants.json --output build/variants --mayapy /usr/autodesk/maya/bin/mayapy
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+
+import hypatia_geometry as geometry
+import subdivision
+from gltf_export import export_glb, export_lods, export_sculpture
+from xx_geometry import cuboid_placements, split_dimensions
+
+KINDS = ("outline", "orbit", "dodecahedron", "sculpture")
+
+
+@dataclass
+class VariantResult:
+    """
+    The outcome of one variant.
+
+    Attributes:
+      index (int): Position of the variant in the batch.
+      name (str): Output file stem.
+      path (str): The file written.
+      seconds (float): Build and write time inside the worker.
+      error (str): The failure message, or None when the variant succeeded.
+    """
+    index: int
+    name: str
+    path: str
+    seconds: float
+    error: str = None
+
+
+# ----------------------------------------------------
+# Pure-geometry variants
+# ----------------------------------------------------
+def outline_variant(path, total=5, radius=geometry.RADIUS, subdivisions=geometry.TORUS_SUBDIVISIONS):
+    """Writes the motion structure and its light, instanced per create_outline copy."""
+    meshes = [
+        geometry.motion_structure(radius=radius, subdivisions=subdivisions),
+        geometry.motion_structure_light(radius=radius, subdivisions=subdivisions),
+    ]
+    instances = []
+    for _, name, rotation in geometry.outline_placements(total):
+        instances.append((0, name, rotation))
+        instances.append((1, name + "_Light", rotation))
+    return export_glb(path, meshes, instances)
+
+
+def orbit_variant(path, total=geometry.ORBIT_TOTAL, radius=geometry.RADIUS, subdivisions=geometry.TORUS_SUBDIVISIONS):
+    """Writes the inner and outer side of every orbit ring, with the cylindrical UVs of create_orbit."""
+    meshes = []
+    for i in range(total):
+        ring = geometry.orbit_ring(i, total=total, radius=radius, subdivisions=subdivisions)
+        inner, outer = geometry.split_by_radial_normal(ring, inner_name="SM_Inner%s" % i, outer_name="SM_Outer%s" % i)
+        meshes.extend([subdivision.subdivide(geometry.cylindrical_uvs(inner), levels=geometry.ORBIT_SMOOTH_DIVISIONS),
+                       geometry.cylindrical_uvs(outer)])
+    return export_glb(path, meshes)
+
+
+def dodecahedron_variant(path, big_size=25, grid=10, small_dims=(0.5, 0.5, 5.0)):
+    """Writes the dodecahedron and its cuboids combined into one mesh."""
+    flush_dim, grid_dims = split_dimensions(small_dims)
+    dodecahedron = geometry.dodecahedron(big_size / 2.0)
+    matrices = cuboid_placements(dodecahedron, grid, flush_dim)
+    cuboids = geometry.instance_mesh(geometry.cube(grid_dims[0], grid_dims[1], flush_dim), matrices,
+                                     name="dodec_smallCubes_Combined")
+    meshes = [dodecahedron, cuboids] if len(matrices) else [dodecahedron]
+    return export_glb(path, meshes)
+
+
+_VARIANTS = {
+    "outline": outline_variant,
+    "orbit": orbit_variant,
+    "dodecahedron": dodecahedron_variant,
+    "sculpture": export_sculpture,
+}
+
+
+# Sculpture parameters that also shape its levels of detail.
+_LOD_PARAMS = ("radius", "subdivisions", "outline_total", "orbit_total")
+
+
+def build_variant(variant, path, lods=False):
+    """
+    Builds one variant with the pure-geometry path. Runs in a worker process.
+
+    Parameters:
+      lods (bool): Also write the levels of detail of a sculpture variant with export_lods.
+
+    Returns:
+      float: The build and write time in seconds.
+    """
+    params = {k: v for k, v in variant.items() if k not in ("kind", "name")}
+    start = time.perf_counter()
+    _VARIANTS[variant["kind"]](path, **params)
+    if lods and variant["kind"] == "sculpture":
+        export_lods(path, **{k: v for k, v in params.items() if k in _LOD_PARAMS})
+    return time.perf_counter() - start
+
+
+# ----------------------------------------------------
+# Maya variants
+# ----------------------------------------------------
+def build_variant_in_maya(variant, path):
+    """
+    Builds one variant with the Maya scripts and saves the scene. Runs inside mayapy.
+
+    Returns:
+      float: The build and save time in seconds.
+    """
+    import maya.standalone
+    maya.standalone.initialize(name="python")
+    import pymel.core as pm
+    import hypatia
+    import xx
+
+    params = {k: v for k, v in variant.items() if k not in ("kind", "name")}
+    start = time.perf_counter()
+    pm.newFile(force=True)
+    kind = variant["kind"]
+    # The Maya builders read their resolution from module constants.
+    hypatia.RADIUS = params.get("radius", hypatia.RADIUS)
+    hypatia.TORUS_SUBDIVISIONS = params.get("subdivisions", hypatia.TORUS_SUBDIVISIONS)
+    if kind == "outline":
+        hypatia.create_outline(hypatia.create_motion_orbit_sculpture(), total=params.get("total", 5))
+    elif kind == "orbit":
+        hypatia.create_orbit(total=params.get("total", geometry.ORBIT_TOTAL))
+    elif kind == "sculpture":
+        hypatia.create_outline(hypatia.create_motion_orbit_sculpture(), total=params.get("outline_total", 5))
+        hypatia.create_orbit(total=params.get("orbit_total", geometry.ORBIT_TOTAL))
+        hypatia.create_hypatia()
+    else:
+        xx.distribute_cubes_on_dodecahedron(**params)
+    pm.saveAs(path, type="mayaBinary", force=True)
+    return time.perf_counter() - start
+
+
+def _run_mayapy(mayapy, variant, path):
+    """Runs build_variant_in_maya in a fresh mayapy process and returns its time."""
+    completed = subprocess.run(
+        [mayapy, os.path.abspath(__file__), "--worker", json.dumps(variant), os.path.abspath(path)],
+        cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else
+                           "mayapy exited with %d" % completed.returncode)
+    return float(completed.stdout.strip().splitlines()[-1])
+
+
+# ----------------------------------------------------
+# Batch
+# ----------------------------------------------------
+def variant_names(variants):
+    """Returns the output file stem of every variant: its name, or kind_index."""
+    return [v.get("name") or "%s_%03d" % (v["kind"], i) for i, v in enumerate(variants)]
+
+
+def run_batch(variants, output_dir, workers=None, mayapy=None, lods=False):
+    """
+    Builds variants in parallel, yielding each result as soon as it finishes.
+
+    Parameters:
+      variants (list): Parameter dicts, each with a "kind" from KINDS and an optional "name".
+      output_dir (str): Directory receiving one file per variant.
+      workers (int): Number of worker processes. Defaults to the number of cores.
+      mayapy (str): Path to mayapy. Builds every variant in Maya instead of the pure-geometry path.
+      lods (bool): Also write the levels of detail of pure-geometry sculpture variants.
+
+    Yields:
+      VariantResult: One per variant, in completion order.
+    """
+    for variant in variants:
+        if variant.get("kind") not in KINDS:
+            raise ValueError("Unknown variant kind %r" % variant.get("kind"))
+    os.makedirs(output_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    extension = ".mb" if mayapy else ".glb"
+    names = variant_names(variants)
+
+    # Each mayapy run is its own process, so threads are enough to drive them.
+    executor = ThreadPoolExecutor(workers) if mayapy else ProcessPoolExecutor(workers)
+    with executor:
+        futures = {}
+        for index, (variant, name) in enumerate(zip(variants, names)):
+            path = os.path.join(output_dir, name + extension)
+            if mayapy:
+                future = executor.submit(_run_mayapy, mayapy, variant, path)
+            else:
+                future = executor.submit(build_variant, variant, path, lods)
+            futures[future] = (index, name, path)
+
+        for future in as_completed(futures):
+            index, name, path = futures[future]
+            try:
+                yield VariantResult(index, name, path, future.result())
+            except Exception as e:
+                yield VariantResult(index, name, path, 0.0, error="%s: %s" % (type(e).__name__, e))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build sculpture variants in parallel.")
+    parser.add_argument("variants", help="JSON file holding a list of variant parameter sets.")
+    parser.add_argument("--output", default="variants", help="Directory receiving one file per variant.")
+    parser.add_argument("--workers", type=int, help="Number of worker processes. Defaults to the number of cores.")
+    parser.add_argument("--mayapy", help="Build each variant with the Maya scripts in this mayapy.")
+    parser.add_argument("--lods", action="store_true",
+                        help="Also write the levels of detail of sculpture variants, one GLB per level.")
+    args = parser.parse_args(argv)
+
+    with open(args.variants) as f:
+        variants = json.load(f)
+
+    start = time.perf_counter()
+    busy = 0.0
+    failures = 0
+    for done, result in enumerate(run_batch(variants, args.output, args.workers, args.mayapy, args.lods), 1):
+        if result.error:
+            failures += 1
+            print("[%d/%d] %-24s FAILED %s" % (done, len(variants), result.name, result.error), flush=True)
+        else:
+            busy += result.seconds
+            print("[%d/%d] %-24s %8.3fs  %s" % (done, len(variants), result.name, result.seconds, result.path),
+                  flush=True)
+    wall = time.perf_counter() - start
+    print("%d variants in %.3fs, %.1fx the serial build time" % (len(variants), wall, busy / wall if wall else 0))
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "--worker":
+        # Inside mayapy: build one variant and print its time for _run_mayapy.
+        print(build_variant_in_maya(json.loads(sys.argv[2]), sys.argv[3]))
+    else:
+        sys.exit(main())
@@ -0,0 +1,244 @@
+"""
+Benchmarks of the Maya builders, runnable without Maya.
+
+Each builder of hypatia.py and xx.py runs under the recording stand-in of
+pm_recorder across a grid of parameters. For every case the harness reports
+the best wall time of a few repeats, the number of Maya commands issued and
+the DAG nodes and vertices created. Results are compared with a stored
+baseline, and the run fails when a case issues more commands or creates more
+nodes or vertices than the baseline allows. Cases much slower than the
+baseline are listed too, and fail the run with --fail-on-time.
+
+Usage:
+  python benchmark.py                     # Compare against benchmark_baseline.json.
+  python benchmark.py --fail-on-time      # Fail on slower wall times as well.
+  python benchmark.py --update-baseline   # Record the current results as the baseline.
+
+Wall times depend on the machine and its load, so only gate on them on the
+machine that recorded the baseline; the counts do not.
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+
+from pm_recorder import recording
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+
+# Allowed growth of the command, node and vertex counts over the baseline
+# before a case counts as a regression.
+COMMAND_THRESHOLD = 0.1
+
+# Growth of the wall time over the baseline before a case is reported as slower.
+TIME_THRESHOLD = 0.5
+
+# Timings shorter than this are too noisy to report.
+MIN_SECONDS = 0.05
+
+# Counts compared with the baseline, with their unit in messages.
+COUNTS = [("commands", "commands"), ("nodes_created", "nodes"), ("vertices_created", "vertices")]
+
+REPEATS = 3
+
+
+# ----------------------------------------------------
+# Cases
+# ----------------------------------------------------
+# Each case prepares its scene, then returns the call to measure. Only the
+# returned call is timed and recorded.
+def _motion_orbit_sculpture(hypatia, subdivisions):
+    hypatia.TORUS_SUBDIVISIONS = subdivisions
+    return hypatia.create_motion_orbit_sculpture
+
+
+def _outline(hypatia, total, instance):
+    hypatia.TORUS_SUBDIVISIONS = 50
+    group = hypatia.create_motion_orbit_sculpture()
+    return lambda: hypatia.create_outline(group, total=total, instance=instance)
+
+
+def _orbit(hypatia, subdivisions):
+    hypatia.TORUS_SUBDIVISIONS = subdivisions
+    return hypatia.create_orbit
+
+
+def _orbit_animation(hypatia, tolerance):
+    hypatia.TORUS_SUBDIVISIONS = 50
+    hypatia.create_orbit()
+    return lambda: hypatia.bake_orbit_animation(tolerance=tolerance)
+
+
+def _sculpture_graph(hypatia, subdivisions):
+    hypatia.TORUS_SUBDIVISIONS = subdivisions
+    return hypatia.create_sculpture_graph
+
+
+def _rebuild_sculpture(hypatia, edit):
+    hypatia.TORUS_SUBDIVISIONS = 50
+    graph = hypatia.create_sculpture_graph()
+    node, params = {
+        "ring": ("SM_Orbit3", {"subdivisions": 100}),
+        "quadrant": ("quadrant90", {"arc_sections": 12}),
+        "sphere": ("SM_Hypatia", {"subdivisions_x": 50}),
+    }[edit]
+    graph.set(node, **params)
+    return lambda: hypatia.rebuild_sculpture(graph)
+
+
+def _hypatia(hypatia):
+    return hypatia.create_hypatia
+
+
+def _dodecahedron(xx, grid, mode):
+    return lambda: xx.distribute_cubes_on_dodecahedron(big_size=25, grid=grid, small_dims=(0.5, 0.5, 5.0), mode=mode)
+
+
+def _stream(xx, grid, sink):
+    return lambda: xx.stream_cubes_on_dodecahedron(big_size=25, grid=grid, small_dims=(0.5, 0.5, 5.0), sink=sink)
+
+
+CASES = [
+    ("create_motion_orbit_sculpture", "hypatia", _motion_orbit_sculpture, {"subdivisions": [50, 200]}),
+    ("create_outline", "hypatia", _outline, {"total": [3, 5], "instance": [False, True]}),
+    ("create_orbit", "hypatia", _orbit, {"subdivisions": [50, 200]}),
+    ("bake_orbit_animation", "hypatia", _orbit_animation, {"tolerance": [None, 1e-4]}),
+    ("create_hypatia", "hypatia", _hypatia, {}),
+    ("create_sculpture_graph", "hypatia", _sculpture_graph, {"subdivisions": [50, 200]}),
+    ("rebuild_sculpture", "hypatia", _rebuild_sculpture, {"edit": ["ring", "quadrant", "sphere"]}),
+    ("distribute_cubes_on_dodecahedron", "xx", _dodecahedron,
+     {"grid": [5, 10], "mode": ["mesh", "instance", "combined", "matrices"]}),
+    ("stream_cubes_on_dodecahedron", "xx", _stream, {"grid": [10, 30], "sink": ["group", "instancer"]}),
+]
+
+
+def parameter_grid(grid):
+    """Returns every combination of a {name: values} grid as a list of dicts, in order."""
+    combinations = [{}]
+    for name, values in grid.items():
+        combinations = [dict(c, **{name: value}) for c in combinations for value in values]
+    return combinations
+
+
+def case_key(name, params):
+    """Returns the baseline key of a case, such as create_orbit[subdivisions=50]."""
+    return "%s[%s]" % (name, ",".join("%s=%s" % item for item in params.items()))
+
+
+def run_case(script, prepare, params, repeats=REPEATS):
+    """
+    Runs one case in a fresh simulated scene per repeat.
+
+    Returns:
+      dict: Best seconds, and the command, node and vertex totals of the measured call.
+    """
+    best = None
+    for _ in range(repeats):
+        with recording(script) as (recorder, module):
+            if hasattr(module, "cache"):
+                module.cache.enabled = False
+            call = prepare(module, **params)
+            recorder.reset()
+            # Like timeit, keep garbage collection out of the measurement.
+            gc.collect()
+            gc.disable()
+            try:
+                start = time.perf_counter()
+                call()
+                seconds = time.perf_counter() - start
+            finally:
+                gc.enable()
+        if best is None or seconds < best:
+            best = seconds
+            result = recorder.summary()
+    result["seconds"] = best
+    return result
+
+
+def run_all(repeats=REPEATS, pattern=None):
+    """Returns {case key: result} for every case whose key contains pattern."""
+    results = {}
+    for name, script, prepare, grid in CASES:
+        for params in parameter_grid(grid):
+            key = case_key(name, params)
+            if pattern and pattern not in key:
+                continue
+            results[key] = run_case(script, prepare, params, repeats)
+            print(format_result(key, results[key]))
+    return results
+
+
+def compare(results, baseline, command_threshold=COMMAND_THRESHOLD, time_threshold=TIME_THRESHOLD):
+    """
+    Compares results with a baseline.
+
+    Returns:
+      tuple: (regressions, slower), a message per case whose command, node or
+      vertex count grew past command_threshold, and per case whose wall time
+      grew past time_threshold. Slower cases fail the run with --fail-on-time.
+    """
+    regressions = []
+    slower = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        for count, unit in COUNTS:
+            if result[count] > base[count] * (1 + command_threshold):
+                regressions.append("%s: %d %s, baseline %d" % (key, result[count], unit, base[count]))
+        allowed = max(base["seconds"] * (1 + time_threshold), MIN_SECONDS)
+        if result["seconds"] > allowed:
+            slower.append("%s: %.4fs, baseline %.4fs" % (key, result["seconds"], base["seconds"]))
+    return regressions, slower
+
+
+def format_result(key, result):
+    return "%-72s %9.4fs %7d cmds %7d nodes %9d verts" % (
+        key, result["seconds"], result["commands"], result["nodes_created"], result["vertices_created"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Hypatia builders under a recording pymel stand-in.")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline JSON file.")
+    parser.add_argument("--update-baseline", action="store_true", help="Write the results as the new baseline.")
+    parser.add_argument("--repeat", type=int, default=REPEATS, help="Runs per case; the fastest is kept.")
+    parser.add_argument("--threshold", type=float, default=COMMAND_THRESHOLD,
+                        help="Allowed relative growth of the command, node and vertex counts.")
+    parser.add_argument("--time-threshold", type=float, default=TIME_THRESHOLD,
+                        help="Relative growth of the wall time reported as slower.")
+    parser.add_argument("--fail-on-time", action="store_true",
+                        help="Fail when a case is slower than the baseline, not only on count regressions.")
+    parser.add_argument("--filter", help="Only run cases whose key contains this text.")
+    args = parser.parse_args(argv)
+
+    results = run_all(args.repeat, args.filter)
+
+    if args.update_baseline:
+        baseline = {}
+        if args.filter and os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print("Wrote %d cases to %s" % (len(results), args.baseline))
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline at %s; run with --update-baseline first." % args.baseline)
+        return 1
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions, slower = compare(results, baseline, args.threshold, args.time_threshold)
+    for message in slower:
+        print("SLOWER " + message)
+    for regression in regressions:
+        print("REGRESSION " + regression)
+    return 1 if regressions or (args.fail_on_time and slower) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
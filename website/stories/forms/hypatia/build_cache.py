@@ -0,0 +1,150 @@
+"""
+Content-addressed on-disk cache of the meshes generated by hypatia_geometry.
+
+Each builder call is keyed by a hash of the builder's name, its parameters and
+the source of the module defining it, so a component is only regenerated when
+one of its inputs or its code changes. Entries are evicted least recently used
+first once the cache grows past its size bound.
+"""
+import hashlib
+import inspect
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from hypatia_geometry import MeshData
+
+CACHE_DIR = os.environ.get("HYPATIA_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "hypatia"))
+CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+_MESH_FIELDS = ("points", "face_counts", "face_connects", "uvs", "uv_connects", "normals")
+
+
+class BuildCache:
+    """
+    A size-bounded LRU cache of MeshData on disk, one .npz file per key.
+
+    Parameters:
+      directory (str): Where entries are stored.
+      max_bytes (int): Total size above which the least recently used entries are evicted.
+      enabled (bool): When False every call rebuilds and nothing is read or written.
+    """
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=CACHE_MAX_BYTES, enabled=True):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._source_hashes = {}
+
+    def build(self, builder, **params):
+        """
+        Returns builder(**params), loading it from the cache when its inputs are unchanged.
+
+        Parameters:
+          builder (callable): A function returning MeshData.
+          **params: The builder's keyword arguments, all JSON-serializable.
+
+        Returns:
+          MeshData: The cached or freshly built mesh.
+        """
+        if not self.enabled:
+            return builder(**params)
+        key = self.key(builder, **params)
+        mesh = self.load(key)
+        if mesh is not None:
+            self.hits += 1
+            return mesh
+        self.misses += 1
+        mesh = builder(**params)
+        self.store(key, mesh)
+        return mesh
+
+    def key(self, builder, **params):
+        """Returns the hex digest identifying builder(**params) and the code that builds it."""
+        payload = json.dumps({
+            "builder": "%s.%s" % (builder.__module__, builder.__qualname__),
+            "source": self._source_hash(builder),
+            "params": params,
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def load(self, key):
+        """Returns the MeshData stored under key, or None. A hit marks the entry as recently used."""
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                fields = {f: data[f] for f in _MESH_FIELDS if f in data.files}
+                name = str(data["name"])
+        except (OSError, KeyError, ValueError):
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            # Another process evicted the entry after it was read.
+            pass
+        return MeshData(name=name, **fields)
+
+    def store(self, key, mesh):
+        """Writes mesh under key atomically, then evicts entries past the size bound."""
+        os.makedirs(self.directory, exist_ok=True)
+        arrays = {f: getattr(mesh, f) for f in _MESH_FIELDS if getattr(mesh, f) is not None}
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, name=np.array(mesh.name), **arrays)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self.evict()
+
+    def evict(self):
+        """
+        Deletes the least recently used entries until the cache fits in max_bytes.
+
+        Parallel builds share the directory, so entries another process deletes
+        first are skipped.
+        """
+        entries = []
+        for filename in os.listdir(self.directory):
+            if filename.endswith(".npz"):
+                try:
+                    stat = os.stat(os.path.join(self.directory, filename))
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, filename))
+        total = sum(size for _, size, _ in entries)
+        for _, size, filename in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(os.path.join(self.directory, filename))
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self):
+        """Deletes every entry."""
+        if not os.path.isdir(self.directory):
+            return
+        for filename in os.listdir(self.directory):
+            if filename.endswith(".npz"):
+                try:
+                    os.unlink(os.path.join(self.directory, filename))
+                except FileNotFoundError:
+                    pass
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".npz")
+
+    def _source_hash(self, builder):
+        module = inspect.getmodule(builder)
+        name = module.__name__ if module else builder.__module__
+        if name not in self._source_hashes:
+            source = inspect.getsource(module) if module else ""
+            self._source_hashes[name] = hashlib.sha256(source.encode("utf-8")).hexdigest()
+        return self._source_hashes[name]
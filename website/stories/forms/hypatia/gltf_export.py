@@ -0,0 +1,486 @@
+"""
+Binary glTF (GLB) export of the meshes generated by hypatia_geometry.
+
+Attributes are quantized with KHR_mesh_quantization: positions to int16
+dequantized by the node transform, normals to normalized int8 and UVs to
+normalized uint16 when they fit in [0, 1]. Indices are uint16 whenever the mesh
+has fewer than 65536 vertices. The output depends only on the input arrays, so
+exporting the same meshes twice gives identical bytes.
+
+Baked animation tracks are written as a clip on named nodes, with float32
+keys or normalized int16 quaternions: by export_sculpture into the same file as
+the rings they animate, or alone by export_animation.
+
+export_lods writes the levels of detail of lod.build_sculpture_lods as one
+file per level, each node carrying its factor and geometric error in extras.
+"""
+import json
+import os
+import struct
+
+import numpy as np
+
+import hypatia_geometry as geometry
+import lod
+import orbit_animation
+import subdivision
+
+GLB_MAGIC = 0x46546C67
+GLB_VERSION = 2
+CHUNK_JSON = 0x4E4F534A
+CHUNK_BIN = 0x004E4942
+
+BYTE = 5120
+UNSIGNED_BYTE = 5121
+SHORT = 5122
+UNSIGNED_SHORT = 5123
+UNSIGNED_INT = 5125
+FLOAT = 5126
+
+ARRAY_BUFFER = 34962
+ELEMENT_ARRAY_BUFFER = 34963
+
+QUANTIZATION_EXTENSION = "KHR_mesh_quantization"
+
+_COMPONENT_TYPES = {
+    np.dtype(np.int8): BYTE,
+    np.dtype(np.uint8): UNSIGNED_BYTE,
+    np.dtype(np.int16): SHORT,
+    np.dtype(np.uint16): UNSIGNED_SHORT,
+    np.dtype(np.uint32): UNSIGNED_INT,
+    np.dtype(np.float32): FLOAT,
+}
+_ACCESSOR_TYPES = {1: "SCALAR", 2: "VEC2", 3: "VEC3", 4: "VEC4"}
+
+
+def triangulate(mesh):
+    """
+    Unwelds a mesh into glTF vertices and fans its faces into triangles.
+
+    glTF attributes are per vertex, so every distinct (point, uv, normal)
+    combination of the face-vertices becomes one vertex.
+
+    Returns:
+      tuple: (positions, normals or None, uvs, indices) arrays.
+    """
+    keys = [mesh.face_connects, mesh.uv_connects]
+    if mesh.normals is not None:
+        # Normals are per face-vertex; identical ones are shared after rounding.
+        _, normal_ids = np.unique(np.round(mesh.normals, 6), axis=0, return_inverse=True)
+        keys.append(normal_ids.ravel())
+    _, first, vertex_ids = np.unique(np.stack(keys, axis=1), axis=0, return_index=True, return_inverse=True)
+    vertex_ids = vertex_ids.ravel()
+
+    positions = mesh.points[mesh.face_connects[first]]
+    uvs = mesh.uvs[mesh.uv_connects[first]]
+    normals = mesh.normals[first] if mesh.normals is not None else None
+
+    _, face_starts, _ = geometry.face_vertex_layout(mesh)
+    triangles = []
+    for count in np.unique(mesh.face_counts):
+        starts = face_starts[mesh.face_counts == count]
+        for k in range(1, count - 1):
+            triangles.append(np.stack([starts, starts + k, starts + k + 1], axis=1))
+    # Keep the triangles in face order regardless of the face sizes.
+    triangles = np.concatenate(triangles)
+    triangles = triangles[np.argsort(triangles[:, 0], kind="stable")]
+    return positions, normals, uvs, vertex_ids[triangles].ravel()
+
+
+def quantize_positions(positions):
+    """
+    Quantizes positions to int16 over their bounding box, with a uniform scale.
+
+    Returns:
+      tuple: (int16 positions, translation, scale) where the node transform
+      translation + scale * q dequantizes them.
+    """
+    low, high = positions.min(axis=0), positions.max(axis=0)
+    center = (low + high) / 2
+    scale = max(float((high - low).max()) / 2, 1e-12) / 32767
+    quantized = np.round((positions - center) / scale).astype(np.int16)
+    return quantized, center, scale
+
+
+def quantize_normals(normals):
+    """Quantizes unit normals to normalized int8."""
+    return np.round(np.clip(normals, -1, 1) * 127).astype(np.int8)
+
+
+def quantize_uvs(uvs):
+    """Quantizes UVs to normalized uint16 when they fit in [0, 1], else keeps float32."""
+    if uvs.min() >= 0 and uvs.max() <= 1:
+        return np.round(uvs * 65535).astype(np.uint16)
+    return uvs.astype(np.float32)
+
+
+class _GlbBuilder:
+    """Accumulates buffer views, accessors, meshes and nodes of a single-buffer GLB."""
+
+    def __init__(self):
+        self.binary = bytearray()
+        self.gltf = {
+            "asset": {"version": "2.0", "generator": "hypatia gltf_export"},
+            "extensionsUsed": [QUANTIZATION_EXTENSION],
+            "extensionsRequired": [QUANTIZATION_EXTENSION],
+            "scene": 0,
+            "scenes": [{"nodes": []}],
+            "nodes": [],
+            "meshes": [],
+            "accessors": [],
+            "bufferViews": [],
+            "buffers": [],
+        }
+
+    def add_accessor(self, array, target, normalized=False, bounds=False):
+        array = np.ascontiguousarray(array)
+        components = 1 if array.ndim == 1 else array.shape[1]
+        # Vertex attribute elements must start on 4-byte boundaries.
+        stride = array.itemsize * components
+        if target == ARRAY_BUFFER and stride % 4:
+            padded = np.zeros((len(array), (stride + 3) // 4 * 4 // array.itemsize), dtype=array.dtype)
+            padded[:, :components] = array.reshape(len(array), components)
+            data, byte_stride = padded.tobytes(), padded.shape[1] * array.itemsize
+        else:
+            data, byte_stride = array.tobytes(), None
+
+        self._align()
+        view = {"buffer": 0, "byteOffset": len(self.binary), "byteLength": len(data)}
+        if target is not None:
+            view["target"] = target
+        if byte_stride is not None:
+            view["byteStride"] = byte_stride
+        self.binary.extend(data)
+        self.gltf["bufferViews"].append(view)
+
+        accessor = {
+            "bufferView": len(self.gltf["bufferViews"]) - 1,
+            "componentType": _COMPONENT_TYPES[array.dtype],
+            "count": len(array),
+            "type": _ACCESSOR_TYPES[components],
+        }
+        if normalized:
+            accessor["normalized"] = True
+        if bounds:
+            values = array.reshape(len(array), components)
+            accessor["min"] = values.min(axis=0).tolist()
+            accessor["max"] = values.max(axis=0).tolist()
+        self.gltf["accessors"].append(accessor)
+        return len(self.gltf["accessors"]) - 1
+
+    def add_mesh(self, mesh):
+        positions, normals, uvs, indices = triangulate(mesh)
+        quantized, translation, scale = quantize_positions(positions)
+        attributes = {"POSITION": self.add_accessor(quantized, ARRAY_BUFFER, bounds=True)}
+        if normals is not None:
+            attributes["NORMAL"] = self.add_accessor(quantize_normals(normals), ARRAY_BUFFER, normalized=True)
+        uv_data = quantize_uvs(uvs)
+        attributes["TEXCOORD_0"] = self.add_accessor(uv_data, ARRAY_BUFFER, normalized=uv_data.dtype != np.float32)
+        index_type = np.uint16 if len(positions) < 65536 else np.uint32
+        primitive = {
+            "attributes": attributes,
+            "indices": self.add_accessor(indices.astype(index_type), ELEMENT_ARRAY_BUFFER),
+            "mode": 4,
+        }
+        self.gltf["meshes"].append({"name": mesh.name, "primitives": [primitive]})
+        return len(self.gltf["meshes"]) - 1, translation, scale
+
+    def add_node(self, node, parent=None):
+        self.gltf["nodes"].append(node)
+        index = len(self.gltf["nodes"]) - 1
+        if parent is None:
+            self.gltf["scenes"][0]["nodes"].append(index)
+        else:
+            self.gltf["nodes"][parent].setdefault("children", []).append(index)
+        return index
+
+    def add_animation(self, name, channels):
+        """
+        Adds an animation of LINEAR samplers.
+
+        Parameters:
+          name (str): The animation name.
+          channels (list): (node index, path, times, values) tuples, one per sampler.
+        """
+        animation = {"name": name, "channels": [], "samplers": []}
+        for node, path, times, values in channels:
+            normalized = values.dtype != np.float32
+            animation["samplers"].append({
+                "input": self.add_accessor(np.asarray(times, dtype=np.float32), None, bounds=True),
+                "output": self.add_accessor(values, None, normalized=normalized),
+                "interpolation": "LINEAR",
+            })
+            animation["channels"].append({"sampler": len(animation["samplers"]) - 1,
+                                          "target": {"node": node, "path": path}})
+        self.gltf.setdefault("animations", []).append(animation)
+
+    def tobytes(self):
+        self._align()
+        self.gltf["buffers"] = [{"byteLength": len(self.binary)}]
+        if not self.gltf["meshes"]:
+            # Animation-only files have no quantized attributes, and glTF forbids empty arrays.
+            for key in ("meshes", "extensionsUsed", "extensionsRequired"):
+                del self.gltf[key]
+        json_chunk = json.dumps(self.gltf, sort_keys=True, separators=(",", ":")).encode("utf-8")
+        json_chunk += b" " * (-len(json_chunk) % 4)
+        length = 12 + 8 + len(json_chunk) + 8 + len(self.binary)
+        return b"".join([
+            struct.pack("<III", GLB_MAGIC, GLB_VERSION, length),
+            struct.pack("<II", len(json_chunk), CHUNK_JSON), json_chunk,
+            struct.pack("<II", len(self.binary), CHUNK_BIN), bytes(self.binary),
+        ])
+
+    def _align(self):
+        self.binary.extend(b"\0" * (-len(self.binary) % 4))
+
+
+def _quaternion_xyz(rotation):
+    """Returns the (x, y, z, w) quaternion of Maya XYZ Euler angles in degrees."""
+    hx, hy, hz = (np.radians(np.asarray(rotation, dtype=np.float64)) / 2).tolist()
+    qx = np.array([np.sin(hx), 0, 0, np.cos(hx)])
+    qy = np.array([0, np.sin(hy), 0, np.cos(hy)])
+    qz = np.array([0, 0, np.sin(hz), np.cos(hz)])
+    # XYZ order applies X first, so the combined rotation is qz * qy * qx.
+    return _quaternion_multiply(qz, _quaternion_multiply(qy, qx))
+
+
+def _quaternion_multiply(a, b):
+    ax, ay, az, aw = a
+    bx, by, bz, bw = b
+    return np.array([
+        aw * bx + ax * bw + ay * bz - az * by,
+        aw * by - ax * bz + ay * bw + az * bx,
+        aw * bz + ax * by - ay * bx + az * bw,
+        aw * bw - ax * bx - ay * by - az * bz,
+    ])
+
+
+def export_glb(path, meshes, instances=None, groups=None, parents=None, tracks=None, clip_name="animation",
+               quantize_rotations=False, extras=None):
+    """
+    Writes meshes to a GLB file with quantized attributes.
+
+    Every mesh gets a node carrying its dequantization transform. Instances
+    reuse a mesh under extra rotated nodes, so copies such as the outline rings
+    are stored once; meshes used by instances get no node of their own.
+
+    Parameters:
+      path (str): The .glb file to write.
+      meshes (list): The MeshData to export.
+      instances (list): Optional (mesh index, name, rotation) tuples adding a
+        node that shows meshes[mesh index] rotated by Maya XYZ Euler degrees.
+      groups (list): Optional (name, parent name, translation) tuples adding
+        empty nodes, parents first. A parent name of None puts the node at the
+        root; translation may be None.
+      parents (dict): Optional {mesh name: group name} placing mesh nodes in groups.
+      tracks (list): Optional orbit_animation.AnimationTrack written as one
+        clip. Mesh nodes carry their dequantization transform, so tracks must
+        target groups.
+      clip_name (str): The clip name.
+      quantize_rotations (bool): Store quaternions as normalized int16 instead of float32.
+      extras (dict): Optional {mesh name: dict} stored as the extras of the mesh's nodes.
+
+    Returns:
+      int: The number of bytes written.
+    """
+    instances = instances or []
+    parents = parents or {}
+    extras = extras or {}
+    instanced = {mesh_index for mesh_index, _, _ in instances}
+    builder = _GlbBuilder()
+    groups_by_name = {}
+    for name, parent, translation in groups or []:
+        node = {"name": name}
+        if translation is not None:
+            node["translation"] = np.asarray(translation, dtype=np.float64).tolist()
+        parent = groups_by_name[parent] if parent is not None else None
+        groups_by_name[name] = builder.add_node(node, parent=parent)
+
+    quantized = []
+    for i, mesh in enumerate(meshes):
+        mesh_index, translation, scale = builder.add_mesh(mesh)
+        quantized.append((mesh_index, translation, scale))
+        if i not in instanced:
+            parent = groups_by_name[parents[mesh.name]] if mesh.name in parents else None
+            builder.add_node(_dequantize_node(mesh.name, mesh_index, translation, scale, extras.get(mesh.name)),
+                             parent=parent)
+
+    for mesh_index, name, rotation in instances:
+        parent = builder.add_node({"name": name, "rotation": _quaternion_xyz(rotation).tolist()})
+        index, translation, scale = quantized[mesh_index]
+        mesh_name = meshes[mesh_index].name
+        builder.add_node(_dequantize_node(mesh_name, index, translation, scale, extras.get(mesh_name)), parent=parent)
+
+    if tracks:
+        for track in tracks:
+            if track.node not in groups_by_name:
+                raise KeyError("Track of %s targets no group of the file" % track.node)
+        builder.add_animation(clip_name, _track_channels(tracks, groups_by_name.__getitem__, quantize_rotations))
+
+    data = builder.tobytes()
+    with open(path, "wb") as f:
+        f.write(data)
+    return len(data)
+
+
+def _dequantize_node(name, mesh_index, translation, scale, extras=None):
+    node = {
+        "name": name,
+        "mesh": mesh_index,
+        "translation": np.asarray(translation, dtype=np.float64).tolist(),
+        "scale": [float(scale)] * 3,
+    }
+    if extras:
+        node["extras"] = extras
+    return node
+
+
+def _outline_instances(outline_total):
+    """Returns the export_glb instances of the motion structure (mesh 0) and its light (mesh 1) per outline copy."""
+    instances = []
+    for _, name, rotation in geometry.outline_placements(outline_total):
+        instances.append((0, name, rotation))
+        instances.append((1, name + "_Light", rotation))
+    return instances
+
+
+def export_sculpture(path, radius=geometry.RADIUS, subdivisions=geometry.TORUS_SUBDIVISIONS, outline_total=5,
+                     orbit_total=geometry.ORBIT_TOTAL, planets=False, animation=False, frames=None,
+                     tolerance=orbit_animation.KEY_TOLERANCE):
+    """
+    Writes the whole sculpture to one GLB.
+
+    The motion structure and light torus are stored once and instanced for
+    every outline copy. Each orbit ring is a group named like the ring groups
+    of create_orbit, holding its inner and outer side with cylindrical UVs,
+    the inner side smoothed like create_orbit, and optionally its planets,
+    each a group translated to its frame 0 position around the planet mesh.
+    With animation, the baked orbit clip is written into the same file, its
+    tracks bound to those groups.
+
+    Parameters:
+      planets (bool): Also write the planets riding on each ring.
+      animation (bool): Also write the baked orbit animation clip.
+      frames (int): Number of baked frames, by default one turn of the slowest ring.
+      tolerance (float): Largest error of the reduced tracks, or None to keep every frame.
+
+    Returns:
+      int: The number of bytes written.
+    """
+    meshes = [
+        geometry.motion_structure(radius=radius, subdivisions=subdivisions),
+        geometry.motion_structure_light(radius=radius, subdivisions=subdivisions),
+        geometry.hypatia_sphere(radius=radius),
+    ]
+    groups = [("SM_Orbit_Group", None, None)]
+    parents = {}
+    for i in range(orbit_total):
+        ring_name = orbit_animation.ring_name(i)
+        groups.append((ring_name, "SM_Orbit_Group", None))
+        ring = geometry.orbit_ring(i, total=orbit_total, radius=radius, subdivisions=subdivisions)
+        inner, outer = geometry.split_by_radial_normal(ring, inner_name="SM_Inner%s" % i, outer_name="SM_Outer%s" % i)
+        meshes.extend([subdivision.subdivide(geometry.cylindrical_uvs(inner), levels=geometry.ORBIT_SMOOTH_DIVISIONS),
+                       geometry.cylindrical_uvs(outer)])
+        parents[inner.name] = parents[outer.name] = ring_name
+
+        positions = geometry.orbit_planet_positions(geometry.orbit_ring_radius(i, orbit_total, radius),
+                                                    geometry.orbit_planet_angles(i, orbit_total))
+        for j, position in enumerate(positions if planets else []):
+            planet_name = orbit_animation.planet_name(i, j)
+            groups.append((planet_name, ring_name, position))
+            meshes.append(geometry.orbit_planet(i, total=orbit_total, radius=radius, name=planet_name + "Shape"))
+            parents[planet_name + "Shape"] = planet_name
+
+    tracks = None
+    if animation:
+        baked = orbit_animation.bake_orbit(total=orbit_total, radius=radius, frames=frames, planets=planets)
+        tracks = orbit_animation.animation_tracks(baked, tolerance)
+    return export_glb(path, meshes, _outline_instances(outline_total), groups, parents, tracks, clip_name="orbit")
+
+
+def export_lods(path, factors=lod.LOD_FACTORS, radius=geometry.RADIUS, subdivisions=geometry.TORUS_SUBDIVISIONS,
+                outline_total=5, orbit_total=geometry.ORBIT_TOTAL):
+    """
+    Writes the sculpture once per level of detail, one GLB per level.
+
+    Level i goes to <path stem>_LOD<i>.glb, laid out like export_sculpture
+    without planets: every component is lod.build_sculpture_lods' mesh at that
+    level, its node named <component>_LOD<i> with the level's factor and
+    geometric_error in its extras, so a viewer can switch files by distance
+    with lod.select_lod.
+
+    Parameters:
+      path (str): The .glb path the level files are named after.
+      factors (tuple): Resolution factors, finest first.
+
+    Returns:
+      list: The paths written, finest level first.
+    """
+    lods = lod.build_sculpture_lods(factors, radius=radius, subdivisions=subdivisions, total=orbit_total)
+    stem = os.path.splitext(path)[0]
+    paths = []
+    for level in range(len(factors)):
+        components = ["SM_Motion_Structure", "SM_Motion_Structure_Light", "SM_Hypatia"]
+        groups = [("SM_Orbit_Group", None, None)]
+        parents = {}
+        for i in range(orbit_total):
+            ring_name = orbit_animation.ring_name(i)
+            groups.append((ring_name, "SM_Orbit_Group", None))
+            for side in ["SM_Inner%s" % i, "SM_Outer%s" % i]:
+                components.append(side)
+                parents[lods[side][level].mesh.name] = ring_name
+
+        levels = [lods[name][level] for name in components]
+        extras = {lod_level.mesh.name: {"factor": lod_level.factor, "geometric_error": lod_level.geometric_error}
+                  for lod_level in levels}
+        paths.append("%s_LOD%d.glb" % (stem, level))
+        export_glb(paths[-1], [lod_level.mesh for lod_level in levels], _outline_instances(outline_total), groups,
+                   parents, extras=extras)
+    return paths
+
+
+def export_animation(path, tracks, parents=None, name="animation", quantize_rotations=False):
+    """
+    Writes animation tracks to a GLB holding the animated nodes and one animation clip.
+
+    The nodes carry no meshes; players bind the clip to their own objects by
+    node name, as three.js does with AnimationClip tracks.
+
+    Parameters:
+      path (str): The .glb file to write.
+      tracks (list): orbit_animation.AnimationTrack of the clip.
+      parents (dict): Optional {node name: parent node name} hierarchy of the nodes.
+      name (str): The clip name.
+      quantize_rotations (bool): Store quaternions as normalized int16 instead of float32.
+
+    Returns:
+      int: The number of bytes written.
+    """
+    parents = parents or {}
+    builder = _GlbBuilder()
+    nodes = {}
+
+    def node_index(node_name):
+        if node_name not in nodes:
+            parent = parents.get(node_name)
+            parent = node_index(parent) if parent is not None else None
+            nodes[node_name] = builder.add_node({"name": node_name}, parent=parent)
+        return nodes[node_name]
+
+    builder.add_animation(name, _track_channels(tracks, node_index, quantize_rotations))
+
+    data = builder.tobytes()
+    with open(path, "wb") as f:
+        f.write(data)
+    return len(data)
+
+
+def _track_channels(tracks, node_index, quantize_rotations=False):
+    """Returns the (node index, path, times, values) channels of tracks, node_index mapping node names."""
+    channels = []
+    for track in tracks:
+        values = np.asarray(track.values, dtype=np.float32)
+        if track.path == "rotation" and quantize_rotations:
+            values = np.round(np.clip(values, -1, 1) * 32767).astype(np.int16)
+        channels.append((node_index(track.node), track.path, track.times, values))
+    return channels
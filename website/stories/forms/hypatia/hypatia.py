@@ -1,35 +1,29 @@
 import pymel.core as pm
-import pymel.core.datatypes as dt
-import math
+import argparse
+import contextlib
+import sys
+import numpy as np
+
+from hypatia_geometry import (
+    RADIUS, TORUS_SUBDIVISIONS, OUTLINE_RADIUS, ORBIT_PROFILE_RADIUS, LIGHT_RADIUS,
+    HYPATIA_RADIUS, ORBIT_TOTAL, normalize_range,
+)
+import hypatia_geometry as geometry
+from build_cache import BuildCache
+from build_graph import BuildGraph
+from maya_context import build_context
+from maya_mesh import create_mesh, update_mesh
+from maya_anim import create_anim_curves
+import orbit_animation
+import subdivision
+
+# Generated meshes are reused across runs while their parameters are unchanged.
+cache = BuildCache()
 
-RADIUS = 25.0
-TORUS_SUBDIVISIONS = 200.0
-
-# Outline
-OUTLINE_RADIUS = 1
-ORBIT_PROFILE_RADIUS = 0.5
-
-# Hypatia
-HYPATIA_RADIUS = 0.05
-
-# Orbit
-ORBIT_THICKNESS = 0.005
-ORBIT_HEIGHT = HYPATIA_RADIUS*2
-
-# ----------------------------------------------------
-# Utility Function: Linear Interpolation (lerp)
-# ----------------------------------------------------
-def lerp(a, b, t):
-    """Linearly interpolate between a and b by t."""
-    return a + (b - a) * t
-
- # Define the mapLinear equivalent function
-def mapLinear(value, in_min, in_max, out_min, out_max):
-    return out_min + (value - in_min) * (out_max - out_min) / (in_max - in_min)
 
 def create_light_torus(major_radius=10, minor_radius=1, subdivisions_major=20, subdivisions_minor=10, name="regularTorus"):
     """
-    Creates a regular torus mesh using the polyTorus command.
+    Creates a regular torus mesh with the topology of polyTorus.
 
     Parameters:
       major_radius (float): The major (ring) radius of the torus.
@@ -41,8 +35,9 @@ def create_light_torus(major_radius=10, minor_radius=1, subdivisions_major=20, s
     Returns:
       PyNode: The created torus mesh.
     """
-    torus_mesh = pm.polyTorus(r=major_radius, sr=minor_radius, sx=subdivisions_major, sy=subdivisions_minor, name=name)[0]
-    pm.select(torus_mesh)
+    torus_mesh = create_mesh(cache.build(geometry.torus, major_radius=major_radius, minor_radius=minor_radius,
+                                         subdivisions_major=subdivisions_major,
+                                         subdivisions_minor=subdivisions_minor, name=name))
     return torus_mesh
 
 
@@ -55,304 +50,347 @@ def adjust_uvs_to_range(mesh, projection_scale_u=1, projection_scale_v=1):
     - projection_scale_u: Scaling factor for U-axis in cylindrical projection (default is 1).
     - projection_scale_v: Scaling factor for V-axis in cylindrical projection (default is 1).
     """
-    # Perform cylindrical projection
-    pm.select(mesh)
-    pm.polyCylindricalProjection(mesh, projectionScaleU=projection_scale_u, projectionScaleV=projection_scale_v, smartFit=True)
+    # Perform cylindrical projection on every face of the mesh.
+    pm.polyCylindricalProjection(mesh.getShape().f, projectionScaleU=projection_scale_u, projectionScaleV=projection_scale_v, smartFit=True)
     
-    # Now adjust the UV coordinates to ensure they fit in the 0-1 range.
-    uvs = pm.polyListComponentConversion(mesh, toUV=True)
-    uvs = pm.ls(uvs, flatten=True)
-
-    # Calculate the range of UVs along U-axis
-    min_u = float('inf')
-    max_u = float('-inf')
+    # Bake the projection so the bulk write below is not overridden by history.
+    pm.delete(mesh, constructionHistory=True)
 
-    # Loop through each UV and calculate its U value
-    for uv in uvs:
-        u_value = pm.polyEditUV(uv, query=True, u=True)[0]
-        min_u = min(min_u, u_value)
-        max_u = max(max_u, u_value)
-
-    # Apply mapLinear and clamp the values to the range [0, 1]
-    for uv in uvs:
-        u_value = pm.polyEditUV(uv, query=True, u=True)[0]
-        mapped_u = mapLinear(u_value, min_u, max_u, 0.0, 1.0)
-        clamped_u = max(0.0, min(1.0, mapped_u))  # Clamp the value to [0, 1]
-        pm.select(uv)  # Select the individual UV
-        pm.polyEditUV(pivotU=0.5, pivotV=0.5, uValue=clamped_u, relative=False)  # Apply the new UV value
+    # Now adjust the UV coordinates to ensure they fit in the 0-1 range.
+    normalize_uvs(mesh)
 
 
-# ----------------------------------------------------
-# Function: Create a Closed Quadrant Profile
-# ----------------------------------------------------
-def create_quadrant_profile(circle_radius=1.0, cross_thickness=0.5, arc_sections=8):
+def normalize_uvs(meshes, uv_sets=None, normalize_v=False):
     """
-    Creates a fully closed quadrant curve profile.
-    
-    The profile:
-      1. Starts at the bottom-left corner of the cross.
-      2. Goes to the horizontal intersection.
-      3. Follows an arc (using lerp for smooth spacing) from the horizontal to vertical intersection.
-      4. Ends at the vertical intersection and closes back at the corner.
-    """
-    # Compute intersection points.
-    x_intersect = math.sqrt(circle_radius**2 - cross_thickness**2)
-    y_intersect = math.sqrt(circle_radius**2 - cross_thickness**2)
-    
-    pt_horizontal = (x_intersect, cross_thickness, 0)   # Intersection on horizontal bar.
-    pt_vertical   = (cross_thickness, y_intersect, 0)    # Intersection on vertical bar.
-    pt_corner     = (cross_thickness, cross_thickness, 0)  # Bottom-left corner.
-    
-    # Compute arc angles.
-    angle_start = math.degrees(math.atan2(cross_thickness, x_intersect))
-    angle_end   = math.degrees(math.atan2(y_intersect, cross_thickness))
-    
-    # Build list of points.
-    points = []
-    points.append(pt_corner)         # Start at corner.
-    points.append(pt_horizontal)     # Go to horizontal intersection.
-    
-    # Generate arc points using lerp for smooth spacing.
-    arc_points = []
-    for i in range(arc_sections + 1):  # Include endpoint.
-        angle = math.radians(lerp(angle_start, angle_end, i / arc_sections))
-        x = math.cos(angle) * circle_radius
-        y = math.sin(angle) * circle_radius
-        arc_points.append((x, y, 0))
-    points.extend(arc_points)
-    
-    points.append(pt_vertical)       # Move to vertical intersection.
-    points.append(pt_corner)         # Close loop.
-    
-    # Create the curve.
-    quadrant_curve = pm.curve(d=1, p=points, name="quadrantProfile")
-    pm.makeIdentity(quadrant_curve, apply=True, translate=True, rotate=True, scale=True)
-    pm.delete(quadrant_curve, constructionHistory=True)
-    return quadrant_curve
+    Remaps the UVs of one or more meshes into the 0-1 range in bulk.
 
-# ----------------------------------------------------
-# Function: Sweep a Profile Along a Circular Path
-# ----------------------------------------------------
-def sweep_profile(profile_curve, torus_radius=10, path_divisions=50):
+    Each UV set is read with a single query, remapped and clamped as one
+    NumPy operation by normalize_range, and written back with a single call,
+    instead of querying and editing every UV individually.
 
+    Parameters:
+      meshes (PyNode or list): Mesh transforms or shapes to normalize.
+      uv_sets (list): UV set names to process. Defaults to every UV set of each mesh.
+      normalize_v (bool): Also remap the V axis. U is always remapped.
     """
-    Sweeps the provided profile curve along a circular path to create a torus-like mesh.
-    
-    The profile is moved to the torus edge and rotated so that it is perpendicular to the path.
-    """
-    # Create the circular sweep path.
-    circle_path = pm.circle(radius=torus_radius, normal=(0, 1, 0), 
-                            sections=path_divisions, name="torusPath")[0]
-    
-    # Align the profile: move it so its origin sits at the torus edge.
-    pm.xform(profile_curve, translation=(torus_radius, 0, 0))
-    # Rotate the profile so that it's perpendicular to the path.
-    pm.xform(profile_curve, rotation=(0, 90, 0), worldSpace=True)
-    
-    # Perform the sweep (extrude in pipe mode).
-    swept = pm.extrude(profile_curve, circle_path, et=2, upn=True, 
-                       fixedPath=True, scale=1, useComponentPivot=True, 
-                       name="sweptTorus")[0]
-    
-    # Cleanup the construction curves.
-    pm.delete(profile_curve, circle_path)
-    return swept
+    for shape in _mesh_shapes(meshes):
+        for uv_set in uv_sets or shape.getUVSetNames():
+            us, vs = shape.getUVs(uvSet=uv_set)
+            us = normalize_range(np.asarray(us, dtype=np.float64))
+            vs = np.asarray(vs, dtype=np.float64)
+            if normalize_v:
+                vs = normalize_range(vs)
+            shape.setUVs(us.tolist(), vs.tolist(), uvSet=uv_set)
+
+
+def _mesh_shapes(meshes):
+    """Resolves transforms to their mesh shapes, leaving shapes untouched."""
+    shapes = []
+    for node in pm.ls(meshes):
+        if isinstance(node, pm.nt.Transform):
+            node = node.getShape()
+        if node is not None:
+            shapes.append(node)
+    return shapes
 
 
 # ----------------------------------------------------
-# MAIN PROCESS: Duplicate, Sweep, and Combine Quadrants
+# MAIN PROCESS: Sweep and Combine Quadrants
 # ----------------------------------------------------
+@build_context()
 def create_motion_orbit_sculpture():
-    circle_radius = OUTLINE_RADIUS*ORBIT_PROFILE_RADIUS
-    # Create the original quadrant profile.
-    original_profile = create_quadrant_profile(circle_radius=circle_radius, cross_thickness=circle_radius*0.25, arc_sections=8)
-    
-    swept_meshes = []
-    # Define the rotation angles for the four quadrants.
-    for angle in [0, 90, 180, 270]:
-        # Duplicate the original quadrant profile.
-        profile_dup = pm.duplicate(original_profile)[0]
-        # Rotate it about the Z-axis by the specified angle.
-        pm.xform(profile_dup, rotation=(0, 0, angle), relative=True, worldSpace=True)
-        pm.makeIdentity(profile_dup, apply=True, translate=True, rotate=True, scale=True)
-        # Sweep the rotated profile along the torus path.
-        swept = sweep_profile(profile_dup, torus_radius=OUTLINE_RADIUS*RADIUS, path_divisions=TORUS_SUBDIVISIONS)
-        # swept_meshes.append(swept)
-
-        poly_mesh = pm.nurbsToPoly(swept, format=3, polygonType=1, name="polySweptTorus")[0]
-        pm.polyNormal(poly_mesh, normalMode=0, userNormalMode=0)
-        pm.delete(swept)
-        swept_meshes.append(poly_mesh)
-    
-    
-    # Combine all the swept meshes into one final torus.
-    full_torus = pm.polyUnite(swept_meshes, ch=False, mergeUVSets=True, name="SM_Motion_Structure")[0]
-    pm.delete(full_torus, constructionHistory=True)
-    pm.select(full_torus)
-    pm.polyNormal(full_torus, normalMode=0, userNormalMode=0)
+    # Sweep the four quadrant profiles straight to polygons and combine them.
+    full_torus = create_mesh(cache.build(geometry.motion_structure, radius=RADIUS, outline_radius=OUTLINE_RADIUS,
+                                         profile_radius=ORBIT_PROFILE_RADIUS, subdivisions=TORUS_SUBDIVISIONS,
+                                         name="SM_Motion_Structure"))
 
-    light = create_light_torus(OUTLINE_RADIUS*RADIUS, 0.1, TORUS_SUBDIVISIONS, 25, "SM_Motion_Structure_Light")
+    light = create_light_torus(OUTLINE_RADIUS*RADIUS, LIGHT_RADIUS, TORUS_SUBDIVISIONS, 25, "SM_Motion_Structure_Light")
 
     group = pm.group(em=True, name="SM_Motion_Structure_Group")
     pm.parent(full_torus, group)
     pm.parent(light, group)
     pm.xform(group, centerPivots=True)
-    pm.delete(original_profile)
 
     return group
 
 
 
-def create_outline(group, total=1):
-    groupX = pm.group(em=True, name="SM_Structure_X_Group")
-    groupY = pm.group(em=True, name="SM_Structure_Y_Group")
-    groupZ = pm.group(em=True, name="SM_Structure_Z_Group")
-    for i in range(total):
-          theta = i * (360 / total)
-          
-          meshX = pm.duplicate(group)[0]
-          meshZ = pm.duplicate(group)[0]
-          pm.parent(meshX, groupX)
-          pm.parent(meshZ, groupZ)
-
-          meshX.rename("SM_Motion_Structure_X%s" % i)
-          meshZ.rename("SM_Motion_Structure_Z%s" % i)
-
-          meshX.rotateX.set(theta)
-          meshZ.rotate.set(0, 90, theta)
-
-          if i != 0:
-            meshY = pm.duplicate(group)[0]
-            meshY.rename("SM_Motion_Structure_Y%s" % i)
-            meshY.rotate.set(90, theta, 0)
-            pm.parent(meshY, groupY)
-
-    pm.delete(group)
-    group2 = pm.group(em=True, name="SM_Motion_Structure%s" % i)
-    pm.parent(groupX, group2)
-    pm.parent(groupY, group2)
-    pm.parent(groupZ, group2)
+@build_context()
+def create_outline(group, total=1, instance=False):
+    """
+    Copies the motion structure group into rings rotated around X, Y and Z.
+
+    Parameters:
+      group (PyNode): The motion structure group to copy.
+      total (int): Number of rotation steps per axis.
+      instance (bool): Make every copy an instance sharing the group's shape
+        nodes instead of a deep duplicate. The group itself becomes the first
+        X copy, so the scene holds one set of meshes plus transforms.
+
+    Returns:
+      PyNode: The group holding the X, Y and Z groups.
+    """
+    axis_groups = {
+        "X": pm.group(em=True, name="SM_Structure_X_Group"),
+        "Y": pm.group(em=True, name="SM_Structure_Y_Group"),
+        "Z": pm.group(em=True, name="SM_Structure_Z_Group"),
+    }
+    for index, (axis, name, rotation) in enumerate(geometry.outline_placements(total)):
+        if not instance:
+            mesh = pm.duplicate(group)[0]
+        elif index == 0:
+            mesh = group
+        else:
+            mesh = pm.instance(group)[0]
+        pm.parent(mesh, axis_groups[axis])
+        mesh.rename(name)
+        mesh.rotate.set(rotation)
+
+    if not instance:
+        pm.delete(group)
+    group2 = pm.group(em=True, name="SM_Motion_Structure%s" % (total - 1))
+    pm.parent(axis_groups["X"], group2)
+    pm.parent(axis_groups["Y"], group2)
+    pm.parent(axis_groups["Z"], group2)
     return group2
 
+@build_context()
 def create_hypatia():
-    radius = float(RADIUS * HYPATIA_RADIUS)
-    sphere = pm.polySphere(name="SM_Hypatia", radius=radius, subdivisionsX=100, subdivisionsY=50)
+    sphere = create_mesh(cache.build(geometry.hypatia_sphere, radius=RADIUS, hypatia_radius=HYPATIA_RADIUS,
+                                     name="SM_Hypatia"))
     return sphere
 
 
-def create_orbit():
-    total = 7
-    thickness = RADIUS * ORBIT_THICKNESS
-    extrusion_thickness = RADIUS * ORBIT_THICKNESS
-    height = RADIUS * ORBIT_HEIGHT
-    min_radius = RADIUS / 5
-    max_radius = RADIUS * (6/7)
-    SM_AXIS_RATIO = 1 / math.sqrt(3)  # ~0.577
+@build_context()
+def create_orbit(total=ORBIT_TOTAL, planets=False):
+    """
+    Builds the orbit rings at their frame 0 pose.
+
+    Parameters:
+      total (int): Number of orbit rings.
+      planets (bool): Also build the planets riding on each ring, which hypatia.ts leaves out.
+
+    Returns:
+      tuple: (ring groups, ring speeds in radians per second, planet transforms).
+    """
     group = pm.group(em=True, name="SM_Orbit_Group")
 
     orbit_meshes = []
-    ring_speeds = []
-    planets = []
+    ring_speeds = orbit_animation.ring_speeds(total).tolist()
+    planet_meshes = []
 
     for i in range(total):
-        p = i / (total - 1) if total > 1 else 0
-        ring_radius = min_radius + p * (max_radius - min_radius)
-        perspective_factor_y = SM_AXIS_RATIO + p * (SM_AXIS_RATIO * (1 + SM_AXIS_RATIO) - SM_AXIS_RATIO)
-
-        # Create a polyPlane as the base for our square profile.
-        profile_poly = pm.polyPlane(width=height, height=height, subdivisionsX=1, subdivisionsY=1,
-                                    name=f'ProfilePoly_{i}')[0]
-        # Scale the plane to get the desired extrusion thickness.
-        pm.xform(profile_poly, scale=(extrusion_thickness, 1, 1))
-        # Rotate it so the face is oriented correctly for the sweep.
-        pm.xform(profile_poly, rotation=(90, 90, 0))
-
-        # Convert the polyPlane to a NURBS curve ("nurb square") by converting its border edges.
-        edges = pm.polyListComponentConversion(profile_poly, toEdge=True)
-        pm.select(edges, r=True)
-        profile_curve = pm.polyToCurve(form=2, degree=1, name=f'ProfileCurve_{i}')[0]
-        pm.delete(profile_poly)
-        pm.select(clear=True)
-
-        circle_path = pm.circle(radius=ring_radius, normal=(0, 1, 0), 
-                                sections=TORUS_SUBDIVISIONS, name="torusPath")[0]
-        # pm.xform(circle_path, scale=(perspective_factor_y, 1, 1))  # Apply elliptical scaling
-        
-        # Align the profile: move it so its origin sits at the torus edge.
-        pm.xform(profile_curve, translation=(ring_radius, 0, 0))
-        # Rotate the profile so that it's perpendicular to the path.
-        pm.xform(profile_curve, rotation=(0, 90, 0), worldSpace=True)
-        
-        # Perform the sweep (extrude in pipe mode).
-        swept = pm.extrude(profile_curve, circle_path, et=2, upn=True, 
-                        fixedPath=True, scale=1, useComponentPivot=True, 
-                        name="sweptTorus")[0]
-        
-        poly_mesh = pm.nurbsToPoly(swept, format=3, polygonType=1, name="polySweptTorus")[0]
-        pm.polySoftEdge(poly_mesh, angle=0, ch=1)
-
-        pm.delete(swept)
-    
-        # Cleanup the construction curves.
-        pm.delete(profile_curve, circle_path)
+        # Sweep the square profile straight to polygons, centered on the origin with hard edges.
+        ring = cache.build(geometry.orbit_ring, index=i, total=total, radius=RADIUS, subdivisions=TORUS_SUBDIVISIONS)
 
-        # Center the resulting swept mesh.
-        bbox = pm.exactWorldBoundingBox(poly_mesh)
-        center = ((bbox[0] + bbox[3]) / 2.0,
-                  (bbox[1] + bbox[4]) / 2.0,
-                  (bbox[2] + bbox[5]) / 2.0)
-        pm.move(-center[0], -center[1], -center[2], poly_mesh, r=True)
-        pm.xform(poly_mesh, centerPivots=True)
-        # pm.rotate(poly_mesh, lerp(-45, 45, p), 0, lerp(0, 270, p))
+        # --- Separate the inner side of the ring ---
+        # Faces whose normals point away from the ring axis form the outer side,
+        # the top, bottom and inner wall form the inner side. Each side is built
+        # directly from its faces, with no duplicate-then-delete.
+        inner, outer = geometry.split_by_radial_normal(ring, inner_name="SM_Inner%s" % i,
+                                                       outer_name="SM_Outer%s" % i)
 
+        # UV mapping using cylindrical projection, the inner side before it is smoothed.
+        inner = geometry.cylindrical_uvs(inner)
+        outer = geometry.cylindrical_uvs(outer)
+
+        # Smooth the inner side like polySmooth(divisions=2, keepBorder=1). Every
+        # ring shares the same topology, so the stencil is built once and reused.
+        inner = subdivision.subdivide(inner, levels=geometry.ORBIT_SMOOTH_DIVISIONS)
+
+        ringGroup = pm.group(em=True, name=orbit_animation.ring_name(i))
+        create_mesh(inner, parent=ringGroup)
+        create_mesh(outer, parent=ringGroup)
+
+        pm.parent(ringGroup, group)
+        orbit_meshes.append(ringGroup)
 
-            # --- Separate the inner side of poly_mesh ---
-        # Here we calculate the full 3D distance from (0,0,0) for each face's center.
+        # Planets ride on their ring, so they turn with it.
+        positions = geometry.orbit_planet_positions(geometry.orbit_ring_radius(i, total, RADIUS),
+                                                    geometry.orbit_planet_angles(i, total))
+        for j, position in enumerate(positions.tolist() if planets else []):
+            planet = create_mesh(cache.build(geometry.orbit_planet, index=i, total=total, radius=RADIUS,
+                                             name=orbit_animation.planet_name(i, j)), parent=ringGroup)
+            planet.translate.set(position)
+            planet_meshes.append(planet)
 
-        mm = pm.PyNode(poly_mesh)
+    return orbit_meshes, ring_speeds, planet_meshes
 
-        # Duplicate the mesh
-        inner_side = pm.duplicate(mm, name="SM_Inner%s" % i)[0]
-        outer_side = pm.duplicate(mm, name="SM_Outer%s" % i)[0]
 
+@build_context()
+def bake_orbit_animation(total=ORBIT_TOTAL, frames=None, tolerance=orbit_animation.KEY_TOLERANCE, planets=False):
+    """
+    Keys the rings, and planets if any, built by create_orbit with the baked orbit animation.
 
-        # Define face range (adjust dynamically if needed)
-        face_count = len(mm.faces)-1
+    Every frame is evaluated at once by orbit_animation.bake_orbit, reduced
+    within tolerance and written with one anim curve per moving channel.
 
-        # Delete inner faces from the outer mesh
-        pm.delete(outer_side.f[0:599])
+    Parameters:
+      total (int): Number of orbit rings, as given to create_orbit.
+      frames (int): Number of frames, by default one turn of the slowest ring.
+      tolerance (float): Largest error of the reduced curves, or None to key every frame.
+      planets (bool): Key the planets too, as given to create_orbit.
 
-        # Delete outer faces from the inner mesh
-        pm.delete(inner_side.f[600:face_count])
+    Returns:
+      list: The names of the created anim curves.
+    """
+    animation = orbit_animation.bake_orbit(total=total, radius=RADIUS, frames=frames, planets=planets)
+    return create_anim_curves(orbit_animation.anim_curves(animation, tolerance))
 
-        ringGroup = pm.group(em=True, name="SM_Orbit%s" % i)
 
-        # Parent both parts to the group
-        pm.parent(inner_side, ringGroup)
-        pm.parent(outer_side, ringGroup)
+# ----------------------------------------------------
+# Incremental rebuilds
+# ----------------------------------------------------
+@build_context()
+def create_sculpture_graph(outline_total=5, orbit_total=ORBIT_TOTAL, planets=False):
+    """
+    Builds the sculpture as a dependency graph of its components.
 
+    Every quadrant sweep, the combined structure and its light, each outline
+    copy, the inner and outer side and the optional planets of each orbit
+    ring, and the Hypatia sphere are nodes of the returned graph, built into the same
+    hierarchy as create_outline(instance=True), create_orbit and
+    create_hypatia. Edit a node's parameters with graph.set, then call
+    rebuild_sculpture: only the edited nodes and their dependents are rebuilt,
+    and their meshes are updated in place.
 
-        pm.parent(ringGroup, group)
+    Example:
+      graph = create_sculpture_graph()
+      graph.set("SM_Orbit3", subdivisions=400)
+      rebuild_sculpture(graph)  # ["SM_Orbit3", "SM_Inner3_Side", "SM_Inner3", "SM_Outer3"]
 
-        # Cleanup
-        pm.delete(mm)  
-                
-        # orbit_meshes.append(poly_mesh)
-        # pm.parent(poly_mesh, group)
+    Parameters:
+      outline_total (int): Number of rotation steps per axis of the outline copies.
+      orbit_total (int): Number of orbit rings.
+      planets (bool): Also build the planets riding on each ring.
 
-        # UV Mapping using Cylindrical Projection
-        adjust_uvs_to_range(outer_side, projection_scale_u=1, projection_scale_v=1)
-        adjust_uvs_to_range(inner_side, projection_scale_u=1, projection_scale_v=1)
+    Returns:
+      BuildGraph: The built graph.
+    """
+    graph = BuildGraph(cache)
+    shape = dict(radius=RADIUS, subdivisions=TORUS_SUBDIVISIONS)
 
-        pm.polySmooth(inner_side, subdivisionType=0, divisions=2, keepBorder=1, name="SM_Orbit_Smooth%s" % i)
-        # pm.select(inner_side)
+    # Motion structure: four quadrant sweeps welded into one mesh, and its light.
+    structure_group = pm.group(em=True, name="SM_Motion_Structure_Group")
+    for angle in [0, 90, 180, 270]:
+        graph.add("quadrant%s" % angle, geometry.motion_structure_quadrant, angle=angle, **shape)
+    graph.add("SM_Motion_Structure", geometry.combine_quadrants,
+              inputs=["quadrant%s" % angle for angle in [0, 90, 180, 270]],
+              update=_mesh_updater(structure_group), name="SM_Motion_Structure")
+    graph.add("SM_Motion_Structure_Light", geometry.motion_structure_light, update=_mesh_updater(structure_group),
+              **shape)
+
+    # Outline copies instance the structure group, so they follow its meshes without being rebuilt.
+    outline_group = pm.group(em=True, name="SM_Motion_Structure%s" % (outline_total - 1))
+    axis_groups = {axis: pm.group(em=True, name="SM_Structure_%s_Group" % axis, parent=outline_group)
+                   for axis in "XYZ"}
+    for index, (_, name, _) in enumerate(geometry.outline_placements(outline_total)):
+        graph.add(name, geometry.outline_placement, update=_outline_copy_updater(structure_group, axis_groups, index),
+                  index=index, total=outline_total)
+
+    # Orbit rings: each ring's sweep feeds its inner and outer side and its planets.
+    orbit_group = pm.group(em=True, name="SM_Orbit_Group")
+    for i in range(orbit_total):
+        ring_group = pm.group(em=True, name=orbit_animation.ring_name(i), parent=orbit_group)
+        ring = orbit_animation.ring_name(i)
+        graph.add(ring, geometry.orbit_ring, index=i, total=orbit_total, **shape)
+        graph.add("SM_Inner%s_Side" % i, geometry.orbit_ring_side, inputs=[ring], side="inner")
+        graph.add("SM_Inner%s" % i, subdivision.subdivide, inputs=["SM_Inner%s_Side" % i],
+                  update=_mesh_updater(ring_group), levels=geometry.ORBIT_SMOOTH_DIVISIONS,
+                  name="SM_Inner%s" % i)
+        graph.add("SM_Outer%s" % i, geometry.orbit_ring_side, inputs=[ring],
+                  update=_mesh_updater(ring_group), side="outer", name="SM_Outer%s" % i)
+        for j in range(geometry.PLANETS_PER_RING if planets else 0):
+            name = orbit_animation.planet_name(i, j)
+            graph.add(name, geometry.ring_planet, inputs=[ring],
+                      update=_mesh_updater(ring_group, _planet_placer(graph[ring], j)), name=name)
+
+    graph.add("SM_Hypatia", geometry.hypatia_sphere, update=_mesh_updater(), radius=RADIUS, name="SM_Hypatia")
+
+    graph.rebuild()
+    pm.xform(structure_group, centerPivots=True)
+    return graph
+
+
+@build_context()
+def rebuild_sculpture(graph):
+    """
+    Rebuilds the components of a create_sculpture_graph graph whose parameters changed.
 
-    pm.select(clear=True)
-    return orbit_meshes, ring_speeds, planets
+    Returns:
+      list: The names of the rebuilt nodes.
+    """
+    return graph.rebuild()
 
 
+def _mesh_updater(parent=None, finish=None):
+    """
+    Returns a graph update creating a node's mesh under parent, then replacing its geometry in place.
 
-# distribute_cubes_on_cube(big_size=500, grid=10, small_dims=(1, 1, 50.0))
-create_outline(create_motion_orbit_sculpture(), total=5)
-create_orbit()
-create_hypatia()
\ No newline at end of file
+    finish(mesh, node) runs after every build, for the steps done in Maya.
+    """
+    def update(node):
+        if node.scene is None:
+            mesh = create_mesh(node.output, parent=parent)
+        else:
+            mesh = update_mesh(node.scene, node.output)
+        if finish is not None:
+            finish(mesh, node)
+        return mesh
+    return update
+
+
+def _outline_copy_updater(structure_group, axis_groups, index):
+    """Returns a graph update placing outline copy index, the first copy being the structure group itself."""
+    def update(node):
+        axis, name, rotation = node.output
+        copy = node.scene
+        if copy is None:
+            copy = structure_group if index == 0 else pm.instance(structure_group)[0]
+            pm.parent(copy, axis_groups[axis])
+            copy.rename(name)
+        copy.rotate.set(rotation)
+        return copy
+    return update
+
+
+def _planet_placer(ring, planet):
+    """Returns a finish step moving planet to its frame 0 position on the orbit_ring node ring."""
+    def finish(mesh, node):
+        angle = geometry.orbit_planet_angles(ring.params["index"], ring.params["total"])[planet]
+        position = geometry.orbit_planet_positions(geometry.ring_mesh_radius(ring.output), angle)
+        mesh.translate.set(position.tolist())
+    return finish
+
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the Hypatia sculpture.")
+    parser.add_argument("--no-cache", action="store_true", help="Regenerate every mesh, bypassing the build cache.")
+    parser.add_argument("--profile", metavar="PATH",
+                        help="Profile the Maya commands, writing PATH.folded and PATH.json.")
+    parser.add_argument("--commands-per-vertex", type=float,
+                        help="With --profile, warn about builders issuing more commands per vertex.")
+    parser.add_argument("--planets", action="store_true", help="Add the planets riding on the orbit rings.")
+    parser.add_argument("--animate", action="store_true", help="Key the orbit rings and planets with the baked animation.")
+    args, _ = parser.parse_known_args()
+    cache.enabled = not args.no_cache
+
+    profiler = None
+    instrumentation = contextlib.nullcontext()
+    if args.profile:
+        import maya_mesh
+        from maya_profiler import CommandProfiler
+        profiler = CommandProfiler(commands_per_vertex=args.commands_per_vertex)
+        instrumentation = profiler.instrument(sys.modules[__name__], maya_mesh)
+
+    with instrumentation, build_context():
+        # distribute_cubes_on_cube(big_size=500, grid=10, small_dims=(1, 1, 50.0))
+        create_outline(create_motion_orbit_sculpture(), total=5)
+        create_orbit(planets=args.planets)
+        if args.animate:
+            bake_orbit_animation(planets=args.planets)
+        create_hypatia()
+
+    if profiler is not None:
+        profiler.write(args.profile)
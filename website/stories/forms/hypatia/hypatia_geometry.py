@@ -0,0 +1,958 @@
+"""
+Headless geometry core for the Hypatia sculpture.
+
+Every mesh built by hypatia.py is generated here as plain NumPy arrays, so the
+sculpture can be generated, profiled and tested without a Maya session.
+hypatia.py turns the arrays into scene nodes through maya_mesh.create_mesh.
+"""
+import logging
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+RADIUS = 25.0
+TORUS_SUBDIVISIONS = 200.0
+
+# Outline
+OUTLINE_RADIUS = 1
+ORBIT_PROFILE_RADIUS = 0.5
+LIGHT_RADIUS = 0.1
+
+# Hypatia
+HYPATIA_RADIUS = 0.05
+
+# Orbit
+ORBIT_THICKNESS = 0.005
+ORBIT_HEIGHT = HYPATIA_RADIUS*2
+ORBIT_TOTAL = 7
+# Subdivision levels of the inner side of every ring.
+ORBIT_SMOOTH_DIVISIONS = 2
+
+# Planets
+PLANET_RADIUS = 0.0075
+PLANET_SPIRAL = 810
+PLANETS_PER_RING = 2
+
+# Vertices closer than this are merged by weld_vertices.
+WELD_TOLERANCE = 1e-6
+
+
+# ----------------------------------------------------
+# Utility Function: Linear Interpolation (lerp)
+# ----------------------------------------------------
+def lerp(a, b, t):
+    """Linearly interpolate between a and b by t."""
+    return a + (b - a) * t
+
+ # Define the mapLinear equivalent function
+def mapLinear(value, in_min, in_max, out_min, out_max):
+    return out_min + (value - in_min) * (out_max - out_min) / (in_max - in_min)
+
+
+def normalize_range(values):
+    """Maps values linearly from their own min/max onto [0, 1] and clamps them."""
+    if values.size == 0:
+        return values
+    min_value, max_value = values.min(), values.max()
+    if max_value == min_value:
+        return np.zeros_like(values)
+    return np.clip(mapLinear(values, min_value, max_value, 0.0, 1.0), 0.0, 1.0)
+
+
+# ----------------------------------------------------
+# Mesh container
+# ----------------------------------------------------
+@dataclass
+class MeshData:
+    """
+    A polygon mesh stored as flat arrays, laid out like MFnMesh.create expects.
+
+    Attributes:
+      points (ndarray): (N, 3) float64 vertex positions.
+      face_counts (ndarray): (F,) int32 number of vertices of each face.
+      face_connects (ndarray): int32 vertex index of every face-vertex, face by face.
+      uvs (ndarray): (M, 2) float64 UV coordinates.
+      uv_connects (ndarray): int32 UV index of every face-vertex, aligned with face_connects.
+      name (str): The name given to the mesh node.
+      normals (ndarray): Optional (len(face_connects), 3) unit normal of every face-vertex.
+    """
+    points: np.ndarray
+    face_counts: np.ndarray
+    face_connects: np.ndarray
+    uvs: np.ndarray
+    uv_connects: np.ndarray
+    name: str = "mesh"
+    normals: np.ndarray = None
+
+    @property
+    def vertex_count(self):
+        return len(self.points)
+
+    @property
+    def face_count(self):
+        return len(self.face_counts)
+
+
+def combine_meshes(meshes, name="combined"):
+    """
+    Concatenates meshes into one, offsetting their vertex and UV indices (polyUnite).
+
+    Parameters:
+      meshes (list): The MeshData to combine, in order.
+      name (str): The name of the combined mesh.
+
+    Returns:
+      MeshData: The combined mesh.
+    """
+    point_offsets = np.cumsum([0] + [m.vertex_count for m in meshes[:-1]])
+    uv_offsets = np.cumsum([0] + [len(m.uvs) for m in meshes[:-1]])
+    has_normals = all(m.normals is not None for m in meshes)
+    return MeshData(
+        points=np.concatenate([m.points for m in meshes]),
+        face_counts=np.concatenate([m.face_counts for m in meshes]),
+        face_connects=np.concatenate([m.face_connects + o for m, o in zip(meshes, point_offsets)]).astype(np.int32),
+        uvs=np.concatenate([m.uvs for m in meshes]),
+        uv_connects=np.concatenate([m.uv_connects + o for m, o in zip(meshes, uv_offsets)]).astype(np.int32),
+        name=name,
+        normals=np.concatenate([m.normals for m in meshes]) if has_normals else None,
+    )
+
+
+# ----------------------------------------------------
+# Face queries and splitting
+# ----------------------------------------------------
+def face_vertex_layout(mesh):
+    """
+    Returns the per face-vertex bookkeeping arrays of a mesh.
+
+    Returns:
+      tuple: (face_ids, face_starts, next_face_vertex) where face_ids maps each
+      face-vertex to its face, face_starts is the first face-vertex of every
+      face and next_face_vertex is the following face-vertex around its face.
+    """
+    counts = mesh.face_counts
+    face_starts = np.cumsum(counts) - counts
+    face_ids = np.repeat(np.arange(len(counts)), counts)
+    next_face_vertex = np.arange(len(mesh.face_connects)) + 1
+    next_face_vertex[face_starts + counts - 1] = face_starts
+    return face_ids, face_starts, next_face_vertex
+
+
+def face_normals(mesh):
+    """
+    Returns the (F, 3) unit normals of every face, computed in bulk with Newell's method.
+
+    Degenerate faces get a zero normal.
+    """
+    face_ids, face_starts, next_face_vertex = face_vertex_layout(mesh)
+    current = mesh.points[mesh.face_connects]
+    following = mesh.points[mesh.face_connects[next_face_vertex]]
+    normals = np.zeros((mesh.face_count, 3))
+    np.add.at(normals, face_ids, np.cross(current, following))
+    length = np.linalg.norm(normals, axis=1, keepdims=True)
+    return np.divide(normals, length, out=np.zeros_like(normals), where=length > 0)
+
+
+def face_centers(mesh):
+    """Returns the (F, 3) average position of the vertices of every face."""
+    face_ids, _, _ = face_vertex_layout(mesh)
+    centers = np.zeros((mesh.face_count, 3))
+    np.add.at(centers, face_ids, mesh.points[mesh.face_connects])
+    return centers / mesh.face_counts[:, None]
+
+
+def submesh(mesh, faces, name=None):
+    """
+    Extracts a set of faces into a new, compact mesh.
+
+    Vertices and UVs no longer referenced are dropped and the remaining ones
+    renumbered in their original order, so no duplicate-then-delete is needed.
+
+    Parameters:
+      mesh (MeshData): The source mesh.
+      faces (ndarray): Face indices or a boolean face mask to keep.
+      name (str): The name of the new mesh. Defaults to the source name.
+
+    Returns:
+      MeshData: The extracted mesh.
+    """
+    face_mask = np.zeros(mesh.face_count, dtype=bool)
+    face_mask[faces] = True
+    face_vertex_mask = np.repeat(face_mask, mesh.face_counts)
+
+    connects = mesh.face_connects[face_vertex_mask]
+    used_points, point_connects = np.unique(connects, return_inverse=True)
+    uv_connects = mesh.uv_connects[face_vertex_mask]
+    used_uvs, uv_connects = np.unique(uv_connects, return_inverse=True)
+
+    return MeshData(
+        points=mesh.points[used_points],
+        face_counts=mesh.face_counts[face_mask],
+        face_connects=point_connects.astype(np.int32),
+        uvs=mesh.uvs[used_uvs],
+        uv_connects=uv_connects.astype(np.int32),
+        name=name or mesh.name,
+        normals=mesh.normals[face_vertex_mask] if mesh.normals is not None else None,
+    )
+
+
+def split_by_radial_normal(mesh, axis=(0, 1, 0), threshold=0.5, inner_name=None, outer_name=None):
+    """
+    Splits a ring-shaped mesh into the faces facing away from its axis and the rest.
+
+    Every face's normal is compared to the radial direction from the axis to
+    the face center; faces pointing outwards by more than threshold (a cosine)
+    form the outer side and all other faces the inner side. This follows the
+    topology, so it holds for any number of subdivisions.
+
+    Parameters:
+      mesh (MeshData): The ring mesh, centered on the axis.
+      axis (tuple): The axis the ring revolves around.
+      threshold (float): Minimum cosine between normal and radial direction for outer faces.
+      inner_name (str): The name of the inner mesh.
+      outer_name (str): The name of the outer mesh.
+
+    Returns:
+      tuple: The (inner, outer) MeshData.
+    """
+    axis = np.asarray(axis, dtype=np.float64)
+    axis = axis / np.linalg.norm(axis)
+    centers = face_centers(mesh)
+    radial = centers - np.outer(centers @ axis, axis)
+    length = np.linalg.norm(radial, axis=1, keepdims=True)
+    radial = np.divide(radial, length, out=np.zeros_like(radial), where=length > 0)
+
+    outer = np.einsum("ij,ij->i", face_normals(mesh), radial) > threshold
+    return (
+        submesh(mesh, ~outer, name=inner_name),
+        submesh(mesh, outer, name=outer_name),
+    )
+
+
+# ----------------------------------------------------
+# UV projection
+# ----------------------------------------------------
+def cylindrical_uvs(mesh, axis=(0, 1, 0), name=None):
+    """
+    Projects a mesh's UVs onto a cylinder around axis, the headless adjust_uvs_to_range.
+
+    Like polyCylindricalProjection(smartFit=True) followed by normalize_uvs,
+    U is the angle around the axis and V the height along it, each fitted to
+    the 0-1 range. Faces crossing the seam continue their U past 1 instead of
+    wrapping across the texture. Face-vertices of the same vertex share a UV,
+    so the UVs stay connected everywhere but along the seam.
+
+    Parameters:
+      mesh (MeshData): The mesh to project, centered on the axis.
+      axis (tuple): The axis of the cylinder.
+      name (str): The name of the projected mesh. Defaults to the source name.
+
+    Returns:
+      MeshData: The mesh with its new UVs.
+    """
+    axis = np.asarray(axis, dtype=np.float64)
+    axis = axis / np.linalg.norm(axis)
+    tangent = np.cross(axis, [1.0, 0.0, 0.0] if abs(axis[0]) < 0.9 else [0.0, 0.0, 1.0])
+    tangent /= np.linalg.norm(tangent)
+    binormal = np.cross(axis, tangent)
+
+    corners = mesh.points[mesh.face_connects]
+    u = np.arctan2(corners @ binormal, corners @ tangent) / (2 * math.pi) % 1.0
+    wrapped = np.zeros(len(u), dtype=bool)
+    if mesh.face_count:
+        face_ids, face_starts, _ = face_vertex_layout(mesh)
+        spans = np.maximum.reduceat(u, face_starts) - np.minimum.reduceat(u, face_starts)
+        wrapped = (spans > 0.5)[face_ids] & (u < 0.5)
+    u = normalize_range(u + wrapped)
+    v = normalize_range(corners @ axis)
+
+    # One UV per vertex and side of the seam.
+    _, first, uv_connects = np.unique(mesh.face_connects * 2 + wrapped, return_index=True, return_inverse=True)
+    uvs = np.stack([u[first], v[first]], axis=1)
+    return MeshData(
+        points=mesh.points,
+        face_counts=mesh.face_counts,
+        face_connects=mesh.face_connects,
+        uvs=uvs,
+        uv_connects=uv_connects.reshape(-1).astype(np.int32),
+        name=name or mesh.name,
+        normals=mesh.normals,
+    )
+
+
+# ----------------------------------------------------
+# Welding
+# ----------------------------------------------------
+def weld_vertices(mesh, tolerance=WELD_TOLERANCE, name=None):
+    """
+    Merges coincident vertices using a spatial hash, then drops the faces that collapse.
+
+    Points are hashed into cells of size 2 * tolerance, under the eight grids
+    offset by half a cell along each axis. Vertices sharing a cell in any grid
+    are merged, transitively, into the lowest-indexed one. Vertices closer than
+    tolerance along every axis always share a cell in one of the grids, and
+    vertices 2 * tolerance apart along an axis never do. Each grid hashes the
+    cells to int64 keys and buckets them with one 1D unique, and the clusters
+    are joined with a vectorized union-find.
+
+    Only positions are merged. UV and normal indices stay per face-vertex, so
+    UV seams and hard edges are kept. Repeated consecutive vertices are removed
+    from each face, and faces left with fewer than three vertices are deleted.
+
+    Parameters:
+      mesh (MeshData): The mesh to weld.
+      tolerance (float): The merge distance.
+      name (str): The name of the welded mesh. Defaults to the source name.
+
+    Returns:
+      tuple: (welded MeshData, vertices removed, faces removed).
+    """
+    # Link every vertex to the lowest vertex of its cell in each grid.
+    cell_size = 2.0 * tolerance
+    vertices = np.arange(mesh.vertex_count)
+    lowest = [_cell_lowest(mesh.points / cell_size + np.array(offset) * 0.5) for offset in np.ndindex(2, 2, 2)]
+    sources = np.tile(vertices, len(lowest))
+    targets = np.concatenate(lowest)
+
+    # Union-find over the links: hook the larger root of every link onto the
+    # smaller one, then compress every path, until the links agree. Every
+    # cluster ends up labelled with its lowest index.
+    cluster = vertices.copy()
+    while True:
+        a, b = cluster[sources], cluster[targets]
+        split = a != b
+        if not split.any():
+            break
+        np.minimum.at(cluster, np.maximum(a, b)[split], np.minimum(a, b)[split])
+        cluster = _resolve_roots(cluster)
+
+    connects = cluster[mesh.face_connects]
+    face_ids, face_starts, next_face_vertex = face_vertex_layout(mesh)
+    keep = connects != connects[next_face_vertex]
+    counts = np.bincount(face_ids[keep], minlength=mesh.face_count)
+    # Faces left with fewer than three distinct vertices are deleted, face-vertices included.
+    faces = counts >= 3
+    keep &= np.repeat(faces, mesh.face_counts)
+
+    collapsed = MeshData(
+        points=mesh.points,
+        face_counts=counts[faces].astype(np.int32),
+        face_connects=connects[keep].astype(np.int32),
+        uvs=mesh.uvs,
+        uv_connects=mesh.uv_connects[keep],
+        name=name or mesh.name,
+        normals=mesh.normals[keep] if mesh.normals is not None else None,
+    )
+    welded = submesh(collapsed, np.arange(collapsed.face_count))
+    return welded, mesh.vertex_count - welded.vertex_count, mesh.face_count - welded.face_count
+
+
+def _resolve_roots(parent):
+    """Returns the root of every entry of a parent array where parent[i] <= i, by pointer jumping."""
+    while True:
+        jumped = parent[parent]
+        if np.array_equal(jumped, parent):
+            return parent
+        parent = jumped
+
+
+# Spatial hash multipliers of the cell coordinates (Teschner et al. 2003).
+_CELL_HASH = np.array([73856093, 19349663, 83492791], dtype=np.int64)
+
+
+def _cell_lowest(scaled):
+    """Returns, for every row of (N, 3) scaled points, the lowest row index in the same unit cell."""
+    cells = np.floor(scaled).astype(np.int64)
+    # Equal cells always hash to the same int64 key, so one 1D unique buckets them.
+    keys = cells @ _CELL_HASH
+    lowest = _bucket_lowest(np.unique(keys, return_inverse=True)[1].reshape(-1))
+    # Rows whose cell collided with another cell's key are bucketed again exactly.
+    collided = np.flatnonzero(np.any(cells != cells[lowest], axis=1))
+    if len(collided):
+        exact = np.unique(cells[collided], axis=0, return_inverse=True)[1].reshape(-1)
+        lowest[collided] = collided[_bucket_lowest(exact)]
+    return lowest
+
+
+def _bucket_lowest(buckets):
+    """Returns, for every entry of a bucket id array, the lowest index with the same bucket."""
+    lowest = np.full(buckets.max() + 1 if len(buckets) else 0, len(buckets))
+    np.minimum.at(lowest, buckets, np.arange(len(buckets)))
+    return lowest[buckets]
+
+
+# ----------------------------------------------------
+# Profiles
+# ----------------------------------------------------
+def quadrant_profile(circle_radius=1.0, cross_thickness=0.5, arc_sections=8):
+    """
+    Returns the closed quadrant profile points of create_quadrant_profile.
+
+    The profile starts at the corner of the cross, runs to the horizontal
+    intersection, follows the arc to the vertical intersection and closes back
+    at the corner. Points are kept exactly as the curve CVs, repeated
+    intersections and the closing corner included.
+
+    Returns:
+      ndarray: (arc_sections + 5, 3) profile points in the XY plane.
+    """
+    x_intersect = math.sqrt(circle_radius**2 - cross_thickness**2)
+    y_intersect = math.sqrt(circle_radius**2 - cross_thickness**2)
+
+    pt_horizontal = (x_intersect, cross_thickness, 0)
+    pt_vertical = (cross_thickness, y_intersect, 0)
+    pt_corner = (cross_thickness, cross_thickness, 0)
+
+    angle_start = math.atan2(cross_thickness, x_intersect)
+    angle_end = math.atan2(y_intersect, cross_thickness)
+    angles = lerp(angle_start, angle_end, np.arange(arc_sections + 1) / arc_sections)
+    arc_points = np.stack([np.cos(angles), np.sin(angles), np.zeros_like(angles)], axis=1) * circle_radius
+
+    return np.concatenate([[pt_corner, pt_horizontal], arc_points, [pt_vertical, pt_corner]])
+
+
+def rotate_profile(profile, angle):
+    """Rotates profile points about the Z-axis by angle degrees."""
+    theta = math.radians(angle)
+    c, s = math.cos(theta), math.sin(theta)
+    rotation = np.array([[c, -s, 0], [s, c, 0], [0, 0, 1]])
+    return profile @ rotation.T
+
+
+def circle_profile(radius=1.0, sections=8):
+    """Returns a closed circle of sections points in the XY plane, starting on +X."""
+    angles = np.arange(sections) * (2 * math.pi / sections)
+    return np.stack([np.cos(angles), np.sin(angles), np.zeros_like(angles)], axis=1) * radius
+
+
+def orbit_profile(height=1.0, thickness=0.1):
+    """
+    Returns the closed rectangular profile of an orbit ring.
+
+    The spans run over the top, the inner wall, the bottom and finally the outer
+    wall, so the last quarter of the swept faces is the outer side of the ring.
+    """
+    x, y = thickness / 2.0, height / 2.0
+    return np.array([(x, y, 0), (-x, y, 0), (-x, -y, 0), (x, -y, 0)], dtype=np.float64)
+
+
+# ----------------------------------------------------
+# Sweeps
+# ----------------------------------------------------
+def sweep_profile(profile, torus_radius=10, path_divisions=50, closed_profile=False, crease_angle=30.0,
+                  name="sweptTorus"):
+    """
+    Sweeps a profile around a circular path about the Y-axis, straight to polygons.
+
+    This is the closed form of extruding the profile along a circle and running
+    nurbsToPoly on the control points: every profile point is rotated about Y
+    at each of the path_divisions angles. The profile's X coordinate is the
+    radial offset from the path and its Y coordinate the height. Vertices and
+    faces are ordered profile point by profile point, each running once around
+    the path, matching the face ordering of the extruded surface.
+
+    Normals are analytic: the 2D profile normals rotated with the path. Edges
+    whose dihedral angle is above crease_angle get hard normals, so a
+    crease_angle of 0 gives the same shading as polySoftEdge(angle=0).
+
+    Parameters:
+      profile (ndarray): (P, 3) profile points in the XY plane.
+      torus_radius (float): Radius of the circular path.
+      path_divisions (int): Number of sections around the path.
+      closed_profile (bool): Connect the last profile point back to the first.
+      crease_angle (float): Angle in degrees above which edges are hard.
+      name (str): The name of the swept mesh.
+
+    Returns:
+      MeshData: The swept mesh of P*path_divisions vertices, with normals.
+    """
+    profile = np.asarray(profile, dtype=np.float64)
+    path_divisions = int(path_divisions)
+    profile_count = len(profile)
+    span_count = profile_count if closed_profile else profile_count - 1
+
+    angles = np.arange(path_divisions) * (2 * math.pi / path_divisions)
+    radii = torus_radius + profile[:, 0]
+    points = np.empty((profile_count, path_divisions, 3))
+    points[..., 0] = np.outer(radii, np.cos(angles))
+    points[..., 1] = profile[:, 1, None]
+    points[..., 2] = -np.outer(radii, np.sin(angles))
+
+    # Quads ordered span by span, each span running around the whole path.
+    span = np.arange(span_count)[:, None]
+    section = np.arange(path_divisions)[None, :]
+    next_span = (span + 1) % profile_count
+    next_section = (section + 1) % path_divisions
+    quads = np.stack([
+        span * path_divisions + section,
+        span * path_divisions + next_section,
+        next_span * path_divisions + next_section,
+        next_span * path_divisions + section,
+    ], axis=-1).reshape(-1, 4)
+
+    # UVs get their own seam row and column so the texture does not wrap back.
+    uv_rows = span_count + 1
+    us = np.arange(uv_rows) / span_count
+    vs = np.arange(path_divisions + 1) / path_divisions
+    uvs = np.stack(np.meshgrid(us, vs, indexing="ij"), axis=-1).reshape(-1, 2)
+    uv_quads = np.stack([
+        span * (path_divisions + 1) + section,
+        span * (path_divisions + 1) + section + 1,
+        (span + 1) * (path_divisions + 1) + section + 1,
+        (span + 1) * (path_divisions + 1) + section,
+    ], axis=-1).reshape(-1, 4)
+
+    normals = _sweep_normals(profile[:, :2], angles, closed_profile, crease_angle)
+
+    return MeshData(
+        points=points.reshape(-1, 3),
+        face_counts=np.full(len(quads), 4, dtype=np.int32),
+        face_connects=quads.ravel().astype(np.int32),
+        uvs=uvs,
+        uv_connects=uv_quads.ravel().astype(np.int32),
+        name=name,
+        normals=normals,
+    )
+
+
+def _sweep_normals(profile, angles, closed_profile, crease_angle):
+    """
+    Returns the face-vertex normals of sweep_profile, in its face ordering.
+
+    Each span of the 2D profile has a constant outward normal. At a profile
+    point the two adjacent span normals are averaged unless they meet at more
+    than crease_angle; zero-length spans take the normal of their neighbours.
+    Around the path the normal follows the vertex angle, or the face's middle
+    angle when the path sections themselves are sharper than crease_angle.
+    """
+    profile_count = len(profile)
+    span_count = profile_count if closed_profile else profile_count - 1
+    path_divisions = len(angles)
+
+    starts = np.arange(span_count)
+    ends = (starts + 1) % profile_count
+    direction = profile[ends] - profile[starts]
+    length = np.linalg.norm(direction, axis=1)
+    # Outward for a counter-clockwise profile: the direction turned clockwise.
+    span_normals = np.stack([direction[:, 1], -direction[:, 0]], axis=1)
+    span_normals = np.divide(span_normals, length[:, None], out=np.zeros_like(span_normals),
+                             where=length[:, None] > 0)
+
+    point_normals = np.zeros((profile_count, 2))
+    np.add.at(point_normals, starts, span_normals)
+    np.add.at(point_normals, ends, span_normals)
+    point_length = np.linalg.norm(point_normals, axis=1, keepdims=True)
+    point_normals = np.divide(point_normals, point_length, out=np.zeros_like(point_normals),
+                              where=point_length > 0)
+
+    # Two span normals crease_angle apart sit crease_angle / 2 from their average.
+    threshold = math.cos(math.radians(crease_angle) / 2.0)
+
+    def corner_normals(points):
+        smooth = np.einsum("ij,ij->i", span_normals, point_normals[points]) >= threshold - 1e-9
+        degenerate = length == 0
+        return np.where((smooth | degenerate)[:, None], point_normals[points], span_normals)
+
+    start_normals = corner_normals(starts)
+    end_normals = corner_normals(ends)
+
+    section_angle = 360.0 / path_divisions
+    if section_angle > crease_angle:
+        face_angles = angles + math.pi / path_divisions
+        start_angles = end_angles = face_angles
+    else:
+        start_angles = angles
+        end_angles = np.roll(angles, -1)
+
+    def rotate(normals_2d, path_angles):
+        radial, height = normals_2d[:, 0, None], normals_2d[:, 1, None]
+        return np.stack([
+            radial * np.cos(path_angles)[None, :],
+            np.broadcast_to(height, (len(normals_2d), len(path_angles))),
+            -radial * np.sin(path_angles)[None, :],
+        ], axis=-1)
+
+    # Face-vertex order matches the quads: (span, section), (span, section + 1),
+    # (span + 1, section + 1), (span + 1, section).
+    normals = np.stack([
+        rotate(start_normals, start_angles),
+        rotate(start_normals, end_angles),
+        rotate(end_normals, end_angles),
+        rotate(end_normals, start_angles),
+    ], axis=2)
+    return normals.reshape(-1, 3)
+
+
+# ----------------------------------------------------
+# Primitives
+# ----------------------------------------------------
+def torus(major_radius=10, minor_radius=1, subdivisions_major=20, subdivisions_minor=10, name="regularTorus"):
+    """
+    Builds a torus about the Y-axis with the topology of polyTorus.
+
+    Parameters:
+      major_radius (float): The major (ring) radius of the torus.
+      minor_radius (float): The minor (tube) radius of the torus.
+      subdivisions_major (int): Number of subdivisions around the torus ring.
+      subdivisions_minor (int): Number of subdivisions along the tube.
+      name (str): The name for the torus mesh.
+
+    Returns:
+      MeshData: The torus mesh.
+    """
+    profile = circle_profile(minor_radius, int(subdivisions_minor))
+    return sweep_profile(profile, major_radius, subdivisions_major, closed_profile=True, name=name)
+
+
+def sphere(radius=1.0, subdivisions_x=20, subdivisions_y=20, name="sphere"):
+    """
+    Builds a UV sphere with the topology of polySphere.
+
+    Vertices run ring by ring from the bottom, followed by the bottom and top
+    poles. Faces are the quad rows first, then the bottom and top triangle fans.
+
+    Parameters:
+      radius (float): The sphere radius.
+      subdivisions_x (int): Number of subdivisions around the axis.
+      subdivisions_y (int): Number of subdivisions from pole to pole.
+      name (str): The name for the sphere mesh.
+
+    Returns:
+      MeshData: The sphere mesh.
+    """
+    sx, sy = int(subdivisions_x), int(subdivisions_y)
+    rings = sy - 1
+
+    phi = -math.pi / 2 + np.arange(1, sy) * (math.pi / sy)
+    theta = np.arange(sx) * (2 * math.pi / sx)
+    ring_points = np.empty((rings, sx, 3))
+    ring_points[..., 0] = np.outer(np.cos(phi), np.cos(theta))
+    ring_points[..., 1] = np.sin(phi)[:, None]
+    ring_points[..., 2] = -np.outer(np.cos(phi), np.sin(theta))
+    points = np.concatenate([ring_points.reshape(-1, 3), [(0, -1, 0), (0, 1, 0)]]) * radius
+    bottom, top = rings * sx, rings * sx + 1
+
+    row = np.arange(rings - 1)[:, None]
+    col = np.arange(sx)[None, :]
+    next_col = (col + 1) % sx
+    quads = np.stack([
+        row * sx + col,
+        row * sx + next_col,
+        (row + 1) * sx + next_col,
+        (row + 1) * sx + col,
+    ], axis=-1).reshape(-1, 4)
+    col = col.ravel()
+    next_col = next_col.ravel()
+    bottom_fan = np.stack([np.full(sx, bottom), next_col, col], axis=-1)
+    top_fan = np.stack([(rings - 1) * sx + col, (rings - 1) * sx + next_col, np.full(sx, top)], axis=-1)
+
+    # UVs: a seam column per ring plus one pole UV per fan triangle.
+    uv_cols = sx + 1
+    us = np.arange(uv_cols) / sx
+    vs = np.arange(1, sy) / sy
+    ring_uvs = np.stack(np.meshgrid(us, vs, indexing="xy"), axis=-1).reshape(-1, 2)
+    pole_us = (np.arange(sx) + 0.5) / sx
+    uvs = np.concatenate([
+        ring_uvs,
+        np.stack([pole_us, np.zeros(sx)], axis=-1),
+        np.stack([pole_us, np.ones(sx)], axis=-1),
+    ])
+    bottom_uv, top_uv = rings * uv_cols, rings * uv_cols + sx
+    uv_col = np.arange(sx)
+    uv_quads = np.stack([
+        row * uv_cols + uv_col,
+        row * uv_cols + uv_col + 1,
+        (row + 1) * uv_cols + uv_col + 1,
+        (row + 1) * uv_cols + uv_col,
+    ], axis=-1).reshape(-1, 4)
+    uv_bottom_fan = np.stack([bottom_uv + uv_col, uv_col + 1, uv_col], axis=-1)
+    uv_top_fan = np.stack([(rings - 1) * uv_cols + uv_col, (rings - 1) * uv_cols + uv_col + 1, top_uv + uv_col], axis=-1)
+
+    face_connects = np.concatenate([quads.ravel(), bottom_fan.ravel(), top_fan.ravel()]).astype(np.int32)
+
+    return MeshData(
+        points=points,
+        face_counts=np.concatenate([np.full(len(quads), 4), np.full(2 * sx, 3)]).astype(np.int32),
+        face_connects=face_connects,
+        uvs=uvs,
+        uv_connects=np.concatenate([uv_quads.ravel(), uv_bottom_fan.ravel(), uv_top_fan.ravel()]).astype(np.int32),
+        name=name,
+        normals=points[face_connects] / radius,
+    )
+
+
+def cube(width=1.0, height=1.0, depth=1.0, name="cube"):
+    """
+    Builds a cuboid centered on the origin with the topology and UV layout of polyCube.
+
+    Parameters:
+      width (float): Size along X.
+      height (float): Size along Y.
+      depth (float): Size along Z.
+      name (str): The name for the cube mesh.
+
+    Returns:
+      MeshData: The cube mesh, with hard face normals.
+    """
+    x, y, z = width / 2.0, height / 2.0, depth / 2.0
+    points = np.array([
+        (-x, -y, z), (x, -y, z), (-x, y, z), (x, y, z),
+        (-x, y, -z), (x, y, -z), (-x, -y, -z), (x, -y, -z),
+    ])
+    faces = np.array([[0, 1, 3, 2], [2, 3, 5, 4], [4, 5, 7, 6], [6, 7, 1, 0], [1, 7, 5, 3], [6, 0, 2, 4]])
+    uvs = np.array([
+        (0.375, 0), (0.625, 0), (0.375, 0.25), (0.625, 0.25), (0.375, 0.5), (0.625, 0.5), (0.375, 0.75),
+        (0.625, 0.75), (0.375, 1), (0.625, 1), (0.875, 0), (0.875, 0.25), (0.125, 0), (0.125, 0.25),
+    ])
+    uv_faces = np.array([[0, 1, 3, 2], [2, 3, 5, 4], [4, 5, 7, 6], [6, 7, 9, 8], [1, 10, 11, 3], [12, 0, 2, 13]])
+    face_normals = np.array([(0, 0, 1), (0, 1, 0), (0, 0, -1), (0, -1, 0), (1, 0, 0), (-1, 0, 0)], dtype=np.float64)
+
+    return MeshData(
+        points=points,
+        face_counts=np.full(6, 4, dtype=np.int32),
+        face_connects=faces.ravel().astype(np.int32),
+        uvs=uvs,
+        uv_connects=uv_faces.ravel().astype(np.int32),
+        name=name,
+        normals=np.repeat(face_normals, 4, axis=0),
+    )
+
+
+def dodecahedron(radius=1.0, name="dodecahedron"):
+    """
+    Builds a regular dodecahedron centered on the origin, like polyPlatonic's default solid.
+
+    Parameters:
+      radius (float): Circumradius, the distance from the center to every vertex.
+      name (str): The name for the dodecahedron mesh.
+
+    Returns:
+      MeshData: Twelve outward-wound pentagons sharing one pentagon UV layout, with hard face normals.
+    """
+    phi = (1 + math.sqrt(5)) / 2
+    corners = [(x, y, z) for x in (-1, 1) for y in (-1, 1) for z in (-1, 1)]
+    for a in (-1 / phi, 1 / phi):
+        for b in (-phi, phi):
+            corners += [(0, a, b), (a, b, 0), (b, 0, a)]
+    points = np.array(corners, dtype=np.float64)
+    points *= radius / np.linalg.norm(points[0])
+
+    # Face normals point at the vertices of the dual icosahedron.
+    directions = []
+    for a in (-1, 1):
+        for b in (-phi, phi):
+            directions += [(0, b, a), (b, a, 0), (a, 0, b)]
+    directions = np.array(directions, dtype=np.float64)
+    directions /= np.linalg.norm(directions, axis=1)[:, None]
+
+    faces = []
+    for normal in directions:
+        corners = np.argsort(-(points @ normal))[:5]
+        offsets = points[corners] - points[corners].mean(axis=0)
+        tangent = offsets[0]
+        binormal = np.cross(normal, tangent)
+        # Counter-clockwise around the outward normal.
+        faces.append(corners[np.argsort(np.arctan2(offsets @ binormal, offsets @ tangent))])
+
+    angles = np.pi / 2 + np.arange(5) * 2 * np.pi / 5
+    uvs = 0.5 + 0.5 * np.stack([np.cos(angles), np.sin(angles)], axis=1)
+    return MeshData(
+        points=points,
+        face_counts=np.full(12, 5, dtype=np.int32),
+        face_connects=np.array(faces).ravel().astype(np.int32),
+        uvs=uvs,
+        uv_connects=np.tile(np.arange(5, dtype=np.int32), 12),
+        name=name,
+        normals=np.repeat(directions, 5, axis=0),
+    )
+
+# ----------------------------------------------------
+# Instancing
+# ----------------------------------------------------
+def instance_mesh(mesh, matrices, name="instances"):
+    """
+    Combines copies of mesh placed by an array of transformation matrices.
+
+    Matrices follow Maya's row-vector convention: the first three rows are the
+    local X, Y and Z axes and the last row is the translation. All copies are
+    transformed in one vectorized operation.
+
+    Parameters:
+      mesh (MeshData): The prototype mesh.
+      matrices (ndarray): (K, 4, 4) placements, one per copy.
+      name (str): The name of the combined mesh.
+
+    Returns:
+      MeshData: One mesh holding the K transformed copies.
+    """
+    matrices = np.asarray(matrices, dtype=np.float64).reshape(-1, 4, 4)
+    copies = len(matrices)
+    rotations = matrices[:, :3, :3]
+    points = np.einsum("vi,kij->kvj", mesh.points, rotations) + matrices[:, None, 3, :3]
+
+    normals = None
+    if mesh.normals is not None:
+        # Normals take the inverse transpose so non-uniform scales keep them perpendicular.
+        normal_matrices = np.linalg.inv(rotations).transpose(0, 2, 1)
+        normals = np.einsum("vi,kij->kvj", mesh.normals, normal_matrices)
+        normals /= np.linalg.norm(normals, axis=-1, keepdims=True)
+        normals = normals.reshape(-1, 3)
+
+    point_offsets = (np.arange(copies) * mesh.vertex_count)[:, None]
+    uv_offsets = (np.arange(copies) * len(mesh.uvs))[:, None]
+    return MeshData(
+        points=points.reshape(-1, 3),
+        face_counts=np.tile(mesh.face_counts, copies),
+        face_connects=(mesh.face_connects[None, :] + point_offsets).ravel().astype(np.int32),
+        uvs=np.tile(mesh.uvs, (copies, 1)),
+        uv_connects=(mesh.uv_connects[None, :] + uv_offsets).ravel().astype(np.int32),
+        name=name,
+        normals=normals,
+    )
+
+
+# ----------------------------------------------------
+# Sculpture components
+# ----------------------------------------------------
+def motion_structure(radius=RADIUS, outline_radius=OUTLINE_RADIUS, profile_radius=ORBIT_PROFILE_RADIUS,
+                     subdivisions=TORUS_SUBDIVISIONS, arc_sections=8, weld_tolerance=WELD_TOLERANCE,
+                     name="SM_Motion_Structure"):
+    """
+    Builds the swept cross-section torus of create_motion_orbit_sculpture.
+
+    The quadrant profile is rotated into the four quadrants, each is swept
+    around the outline radius and the four sweeps are combined into one mesh.
+    The profile repeats its intersection points and closes on its first point,
+    so the combined mesh is welded: coincident rows merge and the zero-width
+    spans between them are deleted. Pass weld_tolerance=None to keep them.
+    """
+    quadrants = [
+        motion_structure_quadrant(angle, radius, outline_radius, profile_radius, subdivisions, arc_sections)
+        for angle in [0, 90, 180, 270]
+    ]
+    return combine_quadrants(*quadrants, weld_tolerance=weld_tolerance, name=name)
+
+
+def motion_structure_quadrant(angle, radius=RADIUS, outline_radius=OUTLINE_RADIUS, profile_radius=ORBIT_PROFILE_RADIUS,
+                              subdivisions=TORUS_SUBDIVISIONS, arc_sections=8):
+    """Sweeps the quadrant profile, rotated by angle degrees, around the outline radius."""
+    circle_radius = outline_radius*profile_radius
+    profile = quadrant_profile(circle_radius=circle_radius, cross_thickness=circle_radius*0.25,
+                               arc_sections=arc_sections)
+    return sweep_profile(rotate_profile(profile, angle), torus_radius=outline_radius*radius,
+                         path_divisions=subdivisions)
+
+
+def combine_quadrants(*quadrants, weld_tolerance=WELD_TOLERANCE, name="SM_Motion_Structure"):
+    """Combines the quadrant sweeps into the motion structure, welded unless weld_tolerance is None."""
+    combined = combine_meshes(list(quadrants), name=name)
+    if weld_tolerance is None:
+        return combined
+    welded, vertices_removed, faces_removed = weld_vertices(combined, weld_tolerance)
+    logger.info("Welded %s: %d vertices and %d faces removed", name, vertices_removed, faces_removed)
+    return welded
+
+
+def motion_structure_light(radius=RADIUS, outline_radius=OUTLINE_RADIUS, subdivisions=TORUS_SUBDIVISIONS,
+                           tube_subdivisions=25, name="SM_Motion_Structure_Light"):
+    """Builds the thin light torus running through the motion structure."""
+    return torus(outline_radius*radius, LIGHT_RADIUS, subdivisions, tube_subdivisions, name)
+
+
+def outline_placements(total=1):
+    """
+    Returns the placements of the outline copies of the motion structure.
+
+    Copies are rotated around X, Y and Z in total steps; the first Y copy is
+    skipped as it coincides with the first X copy.
+
+    Returns:
+      list: (axis, name, rotation) tuples in creation order, rotation in degrees.
+    """
+    placements = []
+    for i in range(total):
+        theta = i * (360 / total)
+        placements.append(("X", "SM_Motion_Structure_X%s" % i, (theta, 0, 0)))
+        placements.append(("Z", "SM_Motion_Structure_Z%s" % i, (0, 90, theta)))
+        if i != 0:
+            placements.append(("Y", "SM_Motion_Structure_Y%s" % i, (90, theta, 0)))
+    return placements
+
+
+def outline_placement(index, total=1):
+    """Returns the (axis, name, rotation) placement of outline copy index, see outline_placements."""
+    return outline_placements(total)[index]
+
+
+def hypatia_sphere(radius=RADIUS, hypatia_radius=HYPATIA_RADIUS, subdivisions_x=100, subdivisions_y=50,
+                   name="SM_Hypatia"):
+    """Builds the Hypatia sphere at the center of the sculpture."""
+    return sphere(float(radius * hypatia_radius), subdivisions_x, subdivisions_y, name)
+
+
+def orbit_ring_radius(index, total=ORBIT_TOTAL, radius=RADIUS):
+    """Returns the path radius of orbit ring index, spread from RADIUS/5 to RADIUS*6/7."""
+    min_radius = radius / 5
+    max_radius = radius * (6/7)
+    p = index / (total - 1) if total > 1 else 0
+    return min_radius + p * (max_radius - min_radius)
+
+
+def orbit_ring(index, total=ORBIT_TOTAL, radius=RADIUS, subdivisions=TORUS_SUBDIVISIONS, name=None):
+    """
+    Builds the square-profile sweep of orbit ring index, centered on the origin.
+
+    Returns:
+      MeshData: The ring mesh, the last quarter of its faces being the outer wall.
+    """
+    height = radius * ORBIT_HEIGHT
+    extrusion_thickness = radius * ORBIT_THICKNESS
+    # The profile plane is height x height, scaled by the extrusion thickness across the ring.
+    profile = orbit_profile(height=height, thickness=height * extrusion_thickness)
+    # polySoftEdge(angle=0) in the original build: every edge of the ring is hard.
+    return sweep_profile(profile, torus_radius=orbit_ring_radius(index, total, radius), path_divisions=subdivisions,
+                         closed_profile=True, crease_angle=0.0, name=name or "polySweptTorus%s" % index)
+
+
+def orbit_ring_side(ring, side="inner", name=None):
+    """Returns the inner or outer side of an orbit ring, as split by split_by_radial_normal, with cylindrical UVs."""
+    inner, outer = split_by_radial_normal(ring, inner_name=name, outer_name=name)
+    return cylindrical_uvs(inner if side == "inner" else outer)
+
+
+def orbit_planet_angles(index, total=ORBIT_TOTAL):
+    """
+    Returns the start angles, in radians, of the planets of orbit ring index.
+
+    The first planet of each ring spirals from half a turn by PLANET_SPIRAL
+    degrees across the rings; the others are spread evenly around their ring.
+    """
+    p = index / (total - 1) if total > 1 else 0
+    first = math.pi + lerp(0, math.radians(PLANET_SPIRAL), p)
+    return first + np.arange(PLANETS_PER_RING) * (2 * math.pi / PLANETS_PER_RING)
+
+
+def orbit_planet_positions(ring_radius, angles):
+    """Returns the (..., 3) positions of planets at angles on a ring of ring_radius, in the ring's plane."""
+    angles = np.asarray(angles, dtype=np.float64)
+    return np.stack([ring_radius * np.cos(angles), np.zeros_like(angles), -ring_radius * np.sin(angles)], axis=-1)
+
+
+def orbit_planet(index, total=ORBIT_TOTAL, radius=RADIUS, subdivisions_x=20, subdivisions_y=10, name="SM_Planet"):
+    """Builds the sphere of a planet of orbit ring index, sized from the ring radius."""
+    return sphere(float(orbit_ring_radius(index, total, radius) * PLANET_RADIUS * 2), subdivisions_x, subdivisions_y,
+                  name)
+
+
+def ring_mesh_radius(ring):
+    """Returns the radius of the center line of an orbit_ring mesh, which lies in the XZ plane."""
+    radial = np.hypot(ring.points[:, 0], ring.points[:, 2])
+    return float(radial.min() + radial.max()) / 2
+
+
+def ring_planet(ring, subdivisions_x=20, subdivisions_y=10, name="SM_Planet"):
+    """Builds the sphere of a planet riding on an orbit_ring mesh, sized like orbit_planet."""
+    return sphere(ring_mesh_radius(ring) * PLANET_RADIUS * 2, subdivisions_x, subdivisions_y, name)
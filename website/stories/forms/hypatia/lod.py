@@ -0,0 +1,188 @@
+"""
+Level-of-detail generation for the Hypatia sculpture components.
+
+Every component is rebuilt from its parametric definition in hypatia_geometry
+at a set of resolution factors. Each level carries a geometric error bound,
+the largest distance between the tessellated mesh and the exact surface, so
+a viewer can pick the coarsest level whose error stays below a pixel budget.
+"""
+import math
+from dataclasses import dataclass
+
+import hypatia_geometry as geometry
+import subdivision
+from hypatia_geometry import (
+    RADIUS, TORUS_SUBDIVISIONS, OUTLINE_RADIUS, ORBIT_PROFILE_RADIUS, LIGHT_RADIUS,
+    HYPATIA_RADIUS, ORBIT_THICKNESS, ORBIT_HEIGHT, ORBIT_TOTAL,
+)
+
+# Resolution of each level relative to the full-resolution builders.
+LOD_FACTORS = (1.0, 1 / 2, 1 / 4, 1 / 8)
+
+# Fewest segments a circle is ever cut into, whatever the factor.
+MIN_CIRCLE_SEGMENTS = 6
+
+# Full-resolution segment counts of the components.
+ARC_SECTIONS = 8
+LIGHT_TUBE_SUBDIVISIONS = 25
+SPHERE_SUBDIVISIONS = (100, 50)
+
+# Default camera of the three.js sketch, used to express errors in pixels.
+DEFAULT_FOV = 45.0
+DEFAULT_VIEWPORT_HEIGHT = 1080
+
+
+@dataclass
+class LodLevel:
+    """
+    One resolution of a component.
+
+    Attributes:
+      factor (float): Resolution relative to the full-resolution builder.
+      mesh (MeshData): The mesh at this resolution.
+      geometric_error (float): Upper bound of the distance to the exact surface, in scene units.
+    """
+    factor: float
+    mesh: object
+    geometric_error: float
+
+
+def circle_error(radius, segments):
+    """Returns the sagitta of a circle of radius cut into segments chords: its largest deviation."""
+    return radius * (1 - math.cos(math.pi / segments))
+
+
+def scaled_segments(segments, factor, minimum=MIN_CIRCLE_SEGMENTS):
+    """Returns segments scaled by factor, rounded and kept above minimum."""
+    return max(minimum, int(round(segments * factor)))
+
+
+def screen_space_error(geometric_error, distance, fov=DEFAULT_FOV, viewport_height=DEFAULT_VIEWPORT_HEIGHT):
+    """
+    Projects a geometric error to pixels for a perspective camera.
+
+    Parameters:
+      geometric_error (float): Error in scene units.
+      distance (float): Distance from the camera to the component.
+      fov (float): Vertical field of view in degrees.
+      viewport_height (int): Viewport height in pixels.
+
+    Returns:
+      float: The error in pixels.
+    """
+    return geometric_error * viewport_height / (2 * distance * math.tan(math.radians(fov) / 2))
+
+
+def switch_distance(geometric_error, max_pixel_error=1.0, fov=DEFAULT_FOV, viewport_height=DEFAULT_VIEWPORT_HEIGHT):
+    """Returns the camera distance beyond which a level's error stays under max_pixel_error."""
+    return geometric_error * viewport_height / (2 * max_pixel_error * math.tan(math.radians(fov) / 2))
+
+
+def select_lod(levels, distance, max_pixel_error=1.0, fov=DEFAULT_FOV, viewport_height=DEFAULT_VIEWPORT_HEIGHT):
+    """
+    Returns the coarsest level whose screen-space error is within max_pixel_error.
+
+    Falls back to the finest level when none is accurate enough.
+    """
+    ordered = sorted(levels, key=lambda level: level.factor)
+    for level in ordered:
+        if screen_space_error(level.geometric_error, distance, fov, viewport_height) <= max_pixel_error:
+            return level
+    return ordered[-1]
+
+
+# ----------------------------------------------------
+# Components
+# ----------------------------------------------------
+def motion_structure_level(factor, radius=RADIUS, subdivisions=TORUS_SUBDIVISIONS):
+    """Builds the motion structure at factor, bounding the path and profile arc errors."""
+    path_radius = OUTLINE_RADIUS * radius
+    profile_radius = OUTLINE_RADIUS * ORBIT_PROFILE_RADIUS
+    path_divisions = scaled_segments(subdivisions, factor)
+    arc_sections = scaled_segments(ARC_SECTIONS, factor, minimum=1)
+    # The arc spans a quarter circle minus the cross bars, close enough to bound it as a quarter.
+    arc_error = circle_error(profile_radius, arc_sections * 4)
+    mesh = geometry.motion_structure(radius=radius, subdivisions=path_divisions, arc_sections=arc_sections)
+    return mesh, circle_error(path_radius + profile_radius, path_divisions) + arc_error
+
+
+def motion_structure_light_level(factor, radius=RADIUS, subdivisions=TORUS_SUBDIVISIONS):
+    """Builds the light torus at factor, bounding the ring and tube errors."""
+    path_divisions = scaled_segments(subdivisions, factor)
+    tube_subdivisions = scaled_segments(LIGHT_TUBE_SUBDIVISIONS, factor)
+    mesh = geometry.motion_structure_light(radius=radius, subdivisions=path_divisions,
+                                           tube_subdivisions=tube_subdivisions)
+    error = circle_error(OUTLINE_RADIUS * radius + LIGHT_RADIUS, path_divisions)
+    return mesh, error + circle_error(LIGHT_RADIUS, tube_subdivisions)
+
+
+def orbit_side_level(factor, side="inner", index=0, total=ORBIT_TOTAL, radius=RADIUS,
+                     subdivisions=TORUS_SUBDIVISIONS):
+    """
+    Builds the inner or outer side of orbit ring index at factor, bounding the error of the ring's outer wall.
+
+    The sides are split and named like create_orbit, SM_Inner and SM_Outer, and
+    the inner side is smoothed the same way, so each level stands in for the
+    full-resolution side.
+    """
+    path_divisions = scaled_segments(subdivisions, factor)
+    height = radius * ORBIT_HEIGHT
+    outer_radius = geometry.orbit_ring_radius(index, total, radius) + height * radius * ORBIT_THICKNESS / 2
+    ring = geometry.orbit_ring(index, total=total, radius=radius, subdivisions=path_divisions)
+    if side == "inner":
+        mesh = subdivision.subdivide(geometry.orbit_ring_side(ring, "inner"), levels=geometry.ORBIT_SMOOTH_DIVISIONS,
+                                     name="SM_Inner%s" % index)
+    else:
+        mesh = geometry.orbit_ring_side(ring, "outer", name="SM_Outer%s" % index)
+    return mesh, circle_error(outer_radius, path_divisions)
+
+
+def hypatia_sphere_level(factor, radius=RADIUS):
+    """Builds the Hypatia sphere at factor, bounding the error of its coarsest direction."""
+    subdivisions_x = scaled_segments(SPHERE_SUBDIVISIONS[0], factor)
+    subdivisions_y = scaled_segments(SPHERE_SUBDIVISIONS[1], factor, minimum=MIN_CIRCLE_SEGMENTS // 2)
+    sphere_radius = radius * HYPATIA_RADIUS
+    mesh = geometry.hypatia_sphere(radius=radius, subdivisions_x=subdivisions_x, subdivisions_y=subdivisions_y)
+    # Meridians are cut into 2 * subdivisions_y chords around the full circle.
+    error = max(circle_error(sphere_radius, subdivisions_x), circle_error(sphere_radius, 2 * subdivisions_y))
+    return mesh, error
+
+
+def build_lods(component, factors=LOD_FACTORS, **params):
+    """
+    Builds every level of one component.
+
+    Parameters:
+      component (callable): One of the *_level functions.
+      factors (tuple): Resolution factors, finest first.
+      **params: Extra parameters passed to component.
+
+    Returns:
+      list: LodLevel per factor, in the order of factors.
+    """
+    levels = []
+    for factor in factors:
+        mesh, error = component(factor, **params)
+        mesh.name = "%s_LOD%d" % (mesh.name, len(levels))
+        levels.append(LodLevel(factor=factor, mesh=mesh, geometric_error=error))
+    return levels
+
+
+def build_sculpture_lods(factors=LOD_FACTORS, radius=RADIUS, subdivisions=TORUS_SUBDIVISIONS, total=ORBIT_TOTAL):
+    """
+    Builds every level of every sculpture component in one pass.
+
+    Returns:
+      dict: Component name -> list of LodLevel.
+    """
+    lods = {
+        "SM_Motion_Structure": build_lods(motion_structure_level, factors, radius=radius, subdivisions=subdivisions),
+        "SM_Motion_Structure_Light": build_lods(motion_structure_light_level, factors, radius=radius,
+                                                subdivisions=subdivisions),
+        "SM_Hypatia": build_lods(hypatia_sphere_level, factors, radius=radius),
+    }
+    for i in range(total):
+        for side, name in [("inner", "SM_Inner%s" % i), ("outer", "SM_Outer%s" % i)]:
+            lods[name] = build_lods(orbit_side_level, factors, side=side, index=i, total=total, radius=radius,
+                                    subdivisions=subdivisions)
+    return lods
@@ -0,0 +1,33 @@
+"""
+Maya adapters for the baked animation of orbit_animation.
+"""
+import maya.api.OpenMaya as om
+import maya.api.OpenMayaAnim as oma
+
+
+def create_anim_curves(curves):
+    """
+    Creates one anim curve per channel, adding all of its keys in a single MFnAnimCurve.addKeys call.
+
+    Keys have linear tangents, so the curves replay the frames they were
+    reduced from within the reduction tolerance.
+
+    Parameters:
+      curves (list): (node, attribute, times, values) tuples as returned by
+        orbit_animation.anim_curves, times in seconds and angles in radians.
+
+    Returns:
+      list: The names of the created anim curves.
+    """
+    names = []
+    for node, attribute, times, values in curves:
+        selection = om.MSelectionList()
+        selection.add("%s.%s" % (node, attribute))
+        fn = oma.MFnAnimCurve()
+        # The curve type, angular or linear, follows the plug.
+        fn.create(selection.getPlug(0))
+        fn.addKeys(om.MTimeArray([om.MTime(t, om.MTime.kSeconds) for t in times.tolist()]),
+                   om.MDoubleArray(values.tolist()),
+                   oma.MFnAnimCurve.kTangentLinear, oma.MFnAnimCurve.kTangentLinear)
+        names.append(fn.name())
+    return names
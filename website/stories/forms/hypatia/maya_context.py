@@ -0,0 +1,56 @@
+"""
+Scene state shared by every Maya builder.
+
+Builders run under build_context, which turns off undo recording and viewport
+refresh for the length of the build and leaves the user's selection as it
+found it. Builders pass nodes and components to commands explicitly and never
+rely on the selection.
+"""
+import contextlib
+
+import pymel.core as pm
+
+# Number of build_context blocks currently entered.
+_depth = 0
+
+
+@contextlib.contextmanager
+def build_context():
+    """
+    Suspends undo recording and viewport refresh while building.
+
+    Only the outermost context changes and restores state, so builders
+    calling other builders nest freely. State is restored when the build
+    raises as well. Undo is suspended without flushing the queue, so the
+    user's history from before the build stays undoable.
+
+    Can be used as a decorator:
+      @build_context()
+      def create_orbit(): ...
+    """
+    global _depth
+    if _depth:
+        _depth += 1
+        try:
+            yield
+        finally:
+            _depth -= 1
+        return
+
+    undo_state = pm.undoInfo(query=True, state=True)
+    selection = pm.ls(selection=True)
+    pm.undoInfo(stateWithoutFlush=False)
+    pm.refresh(suspend=True)
+    _depth = 1
+    try:
+        yield
+    finally:
+        _depth = 0
+        pm.refresh(suspend=False)
+        pm.undoInfo(stateWithoutFlush=undo_state)
+        # Creation commands select what they make; give the user back their selection.
+        selection = [node for node in selection if node.exists()]
+        if selection:
+            pm.select(selection, replace=True)
+        else:
+            pm.select(clear=True)
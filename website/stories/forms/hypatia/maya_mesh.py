@@ -0,0 +1,107 @@
+"""
+Maya adapters for the headless geometry in hypatia_geometry.
+"""
+import maya.api.OpenMaya as om
+import numpy as np
+import pymel.core as pm
+
+from hypatia_geometry import MeshData
+
+
+def create_mesh(data, parent=None):
+    """
+    Creates a polygon mesh node from MeshData in a single MFnMesh.create call.
+
+    Parameters:
+      data (MeshData): The mesh arrays to build.
+      parent (PyNode): Optional transform to parent the new mesh under.
+
+    Returns:
+      PyNode: The transform of the created mesh, named after data.name.
+    """
+    points = om.MPointArray([om.MPoint(*p) for p in data.points.tolist()])
+    counts = data.face_counts.tolist()
+    us = data.uvs[:, 0].tolist()
+    vs = data.uvs[:, 1].tolist()
+
+    fn = om.MFnMesh()
+    transform_obj = fn.create(points, counts, data.face_connects.tolist(), us, vs)
+    fn.assignUVs(counts, data.uv_connects.tolist())
+    if data.normals is not None:
+        face_ids = np.repeat(np.arange(len(counts)), data.face_counts).tolist()
+        normals = om.MVectorArray([om.MVector(*n) for n in data.normals.tolist()])
+        fn.setFaceVertexNormals(normals, face_ids, data.face_connects.tolist())
+
+    transform = pm.PyNode(om.MFnDagNode(transform_obj).fullPathName())
+    transform.rename(data.name)
+    # Meshes created through the API have no shading group until one is assigned.
+    pm.sets("initialShadingGroup", edit=True, forceElement=transform)
+    if parent is not None:
+        pm.parent(transform, parent)
+    return transform
+
+
+def update_mesh(node, data):
+    """
+    Replaces the geometry of an existing mesh node with MeshData, in place.
+
+    The transform and shape keep their names, parent, shading and
+    connections; only the points, faces, UVs and normals change.
+
+    Parameters:
+      node (PyNode): The mesh transform or shape.
+      data (MeshData): The new mesh arrays.
+
+    Returns:
+      PyNode: node.
+    """
+    selection = om.MSelectionList()
+    selection.add(str(node))
+    fn = om.MFnMesh(selection.getDagPath(0))
+
+    counts = data.face_counts.tolist()
+    fn.createInPlace(om.MPointArray([om.MPoint(*p) for p in data.points.tolist()]), counts,
+                     data.face_connects.tolist())
+    # setUVs cannot shrink the UV array, so a rebuild at a lower resolution starts from an empty one.
+    fn.clearUVs()
+    fn.setUVs(data.uvs[:, 0].tolist(), data.uvs[:, 1].tolist())
+    fn.assignUVs(counts, data.uv_connects.tolist())
+    if data.normals is not None:
+        face_ids = np.repeat(np.arange(len(counts)), data.face_counts).tolist()
+        normals = om.MVectorArray([om.MVector(*n) for n in data.normals.tolist()])
+        fn.setFaceVertexNormals(normals, face_ids, data.face_connects.tolist())
+    return node
+
+
+def read_mesh(node, world=True):
+    """
+    Reads a polygon mesh node into MeshData with a handful of bulk API queries.
+
+    Parameters:
+      node (PyNode or str): The mesh transform or shape.
+      world (bool): Return world-space points instead of object-space ones.
+
+    Returns:
+      MeshData: The mesh's points, faces and UVs. Meshes with unmapped faces
+      get a single UV at the origin for every face-vertex.
+    """
+    selection = om.MSelectionList()
+    selection.add(str(node))
+    fn = om.MFnMesh(selection.getDagPath(0))
+
+    points = np.array(fn.getPoints(om.MSpace.kWorld if world else om.MSpace.kObject), dtype=np.float64)[:, :3]
+    counts, connects = fn.getVertices()
+    counts = np.array(counts, dtype=np.int32)
+    connects = np.array(connects, dtype=np.int32)
+
+    us, vs = fn.getUVs()
+    uv_counts, uv_ids = fn.getAssignedUVs()
+    if len(uv_ids) == len(connects) and len(us):
+        uvs = np.stack([np.array(us), np.array(vs)], axis=1)
+        uv_connects = np.array(uv_ids, dtype=np.int32)
+    else:
+        uvs = np.zeros((1, 2))
+        uv_connects = np.zeros(len(connects), dtype=np.int32)
+
+    return MeshData(points=points, face_counts=counts, face_connects=connects, uvs=uvs, uv_connects=uv_connects,
+                    name=str(node))
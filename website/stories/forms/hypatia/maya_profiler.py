@@ -0,0 +1,253 @@
+"""
+Opt-in profiling of the Maya commands issued by the builder scripts.
+
+CommandProfiler.instrument swaps the pm module seen by the given script
+modules for a proxy that times every command. Each call is attributed to the
+chain of script functions that issued it, so the profile shows which builder,
+and which helper inside it, spends the time. DAG nodes created and deleted are
+counted through MDGMessage callbacks, whether a pm command or the API made
+them.
+
+Methods called on nodes (shape.getUVs, mesh.rename, ...) go through pymel's
+node classes rather than the pm module and are not counted.
+"""
+import contextlib
+import json
+import os
+import sys
+import time
+import warnings
+from collections import defaultdict
+from dataclasses import dataclass, asdict
+
+import maya.api.OpenMaya as om
+
+# Leaf of nodes created outside any pm command, by OpenMaya calls.
+API_FRAME = "(OpenMaya)"
+
+# Builder of nodes created outside every instrumented function.
+UNKNOWN_FRAME = "(unknown)"
+
+
+@dataclass
+class CommandStats:
+    """
+    Totals of the commands issued from one call stack, function or command.
+
+    Attributes:
+      count (int): Number of calls.
+      seconds (float): Cumulative wall time of the calls.
+      nodes_created (int): DAG nodes created by the calls.
+      nodes_deleted (int): DAG nodes deleted by the calls.
+    """
+    count: int = 0
+    seconds: float = 0.0
+    nodes_created: int = 0
+    nodes_deleted: int = 0
+
+    def add(self, other):
+        self.count += other.count
+        self.seconds += other.seconds
+        self.nodes_created += other.nodes_created
+        self.nodes_deleted += other.nodes_deleted
+
+
+class _ProfiledCommands:
+    """Stands in for the pm module of an instrumented script, timing every command."""
+
+    def __init__(self, pm, profiler):
+        self._pm = pm
+        self._profiler = profiler
+
+    def __getattr__(self, name):
+        attribute = getattr(self._pm, name)
+        # Classes (PyNode, node types) and namespaces pass through untouched.
+        if not callable(attribute) or isinstance(attribute, type):
+            return attribute
+
+        def command(*args, **kwargs):
+            return self._profiler.call(name, attribute, args, kwargs)
+
+        return command
+
+
+class CommandProfiler:
+    """
+    Collects per-stack command counts, time and node totals of instrumented scripts.
+
+    Example:
+      profiler = CommandProfiler(commands_per_vertex=0.05)
+      with profiler.instrument(hypatia, maya_mesh):
+          hypatia.create_orbit()
+      profiler.write("orbit_profile")
+
+    Parameters:
+      commands_per_vertex (float): Optional budget. A builder issuing more
+        commands per vertex of the meshes it leaves in the scene raises a warning.
+    """
+
+    def __init__(self, commands_per_vertex=None):
+        self.commands_per_vertex = commands_per_vertex
+        self.stacks = defaultdict(CommandStats)
+        self._meshes = defaultdict(list)
+        self._module_names = set()
+        self._active = None
+
+    @contextlib.contextmanager
+    def instrument(self, *modules):
+        """
+        Profiles the pm commands of modules until the context exits.
+
+        Parameters:
+          *modules (module): Script modules whose global pm is replaced by the proxy.
+        """
+        originals = [(module, module.pm) for module in modules]
+        for module in modules:
+            module.pm = _ProfiledCommands(module.pm, self)
+            self._module_names.add(module.__name__)
+        callbacks = [
+            om.MDGMessage.addNodeAddedCallback(self._node_added, "dagNode"),
+            om.MDGMessage.addNodeRemovedCallback(self._node_removed, "dagNode"),
+            om.MDGMessage.addNodeAddedCallback(self._mesh_added, "mesh"),
+        ]
+        try:
+            yield self
+        finally:
+            for callback in callbacks:
+                om.MMessage.removeCallback(callback)
+            for module, pm in originals:
+                module.pm = pm
+
+    def call(self, name, command, args, kwargs):
+        """Runs one pm command, adding its time to the current call stack."""
+        stack = self._stack() + ("pm." + name,)
+        outer, self._active = self._active, stack
+        start = time.perf_counter()
+        try:
+            return command(*args, **kwargs)
+        finally:
+            stats = self.stacks[stack]
+            stats.count += 1
+            stats.seconds += time.perf_counter() - start
+            self._active = outer
+
+    # ----------------------------------------------------
+    # Reports
+    # ----------------------------------------------------
+    def functions(self):
+        """Returns {function: CommandStats} of every command issued while it was on the stack."""
+        totals = defaultdict(CommandStats)
+        for stack, stats in self.stacks.items():
+            for frame in set(stack[:-1]):
+                totals[frame].add(stats)
+        return dict(totals)
+
+    def commands(self):
+        """Returns {command: CommandStats} over every stack."""
+        totals = defaultdict(CommandStats)
+        for stack, stats in self.stacks.items():
+            totals[stack[-1]].add(stats)
+        return dict(totals)
+
+    def builders(self):
+        """
+        Returns the totals of each builder, the outermost instrumented function of a stack.
+
+        Vertices are those of the meshes the builder created that are still in
+        the scene, so shapes shared by instances count once.
+        """
+        totals = defaultdict(CommandStats)
+        for stack, stats in self.stacks.items():
+            totals[stack[0] if len(stack) > 1 else UNKNOWN_FRAME].add(stats)
+        report = {}
+        for builder, stats in totals.items():
+            vertices = sum(om.MFnMesh(handle.object()).numVertices
+                           for handle in self._meshes.get(builder, ()) if handle.isValid())
+            report[builder] = dict(asdict(stats), vertices=vertices,
+                                   commands_per_vertex=stats.count / vertices if vertices else None)
+        return report
+
+    def check_budget(self):
+        """
+        Warns about every builder over the commands_per_vertex budget.
+
+        Returns:
+          list: The names of the builders over budget.
+        """
+        if self.commands_per_vertex is None:
+            return []
+        over = []
+        for builder, report in sorted(self.builders().items()):
+            ratio = report["commands_per_vertex"]
+            if ratio is not None and ratio > self.commands_per_vertex:
+                warnings.warn("%s issued %d commands for %d vertices (%.4f per vertex, budget %.4f)" % (
+                    builder, report["count"], report["vertices"], ratio, self.commands_per_vertex),
+                    RuntimeWarning, stacklevel=2)
+                over.append(builder)
+        return over
+
+    def collapsed(self):
+        """
+        Returns the profile in the collapsed-stack format of flamegraph.pl and speedscope.
+
+        Each line is a semicolon-separated stack and its time in microseconds.
+        """
+        lines = []
+        for stack, stats in sorted(self.stacks.items()):
+            lines.append("%s %d" % (";".join(stack), max(1, round(stats.seconds * 1e6))))
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        """Returns a JSON-serializable summary of functions, commands and builders."""
+        by_time = lambda totals: {name: asdict(stats) for name, stats in
+                                  sorted(totals.items(), key=lambda item: -item[1].seconds)}
+        return {
+            "functions": by_time(self.functions()),
+            "commands": by_time(self.commands()),
+            "builders": self.builders(),
+            "commands_per_vertex_budget": self.commands_per_vertex,
+            "over_budget": self.check_budget(),
+        }
+
+    def write(self, path):
+        """
+        Writes path.folded (collapsed stacks) and path.json (summary).
+
+        Returns:
+          tuple: The two paths written.
+        """
+        folded_path, json_path = path + ".folded", path + ".json"
+        with open(folded_path, "w") as f:
+            f.write(self.collapsed())
+        with open(json_path, "w") as f:
+            json.dump(self.summary(), f, indent=2)
+            f.write("\n")
+        return folded_path, json_path
+
+    # ----------------------------------------------------
+    # Internals
+    # ----------------------------------------------------
+    def _stack(self):
+        """Returns the instrumented functions on the Python stack, outermost first."""
+        frames = []
+        frame = sys._getframe(2)
+        while frame is not None:
+            # Module-level code is not a builder; a script run as __main__ starts at its first function.
+            if frame.f_globals.get("__name__") in self._module_names and frame.f_code.co_name != "<module>":
+                script = os.path.splitext(os.path.basename(frame.f_code.co_filename))[0]
+                frames.append("%s.%s" % (script, frame.f_code.co_name))
+            frame = frame.f_back
+        return tuple(reversed(frames))
+
+    def _current(self):
+        return self._active or self._stack() + (API_FRAME,)
+
+    def _node_added(self, node, client_data):
+        self.stacks[self._current()].nodes_created += 1
+
+    def _node_removed(self, node, client_data):
+        self.stacks[self._current()].nodes_deleted += 1
+
+    def _mesh_added(self, node, client_data):
+        stack = self._current()
+        self._meshes[stack[0] if len(stack) > 1 else UNKNOWN_FRAME].append(om.MObjectHandle(node))
@@ -0,0 +1,277 @@
+"""
+Baked animation of the orbit rings and their planets.
+
+hypatia.ts spins every ring around X at its own speed and moves the planets
+around their ring, evaluating the transforms each frame. Here the same motion
+is baked once, every frame in a single vectorized evaluation, into compact
+arrays: a quaternion track per ring and a translation track per planet, in
+float32 or float16. Tracks can be thinned to the keys needed to stay within an
+error tolerance, then written as a glTF animation clip
+(gltf_export.export_sculpture or export_animation) or as Maya anim curves
+(maya_anim.create_anim_curves), so the site and offline renders play the same
+motion.
+"""
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+from hypatia_geometry import (
+    RADIUS, ORBIT_TOTAL, PLANETS_PER_RING, lerp, orbit_ring_radius, orbit_planet_angles, orbit_planet_positions,
+)
+
+ANIMATION_FPS = 30
+
+# Ring speeds in radians per second, from the innermost to the outermost ring.
+RING_SPEED_INNER = 2.0
+RING_SPEED_OUTER = 1.0
+
+# Planet speed around its ring, in radians per second.
+PLANET_SPEED = 1.0
+
+# Largest error of a reduced track, in scene units or quaternion components.
+KEY_TOLERANCE = 1e-4
+
+
+def ring_speeds(total=ORBIT_TOTAL):
+    """Returns the rotation speed of every orbit ring, in radians per second."""
+    p = np.arange(total) / (total - 1) if total > 1 else np.zeros(total)
+    return lerp(RING_SPEED_INNER, RING_SPEED_OUTER, p)
+
+
+def ring_name(index):
+    return "SM_Orbit%s" % index
+
+
+def planet_name(index, planet):
+    return "SM_Planet%s_%s" % (planet, index)
+
+
+@dataclass
+class OrbitAnimation:
+    """
+    Every frame of the orbit animation, sampled at a fixed rate.
+
+    Attributes:
+      times (ndarray): (N,) frame times in seconds.
+      ring_names (list): Name of each ring node.
+      rotations (ndarray): (N, R, 4) (x, y, z, w) quaternion of every ring at every frame.
+      planet_names (list): Name of each planet node.
+      planet_rings (ndarray): (P,) index of the ring each planet is parented to.
+      translations (ndarray): (N, P, 3) position of every planet in its ring's space.
+      speeds (ndarray): (R,) rotation speed of each ring, in radians per second.
+    """
+    times: np.ndarray
+    ring_names: list
+    rotations: np.ndarray
+    planet_names: list
+    planet_rings: np.ndarray
+    translations: np.ndarray
+    speeds: np.ndarray
+
+    @property
+    def frame_count(self):
+        return len(self.times)
+
+
+@dataclass
+class AnimationTrack:
+    """
+    The keys of one node property.
+
+    Attributes:
+      node (str): Name of the animated node.
+      path (str): "rotation" for (x, y, z, w) quaternions, "translation" for positions.
+      times (ndarray): (K,) key times in seconds.
+      values (ndarray): (K, 4) or (K, 3) key values.
+    """
+    node: str
+    path: str
+    times: np.ndarray
+    values: np.ndarray
+
+
+def bake_orbit(total=ORBIT_TOTAL, radius=RADIUS, frames=None, fps=ANIMATION_FPS, speed=1.0, dtype=np.float32,
+               planets=False):
+    """
+    Bakes the ring rotations and planet positions of every frame at once.
+
+    Parameters:
+      total (int): Number of orbit rings.
+      radius (float): Sculpture radius, as given to orbit_ring.
+      frames (int): Number of frames. Defaults to one turn of the slowest ring
+        and of the planets, both frames included.
+      fps (float): Frames per second.
+      speed (float): Overall speed multiplier, the animation.speed of hypatia.ts.
+      dtype: float32, or float16 for half the size.
+      planets (bool): Also bake the planets riding on the rings.
+
+    Returns:
+      OrbitAnimation: The baked frames.
+    """
+    speeds = ring_speeds(total) * speed
+    if frames is None:
+        frames = int(round(2 * math.pi / (min(RING_SPEED_OUTER, PLANET_SPEED) * speed) * fps)) + 1
+    times = np.arange(frames) / fps
+
+    # Rings turn around X; a rotation by a about X is (sin(a/2), 0, 0, cos(a/2)).
+    half_angles = np.outer(times, speeds) / 2
+    rotations = np.zeros((frames, total, 4))
+    rotations[..., 0] = np.sin(half_angles)
+    rotations[..., 3] = np.cos(half_angles)
+
+    # Planets run around their ring from their start angle.
+    per_ring = PLANETS_PER_RING if planets else 0
+    starts = np.concatenate([orbit_planet_angles(i, total)[:per_ring] for i in range(total)])
+    planet_rings = np.repeat(np.arange(total), per_ring)
+    ring_radii = np.array([orbit_ring_radius(i, total, radius) for i in range(total)])
+    angles = starts[None, :] + times[:, None] * (PLANET_SPEED * speed)
+    translations = orbit_planet_positions(ring_radii[planet_rings][None, :], angles)
+
+    return OrbitAnimation(
+        times=times.astype(np.float32),
+        ring_names=[ring_name(i) for i in range(total)],
+        rotations=rotations.astype(dtype),
+        planet_names=[planet_name(i, j) for i in range(total) for j in range(per_ring)],
+        planet_rings=planet_rings.astype(np.int32),
+        translations=translations.astype(dtype),
+        speeds=speeds,
+    )
+
+
+# ----------------------------------------------------
+# Keyframe reduction
+# ----------------------------------------------------
+def reduce_keyframes(times, values, tolerance=KEY_TOLERANCE, slerp=False):
+    """
+    Returns the indices of the keys to keep so interpolation stays within tolerance.
+
+    Keys are chosen by Douglas-Peucker: a span between two kept keys is split
+    at its worst frame until interpolating across it misses no frame by more
+    than tolerance on any component. The first and last keys are always kept.
+
+    Parameters:
+      times (ndarray): (N,) key times.
+      values (ndarray): (N,) or (N, C) key values.
+      tolerance (float): Largest allowed error per component.
+      slerp (bool): Values are unit quaternions played back with slerp, as
+        glTF and three.js do for rotations, instead of linear interpolation.
+
+    Returns:
+      ndarray: The sorted indices of the kept keys.
+    """
+    times = np.asarray(times, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64).reshape(len(times), -1)
+    count = len(times)
+    if count <= 2:
+        return np.arange(count)
+
+    keep = np.zeros(count, dtype=bool)
+    keep[[0, -1]] = True
+    spans = [(0, count - 1)]
+    while spans:
+        a, b = spans.pop()
+        if b - a < 2:
+            continue
+        t = (times[a + 1:b] - times[a]) / (times[b] - times[a])
+        interpolated = _slerp(values[a], values[b], t) if slerp else values[a] + t[:, None] * (values[b] - values[a])
+        error = np.abs(values[a + 1:b] - interpolated).max(axis=1)
+        if slerp:
+            # q and -q are the same rotation.
+            error = np.minimum(error, np.abs(values[a + 1:b] + interpolated).max(axis=1))
+        worst = int(error.argmax())
+        if error[worst] > tolerance:
+            split = a + 1 + worst
+            keep[split] = True
+            spans.append((a, split))
+            spans.append((split, b))
+    return np.flatnonzero(keep)
+
+
+def _slerp(a, b, t):
+    """Spherical interpolation from quaternion a to b, the shorter way, at every t."""
+    dot = float(np.dot(a, b))
+    if dot < 0:
+        b, dot = -b, -dot
+    theta = math.acos(min(dot, 1.0))
+    if theta < 1e-6:
+        q = a + t[:, None] * (b - a)
+        return q / np.linalg.norm(q, axis=1, keepdims=True)
+    return (np.sin((1 - t) * theta)[:, None] * a + np.sin(t * theta)[:, None] * b) / math.sin(theta)
+
+
+def animation_tracks(animation, tolerance=KEY_TOLERANCE):
+    """
+    Splits baked frames into one track per animated node property.
+
+    Parameters:
+      animation (OrbitAnimation): The baked frames.
+      tolerance (float): Reduce every track within this error, or None to keep every frame.
+
+    Returns:
+      list: AnimationTrack per ring rotation, then per planet translation.
+    """
+    tracks = []
+    properties = [(animation.ring_names, "rotation", animation.rotations),
+                  (animation.planet_names, "translation", animation.translations)]
+    for names, path, frames in properties:
+        for i, name in enumerate(names):
+            values = frames[:, i]
+            if tolerance is not None:
+                keys = reduce_keyframes(animation.times, values, tolerance, slerp=path == "rotation")
+                tracks.append(AnimationTrack(name, path, animation.times[keys], values[keys]))
+            else:
+                tracks.append(AnimationTrack(name, path, animation.times, values))
+    return tracks
+
+
+# ----------------------------------------------------
+# Maya channels
+# ----------------------------------------------------
+def euler_channels(rotations):
+    """
+    Returns the XYZ Euler angles, in radians, of (N, ...) quaternion frames.
+
+    Angles are unwrapped along the frames, so a ring turning past 180 degrees
+    keeps increasing instead of jumping back.
+
+    Returns:
+      ndarray: (N, ..., 3) rotateX, rotateY and rotateZ.
+    """
+    q = np.asarray(rotations, dtype=np.float64)
+    x, y, z, w = q[..., 0], q[..., 1], q[..., 2], q[..., 3]
+    # XYZ order applies X first, so the quaternion is qz * qy * qx.
+    rx = np.arctan2(2 * (w * x + y * z), 1 - 2 * (x * x + y * y))
+    ry = np.arcsin(np.clip(2 * (w * y - z * x), -1.0, 1.0))
+    rz = np.arctan2(2 * (w * z + x * y), 1 - 2 * (y * y + z * z))
+    return np.unwrap(np.stack([rx, ry, rz], axis=-1), axis=0)
+
+
+def anim_curves(animation, tolerance=KEY_TOLERANCE):
+    """
+    Returns the Maya anim curves playing the baked frames.
+
+    Ring rotations become rotateX/Y/Z curves in radians and planet positions
+    translateX/Y/Z curves. Maya interpolates each curve on its own, so every
+    channel is reduced separately, and channels that never move get no curve.
+
+    Parameters:
+      animation (OrbitAnimation): The baked frames.
+      tolerance (float): Reduce every curve within this error, or None to keep every frame.
+
+    Returns:
+      list: (node, attribute, times, values) tuples, times in seconds.
+    """
+    curves = []
+    channels = [(animation.ring_names, "rotate", euler_channels(animation.rotations)),
+                (animation.planet_names, "translate", animation.translations.astype(np.float64))]
+    for names, attribute, frames in channels:
+        for i, name in enumerate(names):
+            for axis, axis_name in enumerate("XYZ"):
+                values = frames[:, i, axis]
+                if np.ptp(values) <= (tolerance or 0.0):
+                    continue
+                keys = (reduce_keyframes(animation.times, values, tolerance) if tolerance is not None
+                        else np.arange(len(values)))
+                curves.append((name, attribute + axis_name, animation.times[keys], values[keys]))
+    return curves
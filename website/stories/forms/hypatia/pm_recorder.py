@@ -0,0 +1,671 @@
+"""
+A recording stand-in for pymel.core, maya.api.OpenMaya and maya.api.OpenMayaAnim.
+
+Installing it lets hypatia.py and xx.py be imported and run on machines
+without Maya. Every command is recorded with its arguments instead of being
+executed, and scene nodes are simulated just enough for the builders to run:
+transforms with a hierarchy, and mesh shapes holding their MeshData so vertex
+totals, duplicates and point queries behave like the real scene.
+"""
+import contextlib
+import sys
+import types
+from collections import Counter
+
+import numpy as np
+
+import hypatia_geometry as geometry
+
+_STUBBED_MODULES = ("pymel", "pymel.core", "pymel.core.datatypes", "maya", "maya.api", "maya.api.OpenMaya",
+                    "maya.api.OpenMayaAnim")
+
+# Local modules importing pymel or OpenMaya, reimported under every recording.
+_MAYA_MODULES = ("maya_mesh", "maya_anim", "maya_context", "maya_profiler")
+
+
+class Recorder:
+    """
+    Records commands and tracks the simulated scene.
+
+    Attributes:
+      commands (list): (name, args, kwargs) of every command, in call order.
+      nodes_created (int): Number of DAG nodes created.
+      nodes_deleted (int): Number of DAG nodes deleted.
+      vertices_created (int): Number of mesh vertices created, duplicates included.
+    """
+
+    def __init__(self):
+        self.commands = []
+        self.nodes = {}
+        self.nodes_created = 0
+        self.nodes_deleted = 0
+        self.vertices_created = 0
+        self.selection = []
+        self.undo_enabled = True
+        self.refresh_suspended = False
+        self.callbacks = {}
+        self._next_suffix = {}
+
+    def record(self, name, args=(), kwargs=None):
+        self.commands.append((name, args, kwargs or {}))
+
+    def reset(self):
+        """Clears the recorded commands and totals, keeping the simulated scene."""
+        self.commands = []
+        self.nodes_created = 0
+        self.nodes_deleted = 0
+        self.vertices_created = 0
+
+    def command_counts(self):
+        """Returns a Counter of command names."""
+        return Counter(name for name, _, _ in self.commands)
+
+    def summary(self):
+        """Returns the command, node and vertex totals of the recording."""
+        return {
+            "commands": len(self.commands),
+            "nodes_created": self.nodes_created,
+            "nodes_deleted": self.nodes_deleted,
+            "vertices_created": self.vertices_created,
+        }
+
+    # ----------------------------------------------------
+    # Simulated scene
+    # ----------------------------------------------------
+    def create_transform(self, name, mesh=None):
+        """Creates a transform, with a mesh shape under it when mesh is given."""
+        transform = Transform(self, self._unique_name(name))
+        if mesh is not None:
+            shape = Mesh(self, self._unique_name(transform.name() + "Shape"), mesh)
+            transform.add_child(shape)
+        return transform
+
+    def register(self, node):
+        self.nodes[node.name()] = node
+        self.nodes_created += 1
+        if isinstance(node, Mesh):
+            self.vertices_created += node.data.vertex_count
+        self._notify("added", node)
+
+    def unregister(self, node):
+        for child in list(node.children):
+            self.unregister(child)
+        self._notify("removed", node)
+        if self.nodes.get(node.name()) is node:
+            del self.nodes[node.name()]
+        self.nodes_deleted += 1
+
+    def _notify(self, event, node):
+        # Like MDGMessage, a "mesh" callback only hears about mesh shapes.
+        for callback_event, node_type, function, client_data in list(self.callbacks.values()):
+            if callback_event == event and (node_type != "mesh" or isinstance(node, Mesh)):
+                function(node, client_data)
+
+    def lookup(self, name):
+        return self.nodes[str(name).split("|")[-1]]
+
+    def _unique_name(self, name):
+        if name not in self.nodes:
+            return name
+        # Remember the next free suffix per name so thousands of copies stay linear.
+        index = self._next_suffix.get(name, 1)
+        while "%s%d" % (name, index) in self.nodes:
+            index += 1
+        self._next_suffix[name] = index + 1
+        return "%s%d" % (name, index)
+
+
+class Node:
+    """A simulated DAG node."""
+
+    def __init__(self, recorder, name):
+        self._recorder = recorder
+        self._name = name
+        self.children = []
+        self.parent = None
+        recorder.register(self)
+
+    def name(self):
+        return self._name
+
+    def rename(self, name):
+        self._recorder.record("rename", (self, name))
+        return self.set_name(name)
+
+    def set_name(self, name):
+        del self._recorder.nodes[self._name]
+        self._name = self._recorder._unique_name(name)
+        self._recorder.nodes[self._name] = self
+        return self
+
+    def exists(self):
+        return self._recorder.nodes.get(self._name) is self
+
+    def add_child(self, child):
+        if child.parent is not None:
+            child.parent.children.remove(child)
+        child.parent = self
+        self.children.append(child)
+
+    def __str__(self):
+        return self._name
+
+    def __repr__(self):
+        return "%s(%r)" % (type(self).__name__, self._name)
+
+
+class Attribute:
+    """A settable attribute of a simulated node."""
+
+    def __init__(self, node, name):
+        self.node = node
+        self.attr = name
+
+    def set(self, *value):
+        self.node._recorder.record("setAttr", ("%s.%s" % (self.node, self.attr),) + value)
+
+    def get(self):
+        self.node._recorder.record("getAttr", ("%s.%s" % (self.node, self.attr),))
+        return 0
+
+
+class Transform(Node):
+    """A simulated transform node."""
+
+    def getShape(self):
+        shapes = [c for c in self.children if isinstance(c, Mesh)]
+        return shapes[0] if shapes else None
+
+    def setMatrix(self, matrix, worldSpace=False):
+        self._recorder.record("setMatrix", (self, matrix), {"worldSpace": worldSpace})
+
+    def __getattr__(self, name):
+        if name.startswith(("rotate", "translate", "scale", "visibility")):
+            return Attribute(self, name)
+        raise AttributeError(name)
+
+
+class Shape(Node):
+    """A simulated shape without geometry, such as a particle shape."""
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return Attribute(self, name)
+
+
+class Mesh(Node):
+    """A simulated mesh shape holding its MeshData."""
+
+    def __init__(self, recorder, name, data):
+        self.data = data
+        super().__init__(recorder, name)
+
+    @property
+    def f(self):
+        starts = np.cumsum(self.data.face_counts) - self.data.face_counts
+        return [MeshFace(self, i, starts[i]) for i in range(self.data.face_count)]
+
+    faces = f
+
+    @property
+    def vtx(self):
+        return [MeshVertex(self, i) for i in range(self.data.vertex_count)]
+
+    def getUVSetNames(self):
+        self._recorder.record("getUVSetNames", (self,))
+        return ["map1"]
+
+    def getUVs(self, uvSet=None):
+        self._recorder.record("getUVs", (self,), {"uvSet": uvSet})
+        return self.data.uvs[:, 0].tolist(), self.data.uvs[:, 1].tolist()
+
+    def setUVs(self, us, vs, uvSet=None):
+        self._recorder.record("setUVs", (self, len(us)), {"uvSet": uvSet})
+        self.data.uvs = np.stack([us, vs], axis=1)
+
+    def getPoints(self, space="object"):
+        self._recorder.record("getPoints", (self,), {"space": space})
+        return self.data.points.copy()
+
+    def getVertices(self):
+        self._recorder.record("getVertices", (self,))
+        return self.data.face_counts.tolist(), self.data.face_connects.tolist()
+
+
+class MeshFace:
+    """A simulated face component."""
+
+    def __init__(self, mesh, index, start):
+        self.mesh = mesh
+        self.index = index
+        self.start = start
+
+    def vertices(self):
+        count = self.mesh.data.face_counts[self.index]
+        return self.mesh.data.face_connects[self.start:self.start + count]
+
+    def __str__(self):
+        return "%s.f[%d]" % (self.mesh, self.index)
+
+
+class MeshVertex:
+    """A simulated vertex component."""
+
+    def __init__(self, mesh, index):
+        self.mesh = mesh
+        self.index = index
+
+    def __str__(self):
+        return "%s.vtx[%d]" % (self.mesh, self.index)
+
+
+# ----------------------------------------------------
+# pymel.core commands
+# ----------------------------------------------------
+class _Commands:
+    """Command implementations of the stand-in, keyed by pymel command name."""
+
+    def __init__(self, recorder):
+        self.r = recorder
+
+    def group(self, *nodes, **kwargs):
+        group = self.r.create_transform(kwargs.get("name", kwargs.get("n", "group")))
+        for node in _flatten(nodes):
+            group.add_child(node)
+        if kwargs.get("parent") is not None:
+            kwargs["parent"].add_child(group)
+        return group
+
+    def parent(self, *nodes):
+        *children, parent = _flatten(nodes)
+        for child in children:
+            parent.add_child(child)
+
+    def particle(self, name="particle", **kwargs):
+        transform = self.r.create_transform(name)
+        shape = Shape(self.r, self.r._unique_name(transform.name() + "Shape"))
+        transform.add_child(shape)
+        return [transform, shape]
+
+    def particleInstancer(self, shape, name="instancer", **kwargs):
+        return self.r.create_transform(name)
+
+    def duplicate(self, node, name=None, **kwargs):
+        return [self._copy(node, name)]
+
+    def instance(self, node, name=None, **kwargs):
+        copy = Transform(self.r, self.r._unique_name(name or node.name()))
+        # Instances share the original's children rather than copying them.
+        copy.children = list(node.children)
+        return [copy]
+
+    def delete(self, *nodes, **kwargs):
+        if kwargs.get("constructionHistory") or kwargs.get("ch"):
+            return
+        for node in _flatten(nodes):
+            if isinstance(node, Node):
+                if node.parent is not None and node in node.parent.children:
+                    node.parent.children.remove(node)
+                self.r.unregister(node)
+
+    def rename(self, node, name):
+        return node.set_name(name)
+
+    def ls(self, *nodes, **kwargs):
+        if kwargs.get("selection") or kwargs.get("sl"):
+            return list(self.r.selection)
+        return _flatten(nodes)
+
+    def polyCube(self, w=1, h=1, d=1, name="pCube", **kwargs):
+        transform = self.r.create_transform(name + "1", geometry.cube(w, h, d))
+        return [transform, None]
+
+    def polyPlatonic(self, r=1, primitive=2, name="pSolid", **kwargs):
+        transform = self.r.create_transform(name + "1", geometry.dodecahedron(r))
+        return [transform, None]
+
+    def polyListComponentConversion(self, component, toVertex=False, **kwargs):
+        if toVertex and isinstance(component, MeshFace):
+            return [MeshVertex(component.mesh, i) for i in component.vertices()]
+        return []
+
+    def pointPosition(self, vertex, world=False, **kwargs):
+        return tuple(vertex.mesh.data.points[vertex.index].tolist())
+
+    def curve(self, name="curve", **kwargs):
+        return self.r.create_transform(name)
+
+    def undoInfo(self, query=False, state=None, stateWithoutFlush=None, **kwargs):
+        if query:
+            return self.r.undo_enabled
+        self.r.undo_enabled = state if state is not None else stateWithoutFlush
+
+    def refresh(self, suspend=None, **kwargs):
+        if suspend is not None:
+            self.r.refresh_suspended = suspend
+
+    def select(self, *nodes, **kwargs):
+        self.r.selection = [] if kwargs.get("clear") else _flatten(nodes)
+
+    def _copy(self, node, name=None):
+        if isinstance(node, Mesh):
+            data = geometry.MeshData(**{k: getattr(node.data, k) for k in node.data.__dataclass_fields__})
+            copy = Mesh(self.r, self.r._unique_name(node.name()), data)
+        else:
+            copy = Transform(self.r, self.r._unique_name(name or node.name()))
+        for child in node.children:
+            copy.add_child(self._copy(child))
+        return copy
+
+
+def _flatten(items):
+    flat = []
+    for item in items:
+        if isinstance(item, (list, tuple)):
+            flat.extend(_flatten(item))
+        elif item is not None:
+            flat.append(item)
+    return flat
+
+
+# ----------------------------------------------------
+# pymel.core.datatypes
+# ----------------------------------------------------
+class Vector:
+    """Enough of pymel's datatypes.Vector for the builders."""
+
+    def __init__(self, *values):
+        if len(values) == 1:
+            values = values[0]
+        if isinstance(values, Vector):
+            values = values._v
+        self._v = np.array(values, dtype=np.float64).reshape(3)
+
+    x = property(lambda self: self._v[0])
+    y = property(lambda self: self._v[1])
+    z = property(lambda self: self._v[2])
+
+    def __iter__(self):
+        return iter(self._v.tolist())
+
+    def __add__(self, other):
+        return Vector(self._v + Vector(other)._v)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        return Vector(self._v - Vector(other)._v)
+
+    def __mul__(self, scalar):
+        return Vector(self._v * scalar)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, scalar):
+        return Vector(self._v / scalar)
+
+    def dot(self, other):
+        return float(self._v @ other._v)
+
+    def cross(self, other):
+        return Vector(np.cross(self._v, other._v))
+
+    def normal(self):
+        return Vector(self._v / np.linalg.norm(self._v))
+
+
+class Matrix:
+    """Enough of pymel's datatypes.Matrix for the builders."""
+
+    def __init__(self, rows):
+        self._m = np.array(rows, dtype=np.float64).reshape(4, 4)
+
+
+# ----------------------------------------------------
+# maya.api.OpenMaya
+# ----------------------------------------------------
+def _openmaya(recorder):
+    module = types.ModuleType("maya.api.OpenMaya")
+
+    class MFnMesh:
+        def __init__(self, node=None):
+            # Like a dag path to a transform, a transform extends to its shape.
+            self._node = node.getShape() if isinstance(node, Transform) else node
+
+        @property
+        def numVertices(self):
+            return self._node.data.vertex_count
+
+        def getPoints(self, space=None):
+            recorder.record("MFnMesh.getPoints", (self._node,))
+            return np.hstack([self._node.data.points, np.ones((self._node.data.vertex_count, 1))]).tolist()
+
+        def getVertices(self):
+            recorder.record("MFnMesh.getVertices", (self._node,))
+            return self._node.data.face_counts.tolist(), self._node.data.face_connects.tolist()
+
+        def getUVs(self):
+            recorder.record("MFnMesh.getUVs", (self._node,))
+            return self._node.data.uvs[:, 0].tolist(), self._node.data.uvs[:, 1].tolist()
+
+        def getAssignedUVs(self):
+            recorder.record("MFnMesh.getAssignedUVs", (self._node,))
+            return self._node.data.face_counts.tolist(), self._node.data.uv_connects.tolist()
+
+        def create(self, points, counts, connects, us=None, vs=None):
+            recorder.record("MFnMesh.create", (len(points), len(counts)))
+            data = geometry.MeshData(
+                points=np.asarray(points, dtype=np.float64).reshape(-1, 3),
+                face_counts=np.asarray(counts, dtype=np.int32),
+                face_connects=np.asarray(connects, dtype=np.int32),
+                uvs=np.stack([us or [], vs or []], axis=1),
+                uv_connects=np.zeros(len(connects), dtype=np.int32),
+            )
+            self._transform = recorder.create_transform("polySurface", data)
+            return self._transform
+
+        def _shape(self):
+            return self._transform.getShape() if self._node is None else self._node
+
+        def createInPlace(self, points, counts, connects):
+            recorder.record("MFnMesh.createInPlace", (len(points), len(counts)))
+            # Like Maya, the existing UVs are kept.
+            self._node.data = geometry.MeshData(
+                points=np.asarray(points, dtype=np.float64).reshape(-1, 3),
+                face_counts=np.asarray(counts, dtype=np.int32),
+                face_connects=np.asarray(connects, dtype=np.int32),
+                uvs=self._node.data.uvs,
+                uv_connects=np.zeros(len(connects), dtype=np.int32),
+            )
+
+        def clearUVs(self):
+            recorder.record("MFnMesh.clearUVs", ())
+            self._node.data.uvs = np.zeros((0, 2))
+
+        def setUVs(self, us, vs):
+            recorder.record("MFnMesh.setUVs", (len(us),))
+            if len(us) < len(self._node.data.uvs):
+                raise RuntimeError("(kInvalidParameter): Object is incompatible with this method")
+            self._node.data.uvs = np.stack([us, vs], axis=1)
+
+        def assignUVs(self, counts, uv_connects):
+            recorder.record("MFnMesh.assignUVs", (len(uv_connects),))
+            self._shape().data.uv_connects = np.asarray(uv_connects, dtype=np.int32)
+
+        def setFaceVertexNormals(self, normals, faces, vertices):
+            recorder.record("MFnMesh.setFaceVertexNormals", (len(normals),))
+
+    class MFnDagNode:
+        def __init__(self, node):
+            self._node = node
+
+        def fullPathName(self):
+            return "|" + self._node.name()
+
+    class MDGMessage:
+        @staticmethod
+        def addNodeAddedCallback(function, nodeType="dependNode", clientData=None):
+            return MDGMessage._add("added", function, nodeType, clientData)
+
+        @staticmethod
+        def addNodeRemovedCallback(function, nodeType="dependNode", clientData=None):
+            return MDGMessage._add("removed", function, nodeType, clientData)
+
+        @staticmethod
+        def _add(event, function, node_type, client_data):
+            callback_id = len(recorder.callbacks) + 1
+            while callback_id in recorder.callbacks:
+                callback_id += 1
+            recorder.callbacks[callback_id] = (event, node_type, function, client_data)
+            return callback_id
+
+    class MMessage:
+        @staticmethod
+        def removeCallback(callback_id):
+            recorder.callbacks.pop(callback_id, None)
+
+    class MObjectHandle:
+        def __init__(self, node):
+            self._node = node
+
+        def isValid(self):
+            return recorder.nodes.get(self._node.name()) is self._node
+
+        def object(self):
+            return self._node
+
+    class MSelectionList:
+        def __init__(self):
+            self._nodes = []
+
+        def add(self, name):
+            node, _, attribute = str(name).partition(".")
+            node = recorder.lookup(node)
+            self._nodes.append(Attribute(node, attribute) if attribute else node)
+
+        def getDagPath(self, index):
+            return self._nodes[index]
+
+        def getPlug(self, index):
+            return self._nodes[index]
+
+    class MTime:
+        kSeconds = 6
+
+        def __init__(self, value=0.0, unit=kSeconds):
+            self.value = value
+            self.unit = unit
+
+    module.MFnMesh = MFnMesh
+    module.MSelectionList = MSelectionList
+    module.MSpace = types.SimpleNamespace(kWorld=4, kObject=2)
+    module.MFnDagNode = MFnDagNode
+    module.MDGMessage = MDGMessage
+    module.MMessage = MMessage
+    module.MObjectHandle = MObjectHandle
+    module.MPoint = lambda *p: p
+    module.MVector = lambda *v: v
+    module.MPointArray = list
+    module.MVectorArray = list
+    module.MTime = MTime
+    module.MTimeArray = list
+    module.MDoubleArray = list
+    return module
+
+
+def _openmaya_anim(recorder):
+    module = types.ModuleType("maya.api.OpenMayaAnim")
+
+    class MFnAnimCurve:
+        kTangentLinear = 2
+
+        def create(self, plug, curve_type=None):
+            recorder.record("MFnAnimCurve.create", (plug,))
+            self._name = "%s_%s" % (plug.node.name(), plug.attr)
+            self.keys = 0
+
+        def addKeys(self, times, values, tangent_in=None, tangent_out=None, keep_existing=False):
+            recorder.record("MFnAnimCurve.addKeys", (len(times),))
+            self.keys += len(times)
+
+        def name(self):
+            return self._name
+
+    module.MFnAnimCurve = MFnAnimCurve
+    return module
+
+
+# ----------------------------------------------------
+# Installation
+# ----------------------------------------------------
+def stub_modules(recorder):
+    """Returns the stand-in modules for pymel and maya.api, bound to recorder."""
+    commands = _Commands(recorder)
+
+    core = types.ModuleType("pymel.core")
+
+    def command(name):
+        implementation = getattr(commands, name, None)
+
+        def call(*args, **kwargs):
+            recorder.record(name, args, kwargs)
+            return implementation(*args, **kwargs) if implementation else None
+
+        call.__name__ = name
+        return call
+
+    core.__getattr__ = command
+
+    class PyNode:
+        # A class, like pymel's, so lookups are not mistaken for commands.
+        def __new__(cls, name):
+            return recorder.lookup(name)
+
+    core.PyNode = PyNode
+    core.nt = types.SimpleNamespace(Transform=Transform, Mesh=Mesh)
+    datatypes = types.ModuleType("pymel.core.datatypes")
+    datatypes.Vector = Vector
+    datatypes.Matrix = Matrix
+    core.datatypes = datatypes
+
+    pymel = types.ModuleType("pymel")
+    pymel.core = core
+    maya = types.ModuleType("maya")
+    api = types.ModuleType("maya.api")
+    openmaya = _openmaya(recorder)
+    openmaya_anim = _openmaya_anim(recorder)
+    api.OpenMaya = openmaya
+    api.OpenMayaAnim = openmaya_anim
+    maya.api = api
+    return {
+        "pymel": pymel, "pymel.core": core, "pymel.core.datatypes": datatypes,
+        "maya": maya, "maya.api": api, "maya.api.OpenMaya": openmaya, "maya.api.OpenMayaAnim": openmaya_anim,
+    }
+
+
+@contextlib.contextmanager
+def recording(*script_names):
+    """
+    Installs the stand-in and imports fresh copies of the given scripts under it.
+
+    Example:
+      with recording("hypatia") as (recorder, hypatia):
+          hypatia.create_orbit()
+
+    Yields:
+      tuple: The Recorder followed by the imported script modules.
+    """
+    recorder = Recorder()
+    saved = {name: sys.modules.get(name) for name in _STUBBED_MODULES + _MAYA_MODULES + tuple(script_names)}
+    sys.modules.update(stub_modules(recorder))
+    for name in _MAYA_MODULES + script_names:
+        sys.modules.pop(name, None)
+    try:
+        yield (recorder,) + tuple(__import__(name) for name in script_names)
+    finally:
+        for name, module in saved.items():
+            if module is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = module
@@ -0,0 +1,300 @@
+"""
+Polygon subdivision with cached stencils, the headless counterpart of polySmooth.
+
+A subdivision level moves every vertex to a fixed weighted sum of the vertices
+around it, and the weights depend only on the mesh's topology. They are
+gathered once per topology into a stencil, a sparse matrix from the original
+vertices to the subdivided ones with every level folded in, and kept in a
+small cache. Meshes sharing a topology, such as the inner sides of the orbit
+rings which only differ in radius, are then subdivided with one sparse
+matrix-vector product each.
+
+Sparse matrices are plain COO arrays multiplied with np.bincount, so no SciPy
+is needed.
+"""
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+
+from hypatia_geometry import MeshData, face_vertex_layout
+
+MODE_LINEAR = "linear"              # Faces are split, vertices stay in place.
+MODE_CATMULL_CLARK = "catmull-clark"  # polySmooth's exponential subdivision.
+
+# Number of topologies whose stencils are kept.
+STENCIL_CACHE_SIZE = 16
+
+
+@dataclass
+class Stencil:
+    """
+    A sparse (rows x columns) weight matrix in coordinate format.
+
+    Row i of the product with a (columns, ...) array is the sum of
+    weights[k] * array[cols[k]] over every k where rows[k] == i.
+
+    Attributes:
+      rows (ndarray): int64 row of every weight.
+      cols (ndarray): int64 column of every weight.
+      weights (ndarray): float64 weights.
+      shape (tuple): (rows, columns).
+    """
+    rows: np.ndarray
+    cols: np.ndarray
+    weights: np.ndarray
+    shape: tuple
+
+    def apply(self, values):
+        """Returns the (rows, ...) product of the stencil with a (columns, ...) array."""
+        values = np.asarray(values, dtype=np.float64)
+        flat = values.reshape(len(values), -1)
+        result = np.empty((self.shape[0], flat.shape[1]))
+        for j in range(flat.shape[1]):
+            result[:, j] = np.bincount(self.rows, weights=self.weights * flat[self.cols, j], minlength=self.shape[0])
+        return result.reshape((self.shape[0],) + values.shape[1:])
+
+    def __matmul__(self, other):
+        """Returns the stencil applying other, then self."""
+        # Join each entry (i, k) of self with every entry (k, j) of other.
+        order = np.argsort(other.rows, kind="stable")
+        other_rows, other_cols, other_weights = other.rows[order], other.cols[order], other.weights[order]
+        row_counts = np.bincount(other_rows, minlength=other.shape[0])
+        row_starts = np.cumsum(row_counts) - row_counts
+        counts = row_counts[self.cols]
+        owner = np.repeat(np.arange(len(self.cols)), counts)
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        joined = row_starts[self.cols][owner] + offsets
+        return _coalesce(self.rows[owner], other_cols[joined], self.weights[owner] * other_weights[joined],
+                         (self.shape[0], other.shape[1]))
+
+
+def _coalesce(rows, cols, weights, shape):
+    """Returns a Stencil summing the weights of repeated (row, col) entries."""
+    keys, inverse = np.unique(rows.astype(np.int64) * shape[1] + cols, return_inverse=True)
+    return Stencil(keys // shape[1], keys % shape[1], np.bincount(inverse.ravel(), weights=weights), shape)
+
+
+# ----------------------------------------------------
+# One level
+# ----------------------------------------------------
+def _subdivide_topology(counts, connects, vertex_count, mode, keep_border):
+    """
+    Subdivides a face topology once.
+
+    Subdivided vertices are the original vertices, then one point per face,
+    then one per edge. Each n-sided face becomes n quads.
+
+    Returns:
+      tuple: (Stencil, counts, connects, vertex_count) of the subdivided topology.
+    """
+    counts = np.asarray(counts, dtype=np.int64)
+    connects = np.asarray(connects, dtype=np.int64)
+    face_count = len(counts)
+    starts = np.cumsum(counts) - counts
+    face_ids = np.repeat(np.arange(face_count), counts)
+    following = np.arange(len(connects)) + 1
+    following[starts + counts - 1] = starts
+    previous = np.empty_like(following)
+    previous[following] = np.arange(len(connects))
+
+    # Edges from the half-edges of every face-vertex to the following one.
+    a, b = connects, connects[following]
+    keys, half_edge_ids = np.unique(np.minimum(a, b) * vertex_count + np.maximum(a, b), return_inverse=True)
+    half_edge_ids = half_edge_ids.ravel()
+    edge_count = len(keys)
+    edge_v0, edge_v1 = keys // vertex_count, keys % vertex_count
+    border = np.bincount(half_edge_ids, minlength=edge_count) == 1
+
+    # Stage 1: [original vertices, face points] from the original vertices.
+    face_point_count = vertex_count + face_count
+    stage1 = Stencil(
+        np.concatenate([np.arange(vertex_count), vertex_count + face_ids]),
+        np.concatenate([np.arange(vertex_count), connects]),
+        np.concatenate([np.ones(vertex_count), 1.0 / counts[face_ids]]),
+        (face_point_count, vertex_count),
+    )
+
+    # Stage 2: [vertices, face points, edge points] from the stage 1 points.
+    rows, cols, weights = [], [], []
+
+    # Edge points: the edge midpoint, or for smooth interior edges the
+    # average of its ends and of the face points on both sides.
+    edge_rows = vertex_count + face_count + np.arange(edge_count)
+    smooth_edge = ~border if mode == MODE_CATMULL_CLARK else np.zeros(edge_count, dtype=bool)
+    end_weight = np.where(smooth_edge, 0.25, 0.5)
+    rows += [edge_rows, edge_rows]
+    cols += [edge_v0, edge_v1]
+    weights += [end_weight, end_weight]
+    smooth_half_edges = smooth_edge[half_edge_ids]
+    rows.append(edge_rows[half_edge_ids[smooth_half_edges]])
+    cols.append(vertex_count + face_ids[smooth_half_edges])
+    weights.append(np.full(smooth_half_edges.sum(), 0.25))
+
+    # Face points carry over.
+    rows.append(vertex_count + np.arange(face_count))
+    cols.append(vertex_count + np.arange(face_count))
+    weights.append(np.ones(face_count))
+
+    # Vertex points.
+    valence = np.bincount(np.concatenate([edge_v0, edge_v1]), minlength=vertex_count)
+    border_valence = np.bincount(np.concatenate([edge_v0[border], edge_v1[border]]), minlength=vertex_count)
+    face_valence = np.bincount(connects, minlength=vertex_count)
+    if mode == MODE_CATMULL_CLARK:
+        interior = (border_valence == 0) & (valence == face_valence) & (valence >= 3)
+        crease = (border_valence == 2) & (not keep_border)
+    else:
+        interior = np.zeros(vertex_count, dtype=bool)
+        crease = np.zeros(vertex_count, dtype=bool)
+    fixed = ~interior & ~crease
+    vertices = np.arange(vertex_count)
+
+    # Interior: (F + 2R + (n - 3)P) / n, with F the average of the n face points
+    # around P and R that of its n edge midpoints.
+    n = valence.astype(np.float64)
+    rows.append(vertices[interior])
+    cols.append(vertices[interior])
+    weights.append(((n - 2) / n)[interior])
+    interior_corners = interior[connects]
+    rows.append(connects[interior_corners])
+    cols.append(vertex_count + face_ids[interior_corners])
+    weights.append(1 / n[connects[interior_corners]] ** 2)
+    for ends, others in ((edge_v0, edge_v1), (edge_v1, edge_v0)):
+        mask = interior[ends]
+        rows.append(ends[mask])
+        cols.append(others[mask])
+        weights.append(1 / n[ends[mask]] ** 2)
+
+    # Border creases: the cubic B-spline rule (1/8, 3/4, 1/8) along the border.
+    rows.append(vertices[crease])
+    cols.append(vertices[crease])
+    weights.append(np.full(crease.sum(), 0.75))
+    for ends, others in ((edge_v0, edge_v1), (edge_v1, edge_v0)):
+        mask = border & crease[ends]
+        rows.append(ends[mask])
+        cols.append(others[mask])
+        weights.append(np.full(mask.sum(), 0.125))
+
+    # Kept borders, corners and linear subdivision leave vertices in place.
+    rows.append(vertices[fixed])
+    cols.append(vertices[fixed])
+    weights.append(np.ones(fixed.sum()))
+
+    new_count = vertex_count + face_count + edge_count
+    stage2 = _coalesce(np.concatenate(rows), np.concatenate(cols), np.concatenate(weights),
+                       (new_count, face_point_count))
+
+    # Each face-vertex starts a quad: vertex, next edge point, face point, previous edge point.
+    edge_points = vertex_count + face_count + half_edge_ids
+    quads = np.stack([connects, edge_points, vertex_count + face_ids, edge_points[previous]], axis=1)
+    return (stage2 @ stage1, np.full(len(connects), 4, dtype=np.int32), quads.ravel().astype(np.int32),
+            new_count)
+
+
+# ----------------------------------------------------
+# Stencil cache
+# ----------------------------------------------------
+_stencils = OrderedDict()
+stencil_builds = 0
+
+
+def subdivision_stencil(counts, connects, vertex_count, levels=1, mode=MODE_CATMULL_CLARK, keep_border=True):
+    """
+    Returns the stencil and subdivided topology of a face topology, from the cache when possible.
+
+    Parameters:
+      counts (ndarray): Number of vertices of each face.
+      connects (ndarray): Vertex index of every face-vertex.
+      vertex_count (int): Number of vertices.
+      levels (int): Number of subdivision levels, like polySmooth's divisions.
+      mode (str): MODE_LINEAR or MODE_CATMULL_CLARK.
+      keep_border (bool): Keep border vertices in place, like polySmooth's keepBorder.
+        Otherwise borders are smoothed as creases.
+
+    Returns:
+      tuple: (Stencil from the vertices to the subdivided vertices, counts, connects).
+    """
+    global stencil_builds
+    if mode not in (MODE_LINEAR, MODE_CATMULL_CLARK):
+        raise ValueError("Unknown subdivision mode %r" % mode)
+    counts = np.ascontiguousarray(counts, dtype=np.int32)
+    connects = np.ascontiguousarray(connects, dtype=np.int32)
+    digest = hashlib.sha1(counts.tobytes())
+    digest.update(connects.tobytes())
+    key = (digest.hexdigest(), int(vertex_count), int(levels), mode, bool(keep_border))
+    if key in _stencils:
+        _stencils.move_to_end(key)
+        return _stencils[key]
+
+    stencil = Stencil(np.arange(vertex_count), np.arange(vertex_count), np.ones(vertex_count),
+                      (vertex_count, vertex_count))
+    level_counts, level_connects, level_vertex_count = counts, connects, vertex_count
+    for _ in range(levels):
+        level, level_counts, level_connects, level_vertex_count = _subdivide_topology(
+            level_counts, level_connects, level_vertex_count, mode, keep_border)
+        stencil = level @ stencil
+    stencil_builds += 1
+
+    _stencils[key] = (stencil, level_counts, level_connects)
+    while len(_stencils) > STENCIL_CACHE_SIZE:
+        _stencils.popitem(last=False)
+    return _stencils[key]
+
+
+def clear_stencils():
+    """Empties the stencil cache."""
+    _stencils.clear()
+
+
+# ----------------------------------------------------
+# Meshes
+# ----------------------------------------------------
+def subdivide(mesh, levels=2, mode=MODE_CATMULL_CLARK, keep_border=True, name=None):
+    """
+    Subdivides a mesh like polySmooth(divisions=levels, keepBorder=keep_border).
+
+    Points go through the stencil of the mesh's topology and UVs through that
+    of its UV topology, keeping UV borders in place so seams stay put. The
+    subdivided surface is smooth, so normals are recomputed as area-weighted
+    vertex normals.
+
+    Parameters:
+      mesh (MeshData): The mesh to subdivide.
+      levels (int): Number of subdivision levels; each turns an n-gon into n quads.
+      mode (str): MODE_LINEAR or MODE_CATMULL_CLARK.
+      keep_border (bool): Keep border vertices in place instead of smoothing them as creases.
+      name (str): The name of the subdivided mesh. Defaults to mesh.name.
+
+    Returns:
+      MeshData: The subdivided mesh.
+    """
+    stencil, counts, connects = subdivision_stencil(mesh.face_counts, mesh.face_connects, mesh.vertex_count, levels,
+                                                    mode, keep_border)
+    uv_stencil, _, uv_connects = subdivision_stencil(mesh.face_counts, mesh.uv_connects, len(mesh.uvs), levels,
+                                                     mode, True)
+    points = stencil.apply(mesh.points)
+    subdivided = MeshData(
+        points=points,
+        face_counts=counts,
+        face_connects=connects,
+        uvs=uv_stencil.apply(mesh.uvs),
+        uv_connects=uv_connects,
+        name=name or mesh.name,
+    )
+    subdivided.normals = _vertex_normals(subdivided)[connects]
+    return subdivided
+
+
+def _vertex_normals(mesh):
+    """Returns the (N, 3) unit vertex normals of a mesh, weighted by the area of the faces around each vertex."""
+    face_ids, _, following = face_vertex_layout(mesh)
+    counts = mesh.face_counts
+    # Newell's method: the summed cross products are twice the face's area vector.
+    cross = np.cross(mesh.points[mesh.face_connects], mesh.points[mesh.face_connects[following]])
+    face_vectors = np.stack([np.bincount(face_ids, weights=cross[:, j], minlength=len(counts)) for j in range(3)],
+                            axis=1)
+    normals = np.stack([np.bincount(mesh.face_connects, weights=face_vectors[face_ids, j],
+                                    minlength=mesh.vertex_count) for j in range(3)], axis=1)
+    length = np.linalg.norm(normals, axis=1, keepdims=True)
+    return np.divide(normals, length, out=np.zeros_like(normals), where=length > 0)
@@ -0,0 +1,5 @@
+"""The scripts import each other as top-level modules, so the tests run them from their folder."""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
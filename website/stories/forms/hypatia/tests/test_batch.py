@@ -0,0 +1,48 @@
+import os
+
+import pytest
+
+import batch
+import lod
+from test_gltf_export import accessor_array, read_glb
+
+
+def test_variant_names():
+    variants = [{"kind": "orbit"}, {"kind": "orbit", "name": "rings"}, {"kind": "outline"}]
+    assert batch.variant_names(variants) == ["orbit_000", "rings", "outline_002"]
+
+
+def test_run_batch_writes_every_variant(tmp_path):
+    variants = [
+        {"kind": "orbit", "total": 2, "subdivisions": 12},
+        {"kind": "dodecahedron", "grid": 3, "name": "cubes"},
+        {"kind": "outline", "total": 2, "subdivisions": 12},
+    ]
+    results = sorted(batch.run_batch(variants, str(tmp_path), workers=2), key=lambda result: result.index)
+    assert [result.name for result in results] == ["orbit_000", "cubes", "outline_002"]
+    for result in results:
+        assert result.error is None, result.error
+        assert os.path.getsize(result.path) > 0
+
+
+def test_run_batch_rejects_unknown_kinds(tmp_path):
+    with pytest.raises(ValueError):
+        list(batch.run_batch([{"kind": "teapot"}], str(tmp_path)))
+
+
+def test_orbit_variant_projects_the_side_uvs(tmp_path):
+    path = str(tmp_path / "orbit.glb")
+    batch.orbit_variant(path, total=2, subdivisions=12)
+    gltf, binary = read_glb(path)
+    for mesh in gltf["meshes"]:
+        uvs = accessor_array(gltf, binary, mesh["primitives"][0]["attributes"]["TEXCOORD_0"])
+        # Every side spans the whole texture, like after adjust_uvs_to_range.
+        assert (uvs.min(axis=0).tolist(), uvs.max(axis=0).tolist()) == ([0, 0], [65535, 65535])
+
+
+def test_run_batch_writes_sculpture_lods(tmp_path):
+    variants = [{"kind": "sculpture", "subdivisions": 12, "orbit_total": 2, "name": "full"}]
+    results = list(batch.run_batch(variants, str(tmp_path), workers=1, lods=True))
+    assert results[0].error is None, results[0].error
+    assert sorted(os.listdir(str(tmp_path))) == ["full.glb"] + ["full_LOD%d.glb" % i
+                                                              for i in range(len(lod.LOD_FACTORS))]
@@ -0,0 +1,41 @@
+import json
+
+import benchmark
+
+
+def result(seconds=1.0, commands=100, nodes_created=10, vertices_created=1000):
+    return {"seconds": seconds, "commands": commands, "nodes_created": nodes_created,
+            "vertices_created": vertices_created}
+
+
+def test_parameter_grid_and_keys():
+    grid = benchmark.parameter_grid({"grid": [5, 10], "mode": ["mesh", "combined"]})
+    assert [benchmark.case_key("case", params) for params in grid] == [
+        "case[grid=5,mode=mesh]", "case[grid=5,mode=combined]",
+        "case[grid=10,mode=mesh]", "case[grid=10,mode=combined]"]
+
+
+def test_compare_flags_count_regressions_and_slower_runs_apart():
+    baseline = {"a": result(), "b": result(), "c": result(), "d": result(0.01)}
+    results = {"a": result(commands=105), "b": result(commands=120), "c": result(seconds=2.0),
+               "d": result(seconds=0.03), "new": result()}
+    regressions, slower = benchmark.compare(results, baseline)
+    assert [message.split(":")[0] for message in regressions] == ["b"]
+    # Runs under MIN_SECONDS are too short to time.
+    assert [message.split(":")[0] for message in slower] == ["c"]
+
+
+def test_run_case_counts_the_scene_changes():
+    run = benchmark.run_case("hypatia", benchmark._hypatia, {}, repeats=1)
+    assert run["commands"] > 0
+    assert run["nodes_created"] >= 1
+    assert run["vertices_created"] > 0
+
+
+def test_only_fail_on_time_fails_slower_runs(tmp_path, monkeypatch):
+    baseline = str(tmp_path / "baseline.json")
+    with open(baseline, "w") as f:
+        json.dump({"a": result()}, f)
+    monkeypatch.setattr(benchmark, "run_all", lambda repeats, pattern: {"a": result(seconds=2.0)})
+    assert benchmark.main(["--baseline", baseline]) == 0
+    assert benchmark.main(["--baseline", baseline, "--fail-on-time"]) == 1
@@ -0,0 +1,52 @@
+import os
+
+import hypatia_geometry as geometry
+from build_cache import BuildCache
+
+
+def test_build_reuses_stored_meshes(tmp_path):
+    cache = BuildCache(str(tmp_path))
+    first = cache.build(geometry.hypatia_sphere, radius=10.0)
+    second = cache.build(geometry.hypatia_sphere, radius=10.0)
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert second.name == first.name
+    assert (second.points == first.points).all()
+
+
+def test_key_follows_the_parameters(tmp_path):
+    cache = BuildCache(str(tmp_path))
+    assert cache.key(geometry.hypatia_sphere, radius=10.0) == cache.key(geometry.hypatia_sphere, radius=10.0)
+    assert cache.key(geometry.hypatia_sphere, radius=10.0) != cache.key(geometry.hypatia_sphere, radius=20.0)
+
+
+def test_evict_drops_the_least_recently_used_entry(tmp_path):
+    cache = BuildCache(str(tmp_path))
+    old = cache.key(geometry.hypatia_sphere, radius=10.0)
+    new = cache.key(geometry.hypatia_sphere, radius=20.0)
+    cache.store(old, geometry.hypatia_sphere(radius=10.0))
+    os.utime(cache._path(old), (0, 0))
+    # Room for one entry: both spheres have the same topology, so the same size.
+    cache.max_bytes = os.path.getsize(cache._path(old))
+    cache.store(new, geometry.hypatia_sphere(radius=20.0))
+    assert os.listdir(str(tmp_path)) == [new + ".npz"]
+
+
+def test_entries_deleted_by_another_process_are_skipped(tmp_path, monkeypatch):
+    cache = BuildCache(str(tmp_path), max_bytes=0)
+    cache.build(geometry.hypatia_sphere, radius=10.0)
+    listdir = os.listdir
+    # Another worker evicted this entry between the listing and the stat.
+    monkeypatch.setattr(os, "listdir", lambda path: listdir(path) + ["evicted.npz"])
+    cache.evict()
+    cache.clear()
+
+
+def test_load_of_an_entry_evicted_after_reading(tmp_path, monkeypatch):
+    cache = BuildCache(str(tmp_path))
+    key = cache.key(geometry.hypatia_sphere)
+    cache.store(key, geometry.hypatia_sphere())
+
+    def utime(path):
+        raise FileNotFoundError(path)
+    monkeypatch.setattr(os, "utime", utime)
+    assert cache.load(key) is not None
@@ -0,0 +1,70 @@
+import pytest
+
+from build_graph import BuildGraph
+from pm_recorder import recording
+
+
+def base(value=1):
+    return value
+
+
+def double(x, offset=0):
+    return 2 * x + offset
+
+
+def total(a, b):
+    return a + b
+
+
+@pytest.fixture
+def graph():
+    graph = BuildGraph()
+    graph.add("a", base, value=1)
+    graph.add("b", base, value=10)
+    graph.add("double", double, inputs=["a"])
+    graph.add("total", total, inputs=["double", "b"])
+    graph.rebuild()
+    return graph
+
+
+def test_rebuild_builds_every_node_once(graph):
+    assert graph["total"].output == 12
+    assert graph.dirty() == []
+    assert graph.rebuild() == []
+
+
+def test_edit_propagates_to_dependents_only(graph):
+    graph.set("a", value=2)
+    assert graph.dirty() == ["a", "double", "total"]
+    assert graph.rebuild() == ["a", "double", "total"]
+    assert graph["total"].output == 14
+
+    graph.set("double", offset=1)
+    assert graph.rebuild() == ["double", "total"]
+    assert graph["b"].output == 10
+
+
+def test_unchanged_parameters_stay_clean(graph):
+    graph.set("b", value=10)
+    assert graph.dirty() == []
+
+
+def test_inputs_must_exist_first():
+    graph = BuildGraph()
+    with pytest.raises(KeyError):
+        graph.add("double", double, inputs=["a"])
+
+
+def test_sculpture_ring_edit_rebuilds_its_planets():
+    with recording("hypatia") as (recorder, hypatia):
+        graph = hypatia.create_sculpture_graph(outline_total=2, orbit_total=3, planets=True)
+        outer = graph["SM_Outer1"].scene
+        graph.set("SM_Orbit1", radius=40)
+        assert hypatia.rebuild_sculpture(graph) == [
+            "SM_Orbit1", "SM_Inner1_Side", "SM_Inner1", "SM_Outer1", "SM_Planet0_1", "SM_Planet1_1"]
+        assert graph["SM_Outer1"].scene is outer
+        # Rebuilding at a lower resolution shrinks the UVs of the existing meshes.
+        graph.set("SM_Orbit1", subdivisions=20)
+        hypatia.rebuild_sculpture(graph)
+        assert outer.getShape().data.face_count == 20
+        assert hypatia.rebuild_sculpture(graph) == []
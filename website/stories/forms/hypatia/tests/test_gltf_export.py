@@ -0,0 +1,126 @@
+import json
+import os
+import struct
+
+import numpy as np
+import pytest
+
+import gltf_export
+import hypatia_geometry as geometry
+import orbit_animation
+
+
+def read_glb(path):
+    """Returns the JSON and binary chunks of a GLB file, checking its header."""
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, length = struct.unpack("<III", data[:12])
+    assert (magic, version, length) == (gltf_export.GLB_MAGIC, gltf_export.GLB_VERSION, len(data))
+    json_length, chunk_type = struct.unpack("<II", data[12:20])
+    assert chunk_type == gltf_export.CHUNK_JSON
+    binary_start = 20 + json_length + 8
+    return json.loads(data[20:20 + json_length]), data[binary_start:]
+
+
+def accessor_array(gltf, binary, index):
+    accessor = gltf["accessors"][index]
+    view = gltf["bufferViews"][accessor["bufferView"]]
+    dtype = {value: key for key, value in gltf_export._COMPONENT_TYPES.items()}[accessor["componentType"]]
+    components = {"SCALAR": 1, "VEC2": 2, "VEC3": 3, "VEC4": 4}[accessor["type"]]
+    stride = view.get("byteStride", dtype.itemsize * components)
+    raw = np.frombuffer(binary, dtype=np.uint8, count=view["byteLength"], offset=view["byteOffset"])
+    rows = raw[:accessor["count"] * stride].reshape(accessor["count"], stride)
+    return rows[:, :dtype.itemsize * components].copy().view(dtype).reshape(accessor["count"], components)
+
+
+def test_export_glb_dequantizes_to_the_mesh(tmp_path):
+    mesh = geometry.torus(10, 1, 24, 12, name="torus")
+    path = str(tmp_path / "torus.glb")
+    gltf_export.export_glb(path, [mesh])
+    gltf, binary = read_glb(path)
+    assert gltf["extensionsRequired"] == [gltf_export.QUANTIZATION_EXTENSION]
+
+    node = gltf["nodes"][0]
+    primitive = gltf["meshes"][node["mesh"]]["primitives"][0]
+    quantized = accessor_array(gltf, binary, primitive["attributes"]["POSITION"])
+    positions = np.asarray(node["translation"]) + node["scale"][0] * quantized
+    # Every exported vertex lies within one quantization step of a mesh point.
+    distance = np.linalg.norm(positions[:, None] - mesh.points[None], axis=2).min(axis=1)
+    assert distance.max() <= node["scale"][0] * 2
+
+    indices = accessor_array(gltf, binary, primitive["indices"])
+    assert indices.dtype == np.uint16
+    assert len(indices) == 3 * 2 * mesh.face_count
+
+
+def test_export_glb_is_deterministic(tmp_path):
+    meshes = [geometry.torus(10, 1, 24, 12), geometry.sphere(2.0, 12, 6)]
+    first, second = str(tmp_path / "first.glb"), str(tmp_path / "second.glb")
+    gltf_export.export_glb(first, meshes, [(1, "copy", (90, 0, 0))])
+    gltf_export.export_glb(second, meshes, [(1, "copy", (90, 0, 0))])
+    with open(first, "rb") as a, open(second, "rb") as b:
+        assert a.read() == b.read()
+    gltf, _ = read_glb(first)
+    assert [node["name"] for node in gltf["nodes"]] == ["regularTorus", "copy", "sphere"]
+
+
+@pytest.mark.parametrize("planets", [False, True])
+def test_sculpture_clip_binds_to_its_nodes(tmp_path, planets):
+    path = str(tmp_path / "sculpture.glb")
+    gltf_export.export_sculpture(path, subdivisions=20, orbit_total=3, planets=planets, animation=True, frames=31)
+    gltf, _ = read_glb(path)
+    names = [node["name"] for node in gltf["nodes"]]
+    tracks = orbit_animation.animation_tracks(orbit_animation.bake_orbit(total=3, frames=31, planets=planets))
+
+    channels = gltf["animations"][0]["channels"]
+    assert [(names[c["target"]["node"]], c["target"]["path"]) for c in channels] == [
+        (track.node, track.path) for track in tracks]
+    assert len(channels) == (9 if planets else 3)
+
+
+def test_sculpture_rings_hold_their_sides(tmp_path):
+    path = str(tmp_path / "sculpture.glb")
+    gltf_export.export_sculpture(path, subdivisions=20, orbit_total=3)
+    gltf, _ = read_glb(path)
+    nodes = gltf["nodes"]
+    ring = next(node for node in nodes if node["name"] == "SM_Orbit1")
+    assert [nodes[child]["name"] for child in ring["children"]] == ["SM_Inner1", "SM_Outer1"]
+    assert "animations" not in gltf
+    assert not any(node["name"].startswith("SM_Planet") for node in nodes)
+
+
+def test_export_glb_rejects_unbound_tracks(tmp_path):
+    tracks = orbit_animation.animation_tracks(orbit_animation.bake_orbit(total=2, frames=5))
+    with pytest.raises(KeyError):
+        gltf_export.export_glb(str(tmp_path / "empty.glb"), [], tracks=tracks)
+
+
+def test_sculpture_sides_export_normalized_uvs(tmp_path):
+    path = str(tmp_path / "sculpture.glb")
+    gltf_export.export_sculpture(path, subdivisions=20, orbit_total=3)
+    gltf, binary = read_glb(path)
+    for node in gltf["nodes"]:
+        if node["name"].startswith(("SM_Inner", "SM_Outer")):
+            primitive = gltf["meshes"][node["mesh"]]["primitives"][0]
+            uvs = accessor_array(gltf, binary, primitive["attributes"]["TEXCOORD_0"])
+            assert uvs.dtype == np.uint16
+            assert (uvs.min(axis=0).tolist(), uvs.max(axis=0).tolist()) == ([0, 0], [65535, 65535])
+
+
+def test_export_lods_writes_one_file_per_level(tmp_path):
+    paths = gltf_export.export_lods(str(tmp_path / "sculpture.glb"), factors=(1.0, 0.5), subdivisions=20,
+                                    orbit_total=2)
+    assert [os.path.basename(path) for path in paths] == ["sculpture_LOD0.glb", "sculpture_LOD1.glb"]
+    triangles = []
+    for level, path in enumerate(paths):
+        gltf, _ = read_glb(path)
+        nodes = {node["name"]: node for node in gltf["nodes"]}
+        inner = nodes["SM_Inner1_LOD%d" % level]
+        assert inner["extras"]["factor"] == (1.0, 0.5)[level]
+        assert inner["extras"]["geometric_error"] >= 0
+        ring = nodes["SM_Orbit1"]
+        assert [gltf["nodes"][child]["name"] for child in ring["children"]] == [
+            "SM_Inner1_LOD%d" % level, "SM_Outer1_LOD%d" % level]
+        triangles.append(sum(gltf["accessors"][mesh["primitives"][0]["indices"]]["count"]
+                             for mesh in gltf["meshes"]))
+    assert triangles[1] < triangles[0]
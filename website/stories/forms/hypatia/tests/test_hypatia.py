@@ -0,0 +1,38 @@
+import numpy as np
+
+import hypatia_geometry as geometry
+from pm_recorder import recording
+
+
+def _uv_cube(name, uvs):
+    mesh = geometry.cube(name=name)
+    mesh.uvs = np.asarray(uvs, dtype=np.float64)
+    return mesh
+
+
+def test_normalize_uvs_remaps_every_mesh_in_bulk():
+    with recording("hypatia") as (recorder, hypatia):
+        uvs = [geometry.cube().uvs * [3.0, 2.0] + [1.0, -1.0], geometry.cube().uvs * [0.5, 4.0]]
+        transforms = [recorder.create_transform("cube%d" % i, _uv_cube("cube%d" % i, u)) for i, u in enumerate(uvs)]
+        recorder.reset()
+        hypatia.normalize_uvs(transforms)
+
+        counts = recorder.command_counts()
+        assert (counts["getUVs"], counts["setUVs"]) == (2, 2)
+        for transform, before in zip(transforms, uvs):
+            after = transform.getShape().data.uvs
+            assert (after[:, 0].min(), after[:, 0].max()) == (0.0, 1.0)
+            np.testing.assert_array_equal(after[:, 1], before[:, 1])
+
+
+def test_normalize_uvs_restricts_to_the_given_sets():
+    with recording("hypatia") as (recorder, hypatia):
+        before = geometry.cube().uvs * 2.0 + 1.0
+        transform = recorder.create_transform("cube", _uv_cube("cube", before))
+        recorder.reset()
+        hypatia.normalize_uvs(transform, uv_sets=["map1"], normalize_v=True)
+
+        assert "getUVSetNames" not in recorder.command_counts()
+        after = transform.getShape().data.uvs
+        assert after.min(axis=0).tolist() == [0.0, 0.0]
+        assert after.max(axis=0).tolist() == [1.0, 1.0]
@@ -0,0 +1,130 @@
+import math
+
+import numpy as np
+import pytest
+
+import hypatia_geometry as geometry
+
+
+def triangles(corners, name="triangles"):
+    """A mesh of one triangle per corner, its other two vertices far away from every other triangle."""
+    points = []
+    for i, corner in enumerate(corners):
+        points += [corner, [corner[0], 10.0 * (i + 1), 0.0], [corner[0], 10.0 * (i + 1), 10.0]]
+    count = len(corners)
+    return geometry.MeshData(
+        points=np.array(points, dtype=np.float64),
+        face_counts=np.full(count, 3, dtype=np.int32),
+        face_connects=np.arange(3 * count, dtype=np.int32),
+        uvs=np.zeros((1, 2)),
+        uv_connects=np.zeros(3 * count, dtype=np.int32),
+        name=name,
+    )
+
+
+def test_sweep_profile_topology():
+    profile = geometry.orbit_profile(height=2.0, thickness=1.0)
+    closed = geometry.sweep_profile(profile, torus_radius=10, path_divisions=12, closed_profile=True)
+    assert (closed.vertex_count, closed.face_count) == (48, 48)
+    opened = geometry.sweep_profile(profile, torus_radius=10, path_divisions=12)
+    assert (opened.vertex_count, opened.face_count) == (48, 36)
+    assert closed.face_connects.max() < closed.vertex_count
+    assert closed.uv_connects.max() < len(closed.uvs)
+
+
+def test_sweep_profile_rotates_the_profile_about_y():
+    profile = np.array([[1.0, 0.5, 0.0], [-1.0, -0.5, 0.0]])
+    mesh = geometry.sweep_profile(profile, torus_radius=10, path_divisions=8)
+    radial = np.hypot(mesh.points[:, 0], mesh.points[:, 2]).reshape(2, 8)
+    np.testing.assert_allclose(radial, [[11.0] * 8, [9.0] * 8])
+    np.testing.assert_allclose(mesh.points[:, 1].reshape(2, 8), [[0.5] * 8, [-0.5] * 8])
+
+
+def test_orbit_ring_edges_are_hard():
+    ring = geometry.orbit_ring(3, subdivisions=50)
+    normals = ring.normals.reshape(ring.face_count, 4, 3)
+    # crease_angle=0: every face-vertex of a face shares the face normal.
+    np.testing.assert_allclose(normals, np.repeat(normals[:, :1], 4, axis=1), atol=1e-12)
+    np.testing.assert_allclose(np.linalg.norm(normals, axis=2), 1.0)
+    radial = np.hypot(ring.points[:, 0], ring.points[:, 2])
+    assert math.isclose((radial.min() + radial.max()) / 2, geometry.orbit_ring_radius(3))
+
+
+def test_split_by_radial_normal_separates_the_outer_wall():
+    ring = geometry.orbit_ring(3)
+    inner, outer = geometry.split_by_radial_normal(ring, inner_name="SM_Inner3", outer_name="SM_Outer3")
+    assert (inner.face_count, outer.face_count) == (600, 200)
+    assert (inner.name, outer.name) == ("SM_Inner3", "SM_Outer3")
+
+    centers = geometry.face_centers(outer)
+    radial = centers * [1, 0, 1]
+    radial /= np.linalg.norm(radial, axis=1, keepdims=True)
+    assert (np.einsum("ij,ij->i", geometry.face_normals(outer), radial) > 0.99).all()
+    # The outer wall is a closed band between two rows of points.
+    assert outer.vertex_count == 2 * 200
+    assert len(outer.normals) == 4 * outer.face_count
+
+
+def test_weld_vertices_merges_close_vertices():
+    mesh = triangles([[0.0, 0.0, 0.0], [0.5, 0.0, 0.0]])
+    welded, vertices_removed, faces_removed = geometry.weld_vertices(mesh, 1.0)
+    assert (vertices_removed, faces_removed) == (1, 0)
+    assert welded.face_connects[0] == welded.face_connects[3]
+
+
+def test_weld_vertices_is_transitive():
+    # 0.1 and 1.9 share a cell of the unshifted grid, 1.9 and 2.5 one of the shifted grid.
+    mesh = triangles([[2.5, 0.0, 0.0], [0.1, 0.0, 0.0], [1.9, 0.0, 0.0]])
+    welded, vertices_removed, faces_removed = geometry.weld_vertices(mesh, 1.0)
+    assert (vertices_removed, faces_removed) == (2, 0)
+    assert welded.vertex_count == 7
+
+
+def test_weld_vertices_keeps_distant_vertices():
+    mesh = triangles([[0.0, 0.0, 0.0], [5.0, 0.0, 0.0]])
+    _, vertices_removed, faces_removed = geometry.weld_vertices(mesh, 1.0)
+    assert (vertices_removed, faces_removed) == (0, 0)
+
+
+def test_weld_vertices_keeps_vertices_whose_cells_share_a_hash():
+    # The second corner's cell hashes to the same key as the first one's.
+    corner = [0.25, 0.25, 0.25]
+    collided = [0.25 + 19349663, 0.25 - 73856093, 0.25]
+    mesh = triangles([corner, collided, [0.35, 0.25, 0.25]])
+    _, vertices_removed, faces_removed = geometry.weld_vertices(mesh, 0.5)
+    assert (vertices_removed, faces_removed) == (1, 0)
+
+
+def test_weld_vertices_deletes_collapsed_faces():
+    mesh = triangles([[0.0, 0.0, 0.0]])
+    mesh.points[1] = [0.0, 0.0, 0.1]
+    welded, vertices_removed, faces_removed = geometry.weld_vertices(mesh, 1.0)
+    # The vertices of a deleted face go with it.
+    assert (vertices_removed, faces_removed) == (3, 1)
+    assert welded.face_count == welded.vertex_count == 0
+
+
+def test_combine_quadrants_welds_the_seams():
+    quadrants = [geometry.motion_structure_quadrant(angle, subdivisions=20) for angle in [0, 90, 180, 270]]
+    combined = geometry.combine_quadrants(*quadrants, weld_tolerance=None)
+    welded = geometry.combine_quadrants(*quadrants)
+    assert welded.vertex_count < combined.vertex_count
+    # Welding again finds nothing left to merge or collapse.
+    assert geometry.weld_vertices(welded)[1:] == (0, 0)
+
+
+def test_cylindrical_uvs_wrap_around_the_axis():
+    inner, outer = geometry.split_by_radial_normal(geometry.orbit_ring(0, 3, subdivisions=40))
+    for side in [inner, outer]:
+        projected = geometry.cylindrical_uvs(side)
+        assert projected.uvs.min() == 0.0 and projected.uvs.max() == 1.0
+        # No face spans the seam: U moves by one path division at most across a face.
+        _, face_starts, _ = geometry.face_vertex_layout(projected)
+        u = projected.uvs[projected.uv_connects, 0]
+        spans = np.maximum.reduceat(u, face_starts) - np.minimum.reduceat(u, face_starts)
+        assert spans.max() == pytest.approx(1 / 40)
+        # Only vertices on the seam get a second UV, at the other end of U.
+        pairs = np.unique(np.stack([projected.face_connects, projected.uv_connects], axis=1), axis=0)
+        seam = pairs[np.bincount(pairs[:, 0])[pairs[:, 0]] > 1, 1]
+        assert len(projected.uvs) > side.vertex_count
+        assert np.unique(np.round(projected.uvs[seam, 0], 9)).tolist() == [0.0, 1.0]
@@ -0,0 +1,46 @@
+import math
+
+import numpy as np
+import pytest
+
+import hypatia_geometry as geometry
+import lod
+
+
+def test_circle_error_is_the_chord_sagitta():
+    angles = np.linspace(0, 2 * math.pi, 13)
+    chords = np.stack([np.cos(angles), np.sin(angles)], axis=1) * 3.0
+    midpoints = (chords[:-1] + chords[1:]) / 2
+    assert lod.circle_error(3.0, 12) == pytest.approx(3.0 - np.linalg.norm(midpoints, axis=1).min())
+
+
+def test_levels_coarsen_with_their_factor():
+    levels = lod.build_lods(lod.hypatia_sphere_level)
+    assert [level.factor for level in levels] == list(lod.LOD_FACTORS)
+    assert [level.mesh.name for level in levels] == ["SM_Hypatia_LOD%d" % i for i in range(len(levels))]
+    face_counts = [level.mesh.face_count for level in levels]
+    errors = [level.geometric_error for level in levels]
+    assert face_counts == sorted(face_counts, reverse=True)
+    assert errors == sorted(errors)
+
+
+def test_select_lod_picks_the_coarsest_accurate_level():
+    levels = lod.build_lods(lod.motion_structure_light_level, subdivisions=50)
+    finest, coarsest = levels[0], levels[-1]
+    assert lod.select_lod(levels, 1e6) is coarsest
+    assert lod.select_lod(levels, 1e-3) is finest
+    distance = lod.switch_distance(levels[1].geometric_error)
+    assert lod.screen_space_error(levels[1].geometric_error, distance) == pytest.approx(1.0)
+    assert lod.select_lod(levels, distance * 1.001).factor <= levels[1].factor
+
+
+def test_orbit_side_levels_are_split_and_smoothed_like_create_orbit():
+    outer = lod.build_lods(lod.orbit_side_level, side="outer", index=1, total=3, subdivisions=40)
+    inner = lod.build_lods(lod.orbit_side_level, side="inner", index=1, total=3, subdivisions=40)
+    assert [level.mesh.name for level in outer] == ["SM_Outer1_LOD%d" % i for i in range(len(outer))]
+    assert [level.mesh.name for level in inner] == ["SM_Inner1_LOD%d" % i for i in range(len(inner))]
+    # One outer wall face per path division, and 4 ** ORBIT_SMOOTH_DIVISIONS faces per inner face.
+    divisions = [lod.scaled_segments(40, level.factor) for level in outer]
+    assert [level.mesh.face_count for level in outer] == divisions
+    assert [level.mesh.face_count for level in inner] == [
+        3 * 4 ** geometry.ORBIT_SMOOTH_DIVISIONS * count for count in divisions]
@@ -0,0 +1,26 @@
+import pytest
+
+from pm_recorder import recording
+
+
+def test_build_restores_the_scene_state():
+    with recording("hypatia", "maya_context") as (recorder, hypatia, maya_context):
+        selected = recorder.create_transform("selected")
+        recorder.selection = [selected]
+        hypatia.create_orbit(4)
+        assert recorder.selection == [selected]
+        assert recorder.undo_enabled
+        assert not recorder.refresh_suspended
+
+
+def test_nested_builds_restore_state_once_on_error():
+    with recording("maya_context") as (recorder, maya_context):
+        with pytest.raises(ValueError):
+            with maya_context.build_context():
+                with maya_context.build_context():
+                    assert not recorder.undo_enabled
+                assert recorder.refresh_suspended
+                raise ValueError
+        assert recorder.undo_enabled
+        assert not recorder.refresh_suspended
+        assert recorder.selection == []
@@ -0,0 +1,26 @@
+import pytest
+
+from pm_recorder import recording
+
+
+def test_profiler_attributes_commands_to_builders(tmp_path):
+    with recording("hypatia", "maya_mesh") as (recorder, hypatia, maya_mesh):
+        import maya_profiler
+        profiler = maya_profiler.CommandProfiler(commands_per_vertex=1e-9)
+        with profiler.instrument(hypatia, maya_mesh):
+            hypatia.create_hypatia()
+
+        builders = profiler.builders()
+        assert list(builders) == ["hypatia.create_hypatia"]
+        report = builders["hypatia.create_hypatia"]
+        assert report["count"] > 0 and report["vertices"] > 0
+        assert all(line.startswith("hypatia.create_hypatia;") for line in profiler.collapsed().splitlines())
+
+        with pytest.warns(RuntimeWarning):
+            assert profiler.check_budget() == ["hypatia.create_hypatia"]
+        # The proxy is removed on exit.
+        assert not isinstance(hypatia.pm, maya_profiler._ProfiledCommands)
+
+        profiler.commands_per_vertex = None
+        folded, summary = profiler.write(str(tmp_path / "profile"))
+        assert open(folded).read() == profiler.collapsed()
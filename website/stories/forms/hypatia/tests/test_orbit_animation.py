@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+import orbit_animation
+
+
+def interpolate(times, values, keys, slerp):
+    """Plays the kept keys back at every time, linearly or with slerp."""
+    result = np.empty_like(values)
+    for a, b in zip(keys[:-1], keys[1:]):
+        t = (times[a:b + 1] - times[a]) / (times[b] - times[a])
+        if slerp:
+            result[a:b + 1] = orbit_animation._slerp(values[a], values[b], t)
+        else:
+            result[a:b + 1] = values[a] + t[:, None] * (values[b] - values[a])
+    return result
+
+
+@pytest.mark.parametrize("tolerance", [1e-2, 1e-4])
+def test_reduce_keyframes_stays_within_tolerance(tolerance):
+    times = np.linspace(0, 4, 241)
+    values = np.stack([np.sin(3 * times), 0.1 * times ** 3, np.where(times < 2, 0.0, 1.0)], axis=1)
+    keys = orbit_animation.reduce_keyframes(times, values, tolerance)
+    assert keys[0] == 0 and keys[-1] == len(times) - 1
+    assert len(keys) < len(times)
+    assert np.abs(interpolate(times, values, keys, slerp=False) - values).max() <= tolerance
+
+
+def test_reduce_keyframes_keeps_the_ends_of_a_line():
+    times = np.arange(10.0)
+    assert orbit_animation.reduce_keyframes(times, 2 * times).tolist() == [0, 9]
+
+
+def test_ring_rotation_tracks_stay_within_tolerance_under_slerp():
+    animation = orbit_animation.bake_orbit(total=3, dtype=np.float64)
+    for ring in range(3):
+        values = animation.rotations[:, ring]
+        keys = orbit_animation.reduce_keyframes(animation.times, values, slerp=True)
+        assert len(keys) < animation.frame_count
+        error = np.abs(interpolate(animation.times.astype(np.float64), values, keys, slerp=True) - values)
+        assert error.max() <= orbit_animation.KEY_TOLERANCE
+
+
+def test_euler_channels_unwrap_the_ring_spin():
+    animation = orbit_animation.bake_orbit(total=2, dtype=np.float64)
+    rotate = orbit_animation.euler_channels(animation.rotations)
+    expected = np.outer(animation.times, animation.speeds)
+    np.testing.assert_allclose(rotate[..., 0], expected, atol=1e-5)
+    np.testing.assert_allclose(rotate[..., 1:], 0, atol=1e-9)
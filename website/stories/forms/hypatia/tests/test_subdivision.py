@@ -0,0 +1,63 @@
+import numpy as np
+
+import hypatia_geometry as geometry
+import subdivision
+from pm_recorder import recording
+
+
+def grid(size=4):
+    """A flat size x size quad grid in XZ, with a bump at its center."""
+    ticks = np.arange(size + 1, dtype=np.float64)
+    x, z = np.meshgrid(ticks, ticks, indexing="ij")
+    points = np.stack([x.ravel(), np.zeros(x.size), z.ravel()], axis=1)
+    points[len(points) // 2, 1] = 1.0
+    i, j = np.meshgrid(np.arange(size), np.arange(size), indexing="ij")
+    corner = (i * (size + 1) + j).ravel()
+    connects = np.stack([corner, corner + 1, corner + size + 2, corner + size + 1], axis=1).ravel()
+    return points, np.full(size * size, 4), connects
+
+
+def test_cube_corners_follow_catmull_clark():
+    cube = geometry.cube(2.0, 2.0, 2.0)
+    stencil, counts, connects = subdivision.subdivision_stencil(cube.face_counts, cube.face_connects,
+                                                                cube.vertex_count)
+    assert len(counts) == 24 and (counts == 4).all()
+    # A valence 3 corner moves to (n-2)/n of itself plus 1/n^2 of its edge neighbors and face points.
+    corners = stencil.apply(cube.points)[:cube.vertex_count]
+    np.testing.assert_allclose(corners, cube.points * 5 / 9)
+    # Every row of weights sums to one.
+    np.testing.assert_allclose(np.bincount(stencil.rows, weights=stencil.weights), 1.0)
+
+
+def test_stencils_are_cached_per_topology():
+    subdivision.clear_stencils()
+    builds = subdivision.stencil_builds
+    first = subdivision.subdivide(geometry.orbit_ring_side(geometry.orbit_ring(0, 3)), levels=1)
+    second = subdivision.subdivide(geometry.orbit_ring_side(geometry.orbit_ring(1, 3)), levels=1)
+    assert first.face_count == second.face_count
+    # One stencil for the points and one for the UVs, shared by both rings.
+    assert subdivision.stencil_builds - builds == 2
+
+
+def test_keep_border_leaves_the_border_in_place():
+    points, counts, connects = grid()
+    stencil, _, _ = subdivision.subdivision_stencil(counts, connects, len(points), levels=2, keep_border=True)
+    smoothed = stencil.apply(points)
+    border = np.isin(smoothed[:, [0, 2]], [0.0, 4.0]).any(axis=1)
+    assert border.sum() == 4 * 16
+    np.testing.assert_array_equal(smoothed[border, 1], 0.0)
+    # The interior is smoothed below the bump.
+    assert 0 < smoothed[:, 1].max() < 1.0
+
+
+def test_create_orbit_projects_uvs_before_smoothing():
+    with recording("hypatia") as (recorder, hypatia):
+        hypatia.create_orbit(3)
+        inner = recorder.lookup("SM_Inner1").getShape().data
+        counts = recorder.command_counts()
+    assert counts["polyCylindricalProjection"] == 0
+    ring = geometry.orbit_ring(1, 3)
+    expected = subdivision.subdivide(geometry.orbit_ring_side(ring), levels=geometry.ORBIT_SMOOTH_DIVISIONS)
+    np.testing.assert_allclose(inner.uvs[inner.uv_connects], expected.uvs[expected.uv_connects])
+    # Smoothing keeps the projected UVs in 0-1.
+    assert (inner.uvs.min(), inner.uvs.max()) == (0.0, 1.0)
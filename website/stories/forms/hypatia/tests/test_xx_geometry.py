@@ -0,0 +1,115 @@
+import numpy as np
+import pytest
+
+import hypatia_geometry
+from pm_recorder import recording
+from xx_geometry import (ArraySink, cuboid_placements, face_frames, is_convex, iter_cuboid_placements,
+                         mesh_face_frames, point_in_polygon, points_in_polygon)
+
+PENTAGON = [(np.cos(a), np.sin(a)) for a in np.linspace(0, 2 * np.pi, 5, endpoint=False) + 0.3]
+CONCAVE = [(0, 0), (2, 0), (2, 2), (1, 1), (0, 2)]
+
+
+def boundary_points(poly):
+    """The vertices of poly, points along its edges and points just off them."""
+    poly = np.asarray(poly, dtype=np.float64)
+    following = np.roll(poly, -1, axis=0)
+    t = np.linspace(0, 1, 7)[:, None, None]
+    on_edges = (poly + t * (following - poly)).reshape(-1, 2)
+    return np.concatenate([poly, on_edges, on_edges + 1e-12, on_edges - 1e-12])
+
+
+@pytest.mark.parametrize("poly", [PENTAGON, CONCAVE, list(reversed(PENTAGON))])
+def test_points_in_polygon_matches_point_in_polygon(poly):
+    rng = np.random.default_rng(0)
+    points = np.concatenate([boundary_points(poly), rng.uniform(-2.5, 2.5, (2000, 2))])
+    expected = [point_in_polygon(tuple(p), poly) for p in points]
+    assert points_in_polygon(points, poly).tolist() == expected
+    # The ray cast path gives the same answers on convex polygons, in any chunk size.
+    assert points_in_polygon(points, poly, convex=False, chunk_size=97).tolist() == expected
+
+
+def test_is_convex():
+    assert is_convex(PENTAGON)
+    assert not is_convex(CONCAVE)
+
+
+def test_array_sink_writes_a_loadable_npy(tmp_path):
+    dodecahedron = hypatia_geometry.dodecahedron(12.5)
+    sink = ArraySink(str(tmp_path / "placements.npy"))
+    for face_index, matrices in iter_cuboid_placements(mesh_face_frames(dodecahedron), 10, 5.0, chunk_size=7):
+        sink.add(face_index, matrices)
+    expected = cuboid_placements(dodecahedron, 10, 5.0)
+    assert len(expected) and sink.count == len(expected)
+    np.testing.assert_array_equal(np.load(sink.close()), expected)
+
+
+def test_placement_chunks_stay_within_the_chunk_size():
+    chunks = list(iter_cuboid_placements(mesh_face_frames(hypatia_geometry.dodecahedron(12.5)), 10, 5.0, chunk_size=7))
+    assert all(len(matrices) <= 7 for _, matrices in chunks)
+    assert sorted({face for face, _ in chunks}) == list(range(12))
+
+
+def test_face_frames_are_orthonormal_and_hold_their_faces():
+    dodecahedron = hypatia_geometry.dodecahedron(12.5)
+    frames = mesh_face_frames(dodecahedron)
+    assert len(frames) == 12 and frames.valid.all()
+    basis = np.stack([frames.tangents, frames.binormals, frames.normals], axis=1)
+    np.testing.assert_allclose(basis @ basis.transpose(0, 2, 1), np.broadcast_to(np.eye(3), (12, 3, 3)), atol=1e-12)
+    # Every face points away from the solid's center and lies in its own plane.
+    assert (np.sum(frames.normals * frames.centers, axis=1) > 0).all()
+    for face in range(12):
+        assert frames.polygon(face).shape == (5, 2)
+
+
+def test_face_frames_of_a_face_starting_collinear():
+    # The first three vertices are collinear, the face is not.
+    points = [[0, 0, 0], [1, 0, 0], [2, 0, 0], [2, 1, 0], [0, 1, 0]]
+    frames = face_frames(points, [5], [0, 1, 2, 3, 4])
+    assert frames.valid.tolist() == [True]
+    np.testing.assert_allclose(frames.normals[0], [0, 0, 1])
+
+
+def test_face_frames_marks_degenerate_faces_invalid():
+    points = [[0, 0, 0], [1, 1, 1], [2, 2, 2], [0, 1, 0]]
+    frames = face_frames(points, [3, 2, 3], [0, 1, 2, 0, 3, 0, 1, 3])
+    assert frames.valid.tolist() == [False, False, True]
+    assert np.isnan(frames.normals[:2]).all()
+    assert np.isfinite(frames.tangents[2]).all()
+
+
+def test_distribute_covers_a_given_base_mesh():
+    with recording("xx") as (recorder, xx):
+        cube = hypatia_geometry.cube(4.0, 4.0, 4.0)
+        base = recorder.create_transform("base", cube)
+        xx.distribute_cubes_on_dodecahedron(grid=4, small_dims=(0.5, 0.5, 1.0), base=base)
+        counts = recorder.command_counts()
+    assert counts["polyPlatonic"] == 0
+    assert counts["polyCube"] == len(cuboid_placements(cube, 4, 1.0)) == 96
+
+
+def test_stream_reports_progress_for_every_face(tmp_path):
+    cube = hypatia_geometry.cube(4.0, 4.0, 4.0)
+    # A collinear last face gets no placements.
+    base_mesh = hypatia_geometry.MeshData(
+        points=np.concatenate([cube.points, [[9, 9, 9], [10, 10, 10], [11, 11, 11]]]),
+        face_counts=np.append(cube.face_counts, 3).astype(np.int32),
+        face_connects=np.append(cube.face_connects, [8, 9, 10]).astype(np.int32),
+        uvs=cube.uvs,
+        uv_connects=np.append(cube.uv_connects, [0, 0, 0]).astype(np.int32),
+        name="base",
+    )
+    calls = []
+    with recording("xx") as (recorder, xx):
+        base = recorder.create_transform("base", base_mesh)
+        path = xx.stream_cubes_on_dodecahedron(grid=4, small_dims=(0.5, 0.5, 1.0), sink=str(tmp_path / "cubes.npy"),
+                                               base=base, progress=lambda *args: calls.append(args))
+    assert calls == [(face, 7, 16 * min(face + 1, 6)) for face in range(7)]
+    assert len(np.load(path)) == 96
+
+
+def test_distribute_on_an_empty_grid_places_nothing():
+    with recording("xx") as (recorder, xx):
+        assert xx.distribute_cubes_on_dodecahedron(grid=0, mode=xx.MODE_MATRICES).shape == (0, 4, 4)
+        assert xx.distribute_cubes_on_dodecahedron(grid=0) is None
+        assert recorder.command_counts()["polyCube"] == 0
@@ -1,32 +1,37 @@
 import pymel.core as pm
-import math
+import numpy as np
 import pymel.core.datatypes as datatypes
 
-def point_in_polygon(pt, poly):
+import hypatia_geometry as geometry
+from maya_context import build_context
+from maya_mesh import create_mesh, read_mesh
+from xx_geometry import (
+    point_in_polygon, split_dimensions, mesh_face_frames, iter_cuboid_placements, euler_xyz, ArraySink,
+    PLACEMENT_CHUNK_SIZE,
+)
+
+# Output modes of distribute_cubes_on_dodecahedron.
+MODE_MESH = "mesh"          # One polyCube node per cell.
+MODE_INSTANCE = "instance"  # One prototype cube, every other cell an instance sharing its shape.
+MODE_COMBINED = "combined"  # A single mesh holding every cuboid.
+MODE_MATRICES = "matrices"  # No nodes, only the placement matrices.
+
+def _base_mesh(big_size, primitive=None, base=None):
     """
-    2D point-in-polygon test using the ray-casting algorithm.
-    
-    Parameters:
-        pt (tuple): (u, v) coordinates of the point.
-        poly (list): List of (u, v) tuples defining a closed polygon.
-    
-    Returns:
-        bool: True if the point is inside the polygon.
+    Returns the mesh to cover: base when given, else a new polyPlatonic of radius big_size / 2.
+
+    The default solid is named "dodecahedron"; other primitives keep polyPlatonic's name.
     """
-    x, y = pt
-    inside = False
-    n = len(poly)
-    for i in range(n):
-        j = (i - 1) % n
-        xi, yi = poly[i]
-        xj, yj = poly[j]
-        # Check if point is between the y-values of the edge.
-        intersect = ((yi > y) != (yj > y)) and (x < (xj - xi) * (y - yi) / (yj - yi + 1e-10) + xi)
-        if intersect:
-            inside = not inside
-    return inside
-
-def distribute_cubes_on_dodecahedron(big_size=25, grid=10, small_dims=(0.5, 0.5, 5.0)):
+    if base is not None:
+        return base
+    if primitive is None:
+        return pm.rename(pm.polyPlatonic(r=big_size/2.0)[0], "dodecahedron")
+    return pm.polyPlatonic(r=big_size/2.0, primitive=primitive)[0]
+
+
+@build_context()
+def distribute_cubes_on_dodecahedron(big_size=25, grid=10, small_dims=(0.5, 0.5, 5.0), mode=MODE_MESH,
+                                     primitive=None, base=None):
     """
     Creates a dodecahedron scaled to big_size and distributes small cuboids
     on each face. For each face, the cuboids are distributed on a grid computed in
@@ -41,105 +46,182 @@ def distribute_cubes_on_dodecahedron(big_size=25, grid=10, small_dims=(0.5, 0.5,
     Each face's cubes are grouped into a face-specific group, and all such groups
     are parented under a master group.
     
+    Large grids produce thousands of unique meshes, so mode selects how the
+    placements are emitted:
+        MODE_MESH: one polyCube per cell (the original behaviour).
+        MODE_INSTANCE: one prototype cuboid, every other cell an instance of its shape.
+        MODE_COMBINED: a single mesh built by transforming the prototype's vertices in bulk.
+        MODE_MATRICES: no cuboid nodes, only a compact float32 array of placements.
+    
     Parameters:
         big_size (float): Overall scale of the dodecahedron.
         grid (int): Number of grid cells along each direction (grid x grid).
         small_dims (tuple): Three values for the cuboid dimensions. The largest is the flush dimension.
+        mode (str): One of MODE_MESH, MODE_INSTANCE, MODE_COMBINED or MODE_MATRICES.
+        primitive (int): polyPlatonic's primitive flag, to cover another platonic
+            solid. None keeps polyPlatonic's default, the dodecahedron.
+        base (PyNode): An existing mesh to cover instead of creating a polyPlatonic.
+    
+    Returns:
+        PyNode or ndarray: The master group (or combined mesh) for node modes, or
+        the (N, 4, 4) float32 placement matrices for MODE_MATRICES.
     """
+    if mode not in (MODE_MESH, MODE_INSTANCE, MODE_COMBINED, MODE_MATRICES):
+        raise ValueError("Unknown mode %r" % mode)
+
     # Determine flush dimension and the other two grid dimensions.
-    flush_dim = max(small_dims)
-    grid_dims = [d for d in small_dims if d != flush_dim]
-    if len(grid_dims) < 2:
-        dims_list = list(small_dims)
-        dims_list.remove(flush_dim)
-        grid_dims = dims_list
-
-    # Create the dodecahedron.
-    # Use "dodecahedron" as the type string.
-    dodec = pm.polyPlatonic( r=big_size/2.0)[0]
-    dodec = pm.rename(dodec, "dodecahedron")
-    dodecShape = dodec.getShape()
-    
-    face_groups = []  # To collect groups per face.
+    flush_dim, grid_dims = split_dimensions(small_dims)
+
+    # Frame every face at once from a single bulk read of the mesh. One chunk
+    # per face: no face has more placements than grid cells. An empty grid
+    # places nothing.
+    frames = mesh_face_frames(read_mesh(_base_mesh(big_size, primitive, base)))
+    face_placements = list(iter_cuboid_placements(frames, grid, flush_dim, chunk_size=max(1, grid * grid)))
+
+    if mode == MODE_MATRICES:
+        if not face_placements:
+            return np.zeros((0, 4, 4), dtype=np.float32)
+        return np.concatenate([m for _, m in face_placements])
     
-    # Iterate over each face of the dodecahedron.
-    for i, face in enumerate(dodecShape.f):
-        # Get the vertices (world positions) for this face.
-        verts = pm.polyListComponentConversion(face, toVertex=True)
-        verts = pm.ls(verts, flatten=True)
-        if not verts:
-            continue
-        
-        pts = [datatypes.Vector(pm.pointPosition(v, world=True)) for v in verts]
-        
-        # Compute the face center as the average of the vertices.
-        center = sum(pts, datatypes.Vector(0, 0, 0)) / len(pts)
-        
-        # Compute the face normal using the first three vertices.
-        if len(pts) < 3:
-            continue
-        v0, v1, v2 = pts[0], pts[1], pts[2]
-        normal = (v1 - v0).cross(v2 - v0).normal()
-        
-        # Construct a local coordinate system for the face.
-        arbitrary = datatypes.Vector(1, 0, 0)
-        if abs(normal.dot(arbitrary)) > 0.9:
-            arbitrary = datatypes.Vector(0, 1, 0)
-        tangent = (arbitrary - normal * normal.dot(arbitrary)).normal()
-        binormal = normal.cross(tangent).normal()
-        
-        # Project the face's vertices into the local 2D (UV) plane.
-        poly_uv = []
-        for pt in pts:
-            rel = pt - center
-            u = rel.dot(tangent)
-            v = rel.dot(binormal)
-            poly_uv.append((u, v))
-        
-        # Compute bounding box in UV coordinates.
-        us = [uv[0] for uv in poly_uv]
-        vs = [uv[1] for uv in poly_uv]
-        min_u, max_u = min(us), max(us)
-        min_v, max_v = min(vs), max(vs)
-        spacing_u = (max_u - min_u) / float(grid)
-        spacing_v = (max_v - min_v) / float(grid)
-        
-        # Collect small cuboids for this face.
-        face_cubes = []
-        for iu in range(grid):
-            for iv in range(grid):
-                # Center of grid cell in UV.
-                u = min_u + spacing_u/2.0 + iu * spacing_u
-                v = min_v + spacing_v/2.0 + iv * spacing_v
-                # Check if this UV point lies inside the polygon.
-                if not point_in_polygon((u, v), poly_uv):
-                    continue
-                # Compute world position for the small cuboid.
-                pos = center + tangent * u + binormal * v + normal * (flush_dim / 2.0)
-                
-                # Create the small cuboid.
-                cube = pm.polyCube(w=grid_dims[0], h=grid_dims[1], d=flush_dim)[0]
-                # Construct transformation matrix aligning the cuboid's local axes:
-                # local X -> tangent, local Y -> binormal, local Z -> normal.
-                m = datatypes.Matrix([
-                    [tangent.x, binormal.x, normal.x, pos.x],
-                    [tangent.y, binormal.y, normal.y, pos.y],
-                    [tangent.z, binormal.z, normal.z, pos.z],
-                    [0,         0,          0,      1]
-                ])
-                cube.setMatrix(m, worldSpace=True)
-                face_cubes.append(cube)
-        
-        # Group the cubes for this face if any were created.
-        if face_cubes:
-            face_grp = pm.group(face_cubes, name="dodec_face_{:02d}_group".format(i))
-            face_groups.append(face_grp)
+    if mode == MODE_COMBINED:
+        if not face_placements:
+            return None
+        prototype = geometry.cube(grid_dims[0], grid_dims[1], flush_dim)
+        matrices = np.concatenate([m for _, m in face_placements])
+        return create_mesh(geometry.instance_mesh(prototype, matrices, name="dodec_smallCubes_Combined"))
     
-    # Group all face groups into a master group.
-    if face_groups:
-        master_grp = pm.group(face_groups, name="dodec_smallCubes_Master")
-    else:
-        master_grp = None
-
-# Example usage:
-distribute_cubes_on_dodecahedron(big_size=25, grid=10, small_dims=(0.5, 0.5, 5.0))
+    if not face_placements:
+        return None
+    # Each face's cubes go into a face group under the master group.
+    sink = GroupSink(grid_dims[0], grid_dims[1], flush_dim, instance=mode == MODE_INSTANCE)
+    for i, matrices in face_placements:
+        sink.add(i, matrices)
+    return sink.close()
+
+
+# ----------------------------------------------------
+# Streaming
+# ----------------------------------------------------
+class GroupSink:
+    """
+    Turns streamed placements into cuboid nodes, grouped per face as they arrive.
+
+    Each chunk's cuboids are parented to their face group right away, so only
+    one chunk of nodes is held at a time.
+
+    Parameters:
+        width, height, depth (float): The cuboid dimensions.
+        instance (bool): Make every cuboid after the first an instance of its shape.
+        name (str): Name of the master group.
+    """
+
+    def __init__(self, width, height, depth, instance=False, name="dodec_smallCubes_Master"):
+        self.dims = (width, height, depth)
+        self.instance = instance
+        self.master = pm.group(em=True, name=name)
+        self._face_index = None
+        self._face_group = None
+        self._prototype = None
+
+    def add(self, face_index, matrices):
+        if face_index != self._face_index:
+            self._face_group = pm.group(em=True, name="dodec_face_{:02d}_group".format(face_index), parent=self.master)
+            self._face_index = face_index
+        cubes = []
+        for m in matrices:
+            if self.instance and self._prototype is not None:
+                # Instances share the prototype's shape node instead of copying the mesh.
+                cube = pm.instance(self._prototype)[0]
+            else:
+                cube = pm.polyCube(w=self.dims[0], h=self.dims[1], d=self.dims[2])[0]
+                self._prototype = cube
+            cube.setMatrix(datatypes.Matrix(m.tolist()), worldSpace=True)
+            cubes.append(cube)
+        pm.parent(cubes, self._face_group)
+
+    def close(self):
+        return self.master
+
+
+class InstancerSink:
+    """
+    Emits streamed placements as particles of a particle instancer showing one cuboid.
+
+    The scene holds a single cuboid however many placements stream in; each
+    chunk is emitted with one command.
+
+    Parameters:
+        width, height, depth (float): The cuboid dimensions.
+        name (str): Name of the instancer.
+    """
+
+    def __init__(self, width, height, depth, name="dodec_smallCubes_Instancer"):
+        self.prototype = pm.polyCube(w=width, h=height, d=depth, name="dodec_smallCube_Prototype")[0]
+        self.prototype.visibility.set(False)
+        self.particle, shape = pm.particle(name="dodec_smallCubes_Particles")
+        shape.isDynamic.set(False)
+        pm.addAttr(shape, longName="rotationPP", dataType="vectorArray")
+        self.instancer = pm.particleInstancer(shape, addObject=True, object=self.prototype,
+                                              rotation="rotationPP", name=name)
+
+    def add(self, face_index, matrices):
+        pm.emit(object=self.particle, position=matrices[:, 3, :3].tolist(),
+                attribute="rotationPP", vectorValue=euler_xyz(matrices).tolist())
+
+    def close(self):
+        return self.instancer
+
+
+@build_context()
+def stream_cubes_on_dodecahedron(big_size=25, grid=10, small_dims=(0.5, 0.5, 5.0), sink="group",
+                                 chunk_size=PLACEMENT_CHUNK_SIZE, progress=None, primitive=None, base=None):
+    """
+    Distributes cuboids on a dodecahedron like distribute_cubes_on_dodecahedron, in bounded memory.
+
+    Placements are generated face by face in chunks of chunk_size and each
+    chunk goes straight to the sink, so memory stays bounded for grids far
+    too large to hold at once.
+
+    Parameters:
+        big_size (float): Overall scale of the dodecahedron.
+        grid (int): Number of grid cells along each direction (grid x grid).
+        small_dims (tuple): Three values for the cuboid dimensions. The largest is the flush dimension.
+        sink (str or object): "group" for cuboid nodes grouped per face, "instance" for the same
+            with instanced shapes, "instancer" for a particle instancer, a .npy path for an
+            on-disk array, or any object with add(face_index, matrices) and close().
+        chunk_size (int): Number of placements per chunk.
+        progress (callable): Called as progress(face_index, face_count, placed) after every face,
+            those without placements included, placed being the running total of placements.
+        primitive (int): polyPlatonic's primitive flag, see distribute_cubes_on_dodecahedron.
+        base (PyNode): An existing mesh to cover instead of creating a polyPlatonic.
+
+    Returns:
+        The sink's close() result: the master group, the instancer or the .npy path.
+    """
+    flush_dim, grid_dims = split_dimensions(small_dims)
+    if sink in ("group", "instance"):
+        sink = GroupSink(grid_dims[0], grid_dims[1], flush_dim, instance=sink == "instance")
+    elif sink == "instancer":
+        sink = InstancerSink(grid_dims[0], grid_dims[1], flush_dim)
+    elif isinstance(sink, str):
+        sink = ArraySink(sink)
+
+    frames = mesh_face_frames(read_mesh(_base_mesh(big_size, primitive, base)))
+
+    # Chunks arrive in face order; faces without placements yield none.
+    chunks = iter_cuboid_placements(frames, grid, flush_dim, chunk_size)
+    chunk = next(chunks, None)
+    placed = 0
+    for face_index in range(len(frames)):
+        while chunk is not None and chunk[0] == face_index:
+            sink.add(*chunk)
+            placed += len(chunk[1])
+            chunk = next(chunks, None)
+        if progress is not None:
+            progress(face_index, len(frames), placed)
+    return sink.close()
+
+
+if __name__ == "__main__":
+    # Example usage:
+    distribute_cubes_on_dodecahedron(big_size=25, grid=10, small_dims=(0.5, 0.5, 5.0))
@@ -0,0 +1,401 @@
+"""
+Headless geometry for the cube distribution of xx.py.
+
+Grid sampling and placement of the cuboids as NumPy arrays, free of any Maya
+dependency so it can run and be profiled on its own.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+import hypatia_geometry as geometry
+
+# Points closer than this to a polygon edge are left to the exact ray cast.
+EDGE_TOLERANCE = 1e-9
+
+# Number of points classified per pass, to bound temporary memory on huge grids.
+CLASSIFY_CHUNK_SIZE = 1 << 20
+
+# Number of placements per chunk streamed by iter_cuboid_placements.
+PLACEMENT_CHUNK_SIZE = 4096
+
+
+def point_in_polygon(pt, poly):
+    """
+    2D point-in-polygon test using the ray-casting algorithm.
+
+    Parameters:
+        pt (tuple): (u, v) coordinates of the point.
+        poly (list): List of (u, v) tuples defining a closed polygon.
+
+    Returns:
+        bool: True if the point is inside the polygon.
+    """
+    x, y = pt
+    inside = False
+    n = len(poly)
+    for i in range(n):
+        j = (i - 1) % n
+        xi, yi = poly[i]
+        xj, yj = poly[j]
+        # Check if point is between the y-values of the edge.
+        intersect = ((yi > y) != (yj > y)) and (x < (xj - xi) * (y - yi) / (yj - yi + 1e-10) + xi)
+        if intersect:
+            inside = not inside
+    return inside
+
+
+def points_in_polygon(points, poly, convex=None, chunk_size=CLASSIFY_CHUNK_SIZE):
+    """
+    Classifies many 2D points against a polygon in bulk.
+
+    Gives exactly the results of point_in_polygon, points on edges and
+    vertices included. Convex polygons (such as the dodecahedron's pentagons)
+    take a half-plane fast path; only points within EDGE_TOLERANCE of an edge
+    fall back to the ray cast, whose edge rules decide the boundary cases.
+
+    Parameters:
+        points (ndarray): (N, 2) array of (u, v) points.
+        poly (list): List of (u, v) tuples defining a closed polygon.
+        convex (bool): Use the half-plane fast path. Detected from poly when None.
+        chunk_size (int): Number of points classified per pass.
+
+    Returns:
+        ndarray: (N,) boolean mask, True where the point is inside.
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    poly = np.asarray(poly, dtype=np.float64).reshape(-1, 2)
+    if convex is None:
+        convex = is_convex(poly)
+    classify = _classify_convex if convex else _ray_cast
+    inside = np.empty(len(points), dtype=bool)
+    for start in range(0, len(points), chunk_size):
+        inside[start:start + chunk_size] = classify(points[start:start + chunk_size], poly)
+    return inside
+
+
+def is_convex(poly):
+    """Returns True if the closed polygon turns the same way at every vertex."""
+    poly = np.asarray(poly, dtype=np.float64).reshape(-1, 2)
+    if len(poly) < 3:
+        return False
+    edges = np.roll(poly, -1, axis=0) - poly
+    turns = edges[:, 0] * np.roll(edges, -1, axis=0)[:, 1] - edges[:, 1] * np.roll(edges, -1, axis=0)[:, 0]
+    return bool(np.all(turns >= 0) or np.all(turns <= 0))
+
+
+def _ray_cast(points, poly):
+    """point_in_polygon over an (N, 2) array: one vectorized pass per polygon edge."""
+    x, y = points[:, 0], points[:, 1]
+    inside = np.zeros(len(points), dtype=bool)
+    n = len(poly)
+    for i in range(n):
+        j = (i - 1) % n
+        xi, yi = poly[i]
+        xj, yj = poly[j]
+        intersect = ((yi > y) != (yj > y)) & (x < (xj - xi) * (y - yi) / (yj - yi + 1e-10) + xi)
+        inside ^= intersect
+    return inside
+
+
+def _classify_convex(points, poly):
+    """
+    Half-plane classification of a convex polygon.
+
+    Points clearly inside every edge or clearly outside one are decided by the
+    signed distances alone; the thin band around the boundary is ray cast.
+    """
+    starts = poly
+    edges = np.roll(poly, -1, axis=0) - poly
+    lengths = np.linalg.norm(edges, axis=1)
+    valid = lengths > 0
+    starts, edges, lengths = starts[valid], edges[valid], lengths[valid]
+
+    # Inside is the positive side of every edge once the winding is accounted for.
+    area = np.sum(starts[:, 0] * edges[:, 1] - starts[:, 1] * edges[:, 0])
+    orientation = 1.0 if area >= 0 else -1.0
+
+    nearest = np.full(len(points), np.inf)
+    for start, edge, length in zip(starts, edges, lengths):
+        distance = (edge[0] * (points[:, 1] - start[1]) - edge[1] * (points[:, 0] - start[0])) / length
+        np.minimum(nearest, orientation * distance, out=nearest)
+
+    extent = np.ptp(poly, axis=0).max() if len(poly) else 0.0
+    tolerance = EDGE_TOLERANCE * max(1.0, extent)
+    inside = nearest > tolerance
+    boundary = np.abs(nearest) <= tolerance
+    if boundary.any():
+        inside[boundary] = _ray_cast(points[boundary], poly)
+    return inside
+
+
+def grid_cell_centers(min_u, max_u, min_v, max_v, grid, start=0, stop=None):
+    """
+    Returns the (grid*grid, 2) UV centers of a grid over a bounding box.
+
+    Cells are ordered like the iu/iv double loop: u-major, v running fastest.
+    start and stop select a range of that order, so huge grids can be walked
+    a slice at a time.
+    """
+    spacing_u = (max_u - min_u) / float(grid)
+    spacing_v = (max_v - min_v) / float(grid)
+    cells = np.arange(start, grid * grid if stop is None else min(stop, grid * grid))
+    us = min_u + spacing_u/2.0 + (cells // grid) * spacing_u
+    vs = min_v + spacing_v/2.0 + (cells % grid) * spacing_v
+    return np.stack([us, vs], axis=1)
+
+
+def cuboid_matrices(tangent, binormal, normal, positions):
+    """
+    Returns the 4x4 placements of cuboids aligning their local axes to a face frame.
+
+    Matrices follow Maya's row-vector convention: local X -> tangent,
+    local Y -> binormal, local Z -> normal, translation in the last row.
+
+    Parameters:
+        tangent, binormal, normal (array-like): The face frame axes.
+        positions (ndarray): (N, 3) cuboid centers.
+
+    Returns:
+        ndarray: (N, 4, 4) float32 matrices.
+    """
+    positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+    matrices = np.zeros((len(positions), 4, 4), dtype=np.float32)
+    matrices[:, 0, :3] = tangent
+    matrices[:, 1, :3] = binormal
+    matrices[:, 2, :3] = normal
+    matrices[:, 3, :3] = positions
+    matrices[:, 3, 3] = 1
+    return matrices
+
+
+def split_dimensions(small_dims):
+    """
+    Splits cuboid dimensions into the flush dimension and the two grid dimensions.
+
+    The largest value is the flush dimension, aligned with the face normal.
+
+    Returns:
+        tuple: (flush_dim, [grid width, grid height]).
+    """
+    flush_dim = max(small_dims)
+    grid_dims = [d for d in small_dims if d != flush_dim]
+    if len(grid_dims) < 2:
+        dims_list = list(small_dims)
+        dims_list.remove(flush_dim)
+        grid_dims = dims_list
+    return flush_dim, grid_dims
+
+
+@dataclass
+class FaceFrames:
+    """
+    The frames distribute_cubes_on_dodecahedron places each face's cuboids in, for every face at once.
+
+    Attributes:
+        centers (ndarray): (F, 3) face centers, the mean of their vertices.
+        normals (ndarray): (F, 3) unit Newell normals of the faces, NaN for invalid faces.
+        tangents (ndarray): (F, 3) unit tangents from the X axis (Y when the normal is close to X).
+        binormals (ndarray): (F, 3) unit normal x tangent.
+        polygons (ndarray): (V, 2) face-vertices projected on their face's tangent/binormal plane.
+        face_starts (ndarray): (F,) offset of each face in polygons.
+        face_counts (ndarray): (F,) number of vertices of each face.
+        bounds (ndarray): (F, 2, 2) min and max corner of each polygon.
+        valid (ndarray): (F,) False for faces with fewer than three vertices or no area,
+            such as collinear ones, which have no frame.
+    """
+    centers: np.ndarray
+    normals: np.ndarray
+    tangents: np.ndarray
+    binormals: np.ndarray
+    polygons: np.ndarray
+    face_starts: np.ndarray
+    face_counts: np.ndarray
+    bounds: np.ndarray
+    valid: np.ndarray
+
+    def __len__(self):
+        return len(self.face_counts)
+
+    def polygon(self, face):
+        """Returns the (N, 2) polygon of one face."""
+        start = self.face_starts[face]
+        return self.polygons[start:start + self.face_counts[face]]
+
+
+def face_frames(points, face_counts, face_connects):
+    """
+    Computes the frame of every face of a mesh in one vectorized pass.
+
+    Takes the arrays of a single bulk mesh query (MFnMesh.getPoints and
+    getVertices, or a MeshData), so it works on any polyPlatonic solid or
+    user mesh. Normals use Newell's method over every vertex of the face, so
+    faces starting with collinear vertices still get one.
+
+    Parameters:
+        points (ndarray): (N, 3) vertex positions.
+        face_counts (ndarray): (F,) number of vertices per face.
+        face_connects (ndarray): Vertex indices of every face, face after face.
+
+    Returns:
+        FaceFrames: The frames of every face.
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    counts = np.asarray(face_counts, dtype=np.int64)
+    corners = points[np.asarray(face_connects, dtype=np.int64)]
+    starts = np.cumsum(counts) - counts
+    face_ids = np.repeat(np.arange(len(counts)), counts)
+
+    centers = np.add.reduceat(corners, starts, axis=0) / counts[:, None] if len(counts) else np.zeros((0, 3))
+
+    connects = np.asarray(face_connects, dtype=np.int64)
+    normals = geometry.face_normals(geometry.MeshData(points=points, face_counts=counts, face_connects=connects,
+                                                      uvs=np.zeros((1, 2)), uv_connects=np.zeros_like(connects)))
+    # Newell normals are zero for faces without area.
+    valid = (counts >= 3) & np.any(normals != 0, axis=1)
+    normals[~valid] = np.nan
+
+    arbitrary = np.zeros_like(normals)
+    near_x = np.abs(normals[:, 0]) > 0.9
+    arbitrary[~near_x, 0] = 1.0
+    arbitrary[near_x, 1] = 1.0
+    tangents = _normalize(arbitrary - normals * np.sum(normals * arbitrary, axis=1)[:, None])
+    binormals = _normalize(np.cross(normals, tangents))
+
+    relative = corners - centers[face_ids]
+    polygons = np.stack([np.sum(relative * tangents[face_ids], axis=1),
+                         np.sum(relative * binormals[face_ids], axis=1)], axis=1)
+    bounds = np.zeros((len(counts), 2, 2))
+    if len(counts):
+        bounds[:, 0] = np.minimum.reduceat(polygons, starts, axis=0)
+        bounds[:, 1] = np.maximum.reduceat(polygons, starts, axis=0)
+
+    return FaceFrames(centers=centers, normals=normals, tangents=tangents, binormals=binormals,
+                      polygons=polygons, face_starts=starts, face_counts=counts, bounds=bounds, valid=valid)
+
+
+def mesh_face_frames(mesh):
+    """Returns the FaceFrames of a MeshData."""
+    return face_frames(mesh.points, mesh.face_counts, mesh.face_connects)
+
+
+def _normalize(vectors):
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return vectors / np.linalg.norm(vectors, axis=1)[:, None]
+
+
+def iter_cuboid_placements(frames, grid, flush_dim, chunk_size=PLACEMENT_CHUNK_SIZE):
+    """
+    Streams cuboid placements face by face in chunks of chunk_size.
+
+    Grid cells are generated, classified and placed chunk_size at a time, so
+    memory stays bounded by the chunk size whatever the grid size. Every chunk
+    holds chunk_size placements except the last one of each face.
+
+    Parameters:
+        frames (FaceFrames): The faces to cover, see face_frames.
+        grid (int): Number of grid cells along each direction (grid x grid).
+        flush_dim (float): Size of the cuboids along the face normal.
+        chunk_size (int): Number of placements per chunk.
+
+    Yields:
+        tuple: (face index, (M, 4, 4) float32 matrices).
+    """
+    for i in np.flatnonzero(frames.valid):
+        tangent, binormal, normal = frames.tangents[i], frames.binormals[i], frames.normals[i]
+        poly_uv = frames.polygon(i)
+        (min_u, min_v), (max_u, max_v) = frames.bounds[i]
+        offset = frames.centers[i] + normal * (flush_dim / 2.0)
+
+        pending, pending_count = [], 0
+        for start in range(0, grid * grid, chunk_size):
+            cells = grid_cell_centers(min_u, max_u, min_v, max_v, grid, start, start + chunk_size)
+            cells = cells[points_in_polygon(cells, poly_uv)]
+            if not len(cells):
+                continue
+            positions = offset + np.outer(cells[:, 0], tangent) + np.outer(cells[:, 1], binormal)
+            pending.append(cuboid_matrices(tangent, binormal, normal, positions))
+            pending_count += len(positions)
+            if pending_count >= chunk_size:
+                matrices = np.concatenate(pending)
+                for chunk_start in range(0, len(matrices) - chunk_size + 1, chunk_size):
+                    yield int(i), matrices[chunk_start:chunk_start + chunk_size]
+                remainder = matrices[len(matrices) // chunk_size * chunk_size:]
+                pending, pending_count = [remainder], len(remainder)
+        if pending_count:
+            yield int(i), np.concatenate(pending)
+
+
+def cuboid_placements(mesh, grid, flush_dim):
+    """
+    Places cuboids on a grid over every face of a mesh, without Maya.
+
+    Follows distribute_cubes_on_dodecahedron face by face: the face frame comes
+    from the face's Newell normal, the grid covers the face's bounding box in
+    that frame and only cells inside the face are kept.
+
+    Parameters:
+        mesh (MeshData): The mesh to cover, such as hypatia_geometry.dodecahedron.
+        grid (int): Number of grid cells along each direction (grid x grid).
+        flush_dim (float): Size of the cuboids along the face normal.
+
+    Returns:
+        ndarray: (N, 4, 4) float32 placement matrices, face by face.
+    """
+    placements = [matrices for _, matrices in iter_cuboid_placements(mesh_face_frames(mesh), grid, flush_dim)]
+    if not placements:
+        return np.zeros((0, 4, 4), dtype=np.float32)
+    return np.concatenate(placements)
+
+
+def euler_xyz(matrices):
+    """
+    Returns the XYZ Euler rotations, in degrees, of (N, 4, 4) row-vector matrices.
+
+    Returns:
+        ndarray: (N, 3) rotations, matching Maya's default rotate order.
+    """
+    m = np.asarray(matrices, dtype=np.float64)
+    rx = np.arctan2(m[:, 1, 2], m[:, 2, 2])
+    ry = np.arcsin(np.clip(-m[:, 0, 2], -1.0, 1.0))
+    rz = np.arctan2(m[:, 0, 1], m[:, 0, 0])
+    return np.degrees(np.stack([rx, ry, rz], axis=1))
+
+# ----------------------------------------------------
+# Sinks
+# ----------------------------------------------------
+class ArraySink:
+    """
+    Writes streamed placements straight to a .npy file of float32 (N, 4, 4) matrices.
+
+    The header is rewritten with the final count on close, so the file loads
+    with np.load (or np.load(mmap_mode="r")) without ever holding every
+    placement in memory.
+
+    Parameters:
+        path (str): The .npy file to write.
+    """
+    _HEADER_SIZE = 128
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._file = open(path, "wb")
+        self._file.write(self._header(0))
+
+    def add(self, face_index, matrices):
+        self._file.write(np.ascontiguousarray(matrices, dtype="<f4").tobytes())
+        self.count += len(matrices)
+
+    def close(self):
+        """Writes the final header and closes the file. Returns the path."""
+        self._file.seek(0)
+        self._file.write(self._header(self.count))
+        self._file.close()
+        return self.path
+
+    def _header(self, count):
+        # .npy format 1.0: magic, version, header length, then the padded dict.
+        header = "{'descr': '<f4', 'fortran_order': False, 'shape': (%d, 4, 4), }" % count
+        header = header.ljust(self._HEADER_SIZE - 10 - 1) + "\n"
+        return b"\x93NUMPY\x01\x00" + np.uint16(len(header)).tobytes() + header.encode("latin1")